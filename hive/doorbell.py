@@ -0,0 +1,170 @@
+"""
+Doorbells: wake waiting processes when a file they watch changes.
+
+Consumers used to poll on fixed timers (main.py every 3 s for tasks,
+event waits every 20 ms, the simulations' command check every frame).
+A Doorbell instead binds a Unix datagram socket in a per-file channel
+directory; ring(path), called by whoever just wrote path, sends one byte
+to every socket in that directory. Waiting is a select() on the socket,
+so a consumer sleeps until something actually changed:
+
+    tasks.json               main.py's task loop (rung by add_task and the
+                             simulations' text input)
+    *_commands.journal       the simulation (rung by CommandJournal.append)
+    *_events.jsonl           EventReader.wait (rung by EventWriter.flush)
+
+Rings are never guaranteed (a consumer may bind just after a ring, or
+the platform may lack AF_UNIX), so every wait also has a timeout and the
+consumer re-checks its file either way. With timeout=None, wait() adapts
+it: each quiet wait doubles it from min_timeout up to max_timeout, and a
+ring resets it, so an idle consumer wakes rarely and a busy one catches
+a lost ring quickly.
+
+Usage (consumer):
+    bell = Doorbell(TASKS_FILE, min_timeout=1.0, max_timeout=10.0)
+    while True:
+        ...check TASKS_FILE...
+        bell.wait()   # True if rung, False on timeout
+
+Usage (producer):
+    TASKS_FILE.write_text(...)
+    ring(TASKS_FILE)
+"""
+
+import itertools
+import os
+import select
+import socket
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+# Socket paths must stay short (about 100 bytes), so channels live in /tmp
+BELL_DIR = Path(tempfile.gettempdir()) / "openhive"
+
+_HAS_UNIX = hasattr(socket, "AF_UNIX")
+_ids = itertools.count()
+
+
+def _channel(path):
+    """Directory of the doorbells on path (named after the file, plus a hash of its location)."""
+    path = Path(path).resolve()
+    return BELL_DIR / f"{path.name}-{zlib.crc32(str(path).encode()) & 0xFFFF:04x}"
+
+
+def ring(path):
+    """Wake every Doorbell on path; never blocks and never raises."""
+    if not _HAS_UNIX:
+        return
+    channel = _channel(path)
+    try:
+        names = os.listdir(channel)
+    except OSError:
+        return
+    if not names:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        for name in names:
+            address = str(channel / name)
+            try:
+                sock.sendto(b"\0", address)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a consumer that died without closing
+                try:
+                    os.unlink(address)
+                except OSError:
+                    pass
+            except OSError:
+                pass  # queue full: the consumer already has a ring pending
+
+
+class Doorbell:
+    """
+    One consumer's doorbell on path.
+
+    Args:
+        path:        the watched file (it does not need to exist)
+        min_timeout: first and shortest adaptive timeout (seconds)
+        max_timeout: longest adaptive timeout (seconds)
+    """
+
+    def __init__(self, path, min_timeout=0.05, max_timeout=1.0):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._timeout = min_timeout
+        self._sock = None
+        self.address = None
+        if not _HAS_UNIX:
+            return
+        channel = _channel(path)
+        channel.mkdir(parents=True, exist_ok=True)
+        self.address = str(channel / f"{os.getpid()}-{next(_ids)}")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.bind(self.address)
+        except OSError:
+            sock.close()
+            self.address = None
+            return
+        sock.setblocking(False)
+        self._sock = sock
+
+    def rung(self):
+        """True if the bell rang since the last check (never blocks)."""
+        if self._sock is None:
+            return False
+        rang = False
+        while True:
+            try:
+                self._sock.recv(64)
+                rang = True
+            except (BlockingIOError, InterruptedError):
+                return rang
+            except OSError:
+                return rang
+
+    def wait(self, timeout=None, limit=None):
+        """
+        Block until the bell rings or timeout seconds pass.
+
+        Args:
+            timeout: seconds, or None for the adaptive timeout
+            limit:   upper bound on the adaptive timeout for this call
+                     (e.g. the time left before a deadline)
+
+        Returns:
+            True if rung, False on timeout
+        """
+        adaptive = timeout is None
+        if adaptive:
+            timeout = self._timeout if limit is None else min(self._timeout, limit)
+        if self._sock is None:
+            time.sleep(max(timeout, 0))
+            rang = False
+        else:
+            try:
+                select.select([self._sock], [], [], max(timeout, 0))
+            except InterruptedError:
+                pass
+            rang = self.rung()
+        if adaptive:
+            self._timeout = self.min_timeout if rang else min(self._timeout * 2, self.max_timeout)
+        return rang
+
+    def close(self):
+        if self._sock is None:
+            return
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.address)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,147 @@
+"""
+Per-bot movement events published by the simulations.
+
+Dispatchers used to guess when bots were done (sleeping for path length
+times a hard-coded step time, or polling active_bots). The simulations
+now append one JSON line per event to files/<world>_events.jsonl:
+
+    {"seq": 812, "t": 1718000000.25, "bot": 3, "event": "progress",
+     "path": 5, "idx": 17, "len": 40, "pos": [12, 30], "cmd": "a1-3"}
+
+    event  "start"     a new path was accepted
+           "progress"  the bot stepped; idx is its index on the path
+           "arrived"   the path is done (t is the arrival time)
+           "failed"    a move was requested but no path was found, or
+                       the target was rejected outright (then cmd is the
+                       rejected command's and the bot keeps its path)
+    path   per-bot counter, one per started path
+    cmd    the "id" of the command that started the path, if it had one
+    seq    increases by one per event; a gap means events were lost
+
+EventWriter buffers a frame's events and appends them in one write; the
+file is truncated when the simulation starts and once it grows past
+MAX_BYTES; every flush rings the file's doorbell. EventReader tails it
+from where it was created (so it only sees events after that point) and
+wait() sleeps on the doorbell until a predicate matches, or gives up
+after a timeout; without a ring it re-checks the file every POLL_S,
+backing off to POLL_MAX_S.
+
+Usage (simulation):
+    events = EventWriter(EVENTS_PATH)
+    events.bot_event(bot_idx, bot, "arrived")   # from the sim's bot dict
+    events.flush()   # once per frame
+
+Usage (dispatcher):
+    reader = EventReader(EVENTS_PATH)      # before sending the command
+    _send_commands(...)
+    event = reader.wait(lambda e: e["event"] == "arrived" and e["bot"] == 3,
+                        timeout=30)        # None on timeout
+"""
+
+import json
+import os
+import time
+
+from doorbell import Doorbell, ring
+
+# Start over once the event file grows past this size
+MAX_BYTES = 4 * 1024 * 1024
+
+# Seconds between checks for new events while waiting without a doorbell
+# ring, doubling up to POLL_MAX_S
+POLL_S = 0.02
+POLL_MAX_S = 0.5
+
+# Events after which a bot is idle until its next command
+DONE = ("arrived", "failed")
+
+
+class EventWriter:
+    """Appends buffered events to an event file (one writer per file)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.seq = 0
+        self._buffer = []
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+    def emit(self, bot, event, **fields):
+        self.seq += 1
+        self._buffer.append(json.dumps(
+            {"seq": self.seq, "t": time.time(), "bot": bot, "event": event, **fields}
+        ))
+
+    def bot_event(self, index, bot, event, cmd=None):
+        """
+        Emit event for a simulation bot dict (pos, path, path_idx,
+        path_id and cmd keys); idx is the bot's cell on its path. cmd
+        reports another command id than the bot's (one it rejected).
+        """
+        self.emit(index, event, path=bot["path_id"], idx=max(bot["path_idx"] - 1, 0),
+                  len=len(bot["path"]), pos=list(bot["pos"]),
+                  cmd=bot["cmd"] if cmd is None else cmd)
+
+    def flush(self):
+        """Write the buffered events; call once per frame."""
+        if not self._buffer:
+            return
+        data = ("\n".join(self._buffer) + "\n").encode()
+        self._buffer = []
+        if self.path.exists() and self.path.stat().st_size > MAX_BYTES:
+            self.path.write_text("")  # readers notice the file shrank
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        ring(self.path)
+
+
+class EventReader:
+    """Reads events appended to an event file after the reader was made."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = path.stat().st_size if path.exists() else 0
+        self._unread = []  # read by a wait() past its match
+
+    def poll(self):
+        """New events since the last call, oldest first."""
+        events, self._unread = self._unread, []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < self.offset:
+                    self.offset = 0  # writer started over
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return events
+        end = data.rfind(b"\n") + 1  # a line may still be half written
+        self.offset += end
+        for line in data[:end].splitlines():
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return events
+
+    def wait(self, predicate, timeout):
+        """
+        First new event matching predicate, or None after timeout seconds.
+        Events read after the match are kept for the next poll() / wait().
+        """
+        deadline = time.time() + timeout
+        # Bound before the first poll, so a flush after it still wakes us
+        with Doorbell(self.path, min_timeout=POLL_S, max_timeout=POLL_MAX_S) as bell:
+            while True:
+                events = self.poll()
+                for k, event in enumerate(events):
+                    if predicate(event):
+                        self._unread.extend(events[k + 1:])
+                        return event
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                bell.wait(limit=remaining)
@@ -5,16 +5,22 @@ This module defines tools that agents can use to interact with the fire world.
 Each function represents a tool that can be called by the orchestration layer.
 
 IPC Protocol:
-    Reads:  files/sim_state.json      (bot positions, fire locations, stats)
+    Reads:  shared memory "openhive_sim" (bot positions, fire locations, stats;
+            files/sim_state.json when the simulation's plane is unavailable)
             files/sim_screenshot.png   (visual representation of the grid)
-    Writes: files/sim_commands.json    (commands for the simulation to execute)
+    Writes: files/sim_commands.journal (commands for the simulation to execute)
 """
 
 import json
-import threading
+import os
+import sys
 from pathlib import Path
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from journal import CommandJournal
+from state_plane import StateReader, bot_list, cells, clusters
+
 # Grid configuration
 GRID_SIZE = 64
 
@@ -28,10 +34,15 @@ CELL_FIRE = 3
 FILES_DIR = Path(__file__).parent.parent / "files"
 STATE_PATH = FILES_DIR / "sim_state.json"
 SCREENSHOT_PATH = FILES_DIR / "sim_screenshot.png"
-COMMANDS_PATH = FILES_DIR / "sim_commands.json"
+COMMANDS_PATH = FILES_DIR / "sim_commands.journal"
+EVENTS_PATH = FILES_DIR / "sim_events.jsonl"
+STATE_SHM = "openhive_sim"
+
+# Command journal; appends are atomic across threads and processes
+_journal = CommandJournal(COMMANDS_PATH)
 
-# Thread lock for command writing
-_cmd_lock = threading.Lock()
+# Shared-memory state published by the simulation
+_state_reader = StateReader(STATE_SHM)
 
 
 # =============================================================================
@@ -40,7 +51,7 @@ _cmd_lock = threading.Lock()
 
 def _get_state():
     """
-    Read full simulation state from the IPC file.
+    Read full simulation state from the state plane, or the JSON export.
     
     Returns:
         dict with keys:
@@ -50,12 +61,27 @@ def _get_state():
             - active_bots: list of bot IDs currently moving
             - stats: {fires_active: int, cells_extinguished: int}
     """
+    snap = _state_reader.snapshot()
+    if snap is not None:
+        return {
+            "bots": bot_list(snap),
+            "fires": cells(snap["clusters"]),
+            "fire_clusters": clusters(snap["clusters"]),
+            "active_bots": snap["active"].nonzero()[0].tolist(),
+            "stats": {
+                "fires_active": int(snap["fires_active"]),
+                "cells_extinguished": int(snap["cells_extinguished"]),
+            },
+        }
     if not STATE_PATH.exists():
         return {}
     try:
-        return json.loads(STATE_PATH.read_text())
+        state = json.loads(STATE_PATH.read_text())
     except (json.JSONDecodeError, KeyError):
         return {}
+    # The export leaves out fires; every fire is in a cluster
+    state.setdefault("fires", [cell for cluster in state.get("fire_clusters", []) for cell in cluster])
+    return state
 
 
 def _get_bots():
@@ -78,24 +104,13 @@ def _get_fire_clusters():
 
 def _write_command(command):
     """
-    Write a command to the IPC file for the simulation to process.
+    Append a command to the journal for the simulation to process.
     Thread-safe.
     
     Args:
         command: dict with 'action' key and action-specific parameters
     """
-    with _cmd_lock:
-        commands = []
-        if COMMANDS_PATH.exists():
-            text = COMMANDS_PATH.read_text().strip()
-            if text:
-                try:
-                    commands = json.loads(text)
-                except json.JSONDecodeError:
-                    commands = []
-        
-        commands.append(command)
-        COMMANDS_PATH.write_text(json.dumps(commands))
+    _journal.append([command])
 
 
 # =============================================================================
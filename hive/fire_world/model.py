@@ -7,11 +7,17 @@ V2: HeuristicNetV2     — VIN-Attention U-Net (~420K params)
     - Multi-head self-attention at 8x8 bottleneck
     - Iterative gated decoder (shared weights, T passes)
     - Inspired by VIN, GPPN, and TransPath
+Late: HeuristicNetLate — V2 encoder on the obstacle map alone
+    - encode() once per grid, decode() once per goal
+    - Goal injected at the bottleneck and every decoder stage
 
 Input:  (B, 2, 64, 64) — channel 0: obstacle map, channel 1: goal one-hot
 Output: (B, 1, 64, 64) — predicted cost-to-go per cell
 """
 
+import math
+import time
+
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
@@ -151,6 +157,12 @@ class HeuristicNetV2(nn.Module):
       Bottleneck: Conv + Multi-Head Self-Attention (4 heads, 8x8=64 tokens)
       Decoder:  3 stages with skip connections (shared weights across T iterations)
                 Gated residual update inspired by GPPN
+
+    At inference the decoder can exit early: pass tol to stop once a pass
+    changes the estimate by less than tol anywhere, and/or budget_ms to
+    stop once that much time has gone by. With return_iterations=True the
+    number of decoder passes run is returned after the output (it is not
+    kept on the module, which several threads may share).
     """
 
     def __init__(self, num_iterations=4, dropout=0.1):
@@ -190,7 +202,9 @@ class HeuristicNetV2(nn.Module):
             nn.Sigmoid(),
         )
 
-    def forward(self, x, return_intermediates=False):
+    def forward(self, x, return_intermediates=False, tol=None, budget_ms=None,
+                return_iterations=False):
+        t_start = time.perf_counter()
         B = x.shape[0]
 
         # === Encoder ===
@@ -225,19 +239,236 @@ class HeuristicNetV2(nn.Module):
             ug = self.update_gate(torch.cat([d1, v_prev], dim=1))  # (B, 1, 64, 64)
             v_new = ug * v_raw + (1 - ug) * v_prev
 
+            # Early exit (inference only): the first pass always completes
+            converged = (tol is not None and t > 0
+                         and float((v_new - v_prev).abs().max()) < tol)
             v_prev = v_new
             if return_intermediates:
                 intermediates.append(v_new)
+            if converged:
+                break
+            if budget_ms is not None and (time.perf_counter() - t_start) * 1000 >= budget_ms:
+                break
+
+        return _decoder_output(v_new, intermediates, t + 1,
+                               return_intermediates, return_iterations)
+
+
+# ---------------------------------------------------------------------------
+# Late fusion: obstacle encoder shared by every goal on a grid
+# ---------------------------------------------------------------------------
+
+class SkipFusionConv(nn.Module):
+    """
+    Decoder stage conv-bn-relu over [upsampled state, skip, goal planes].
+
+    The convolution is linear in its input, so it is split per input group:
+    the skip term depends only on the obstacle map and is computed once
+    per grid by skip(); forward() adds the per-goal terms.
+    """
+    def __init__(self, up_ch, skip_ch, goal_ch, out_ch):
+        super().__init__()
+        self.up_conv = nn.Conv2d(up_ch, out_ch, 3, padding=1)
+        self.skip_conv = nn.Conv2d(skip_ch, out_ch, 3, padding=1, bias=False)
+        self.goal_conv = nn.Conv2d(goal_ch, out_ch, 3, padding=1, bias=False)
+        self.bn = nn.BatchNorm2d(out_ch)
+
+    def skip(self, e):
+        return self.skip_conv(e)
+
+    def forward(self, up, skip_term, goal):
+        y = self.up_conv(up) + skip_term + self.goal_conv(goal)
+        return F.relu(self.bn(y))
+
+
+class HeuristicNetLate(nn.Module):
+    """
+    Late-fusion variant of HeuristicNetV2.
+
+    The encoder, bottleneck attention and the skip half of every decoder
+    convolution see only the obstacle map, so encode() runs once per grid.
+    The goal enters afterwards as two planes (one-hot and normalised octile
+    distance, pooled to each scale): added to the bottleneck by a 1x1 conv
+    and concatenated at each decoder stage. decode() runs the iterative
+    gated decoder for a batch of goals against one grid's features, with
+    single-conv stages, so N goals cost one encoder pass plus N decoder
+    passes. Early exit (tol / budget_ms) works as in HeuristicNetV2.
+
+    from_v2() warm-starts the encoder and bottleneck from a V2 model; the
+    goal-dependent weights then need training (see late_fusion.py).
+    """
+
+    GOAL_CH = 2
+
+    def __init__(self, num_iterations=4):
+        super().__init__()
+        self.num_iterations = num_iterations
+        self.pool = nn.MaxPool2d(2)
+        self.upsample = nn.Upsample(scale_factor=2, mode="bilinear", align_corners=False)
+
+        # === Encoder (obstacle map only) ===
+        self.e1 = DoubleConv(1, 24)
+        self.e2 = DoubleConv(24, 48)
+        self.e3 = DoubleConv(48, 96)
+
+        # === Bottleneck with self-attention ===
+        self.bn_conv1 = ConvBnRelu(96, 96)
+        self.bn_attn = SpatialSelfAttention(dim=96, num_heads=4, num_tokens=64)
+        self.bn_conv2 = ConvBnRelu(96, 96)
 
-        if return_intermediates:
-            return v_new, intermediates
-        return v_new
+        # === Goal injection at the bottleneck ===
+        self.goal_inject = nn.Conv2d(96 + self.GOAL_CH, 96, 1)
+
+        # === Iterative gated decoder (shared weights across T iterations) ===
+        self.iter_gate = nn.Sequential(
+            nn.Conv2d(96 + 1, 96, 1),
+            nn.Sigmoid(),
+        )
+        self.d3 = SkipFusionConv(96, 96, self.GOAL_CH, 48)
+        self.d2 = SkipFusionConv(48, 48, self.GOAL_CH, 24)
+        self.d1 = SkipFusionConv(24, 24, self.GOAL_CH, 24)
+        self.out_conv = nn.Conv2d(24, 1, 1)
+        self.update_gate = nn.Sequential(
+            nn.Conv2d(24 + 1, 1, 1),
+            nn.Sigmoid(),
+        )
+
+    def encode(self, obstacles):
+        """(G, 1, H, W) obstacle maps -> goal-independent features."""
+        e1 = self.e1(obstacles)             # (G, 24, 64, 64)
+        e2 = self.e2(self.pool(e1))         # (G, 48, 32, 32)
+        e3 = self.e3(self.pool(e2))         # (G, 96, 16, 16)
+
+        b = self.bn_conv1(self.pool(e3))    # (G, 96, 8, 8)
+        b = b + self.bn_attn(b)
+        b = self.bn_conv2(b)
+        return {
+            "b": b,
+            "s3": self.d3.skip(e3),          # (G, 48, 16, 16)
+            "s2": self.d2.skip(e2),          # (G, 24, 32, 32)
+            "s1": self.d1.skip(e1),          # (G, 24, 64, 64)
+        }
+
+    def goal_planes(self, goal):
+        """(B, 1, H, W) goal one-hot -> (B, 2, H, W) one-hot + octile distance."""
+        B, _, H, W = goal.shape
+        idx = goal.flatten(1).argmax(dim=1)
+        rows = torch.arange(H, device=goal.device, dtype=goal.dtype).view(1, H, 1)
+        cols = torch.arange(W, device=goal.device, dtype=goal.dtype).view(1, 1, W)
+        dr = (rows - (idx // W).to(goal.dtype).view(B, 1, 1)).abs()
+        dc = (cols - (idx % W).to(goal.dtype).view(B, 1, 1)).abs()
+        octile = torch.maximum(dr, dc) + (math.sqrt(2) - 1) * torch.minimum(dr, dc)
+        return torch.cat([goal, (octile / max(H, W)).unsqueeze(1)], dim=1)
+
+    def decode(self, features, goal, return_intermediates=False, tol=None,
+               budget_ms=None, return_iterations=False):
+        """
+        Cost-to-go for a batch of goals.
+
+        Args:
+            features: encode() output for B grids, or for one grid shared
+                      by every goal
+            goal:     (B, 1, H, W) goal one-hot
+        """
+        t_start = time.perf_counter()
+        B, _, H, W = goal.shape
+
+        def per_goal(t):
+            return t.expand(B, -1, -1, -1) if t.shape[0] != B else t
+
+        g1 = self.goal_planes(goal)                 # (B, 2, 64, 64)
+        g2 = F.avg_pool2d(g1, 2)                    # (B, 2, 32, 32)
+        g3 = F.avg_pool2d(g2, 2)                    # (B, 2, 16, 16)
+        g8 = F.avg_pool2d(g3, 2)                    # (B, 2, 8, 8)
+        s3, s2, s1, b = (per_goal(features[k]) for k in ("s3", "s2", "s1", "b"))
+        b = b + self.goal_inject(torch.cat([b, g8], dim=1))
+
+        v_prev = torch.zeros(B, 1, H, W, device=goal.device)
+        intermediates = []
+
+        for t in range(self.num_iterations):
+            v_down = F.avg_pool2d(F.avg_pool2d(F.avg_pool2d(v_prev, 2), 2), 2)  # (B,1,8,8)
+            b_gated = b * self.iter_gate(torch.cat([b, v_down], dim=1))
+
+            d3 = self.d3(self.upsample(b_gated), s3, g3)   # (B, 48, 16, 16)
+            d2 = self.d2(self.upsample(d3), s2, g2)        # (B, 24, 32, 32)
+            d1 = self.d1(self.upsample(d2), s1, g1)        # (B, 24, 64, 64)
+
+            v_raw = self.out_conv(d1)
+            ug = self.update_gate(torch.cat([d1, v_prev], dim=1))
+            v_new = ug * v_raw + (1 - ug) * v_prev
+
+            converged = (tol is not None and t > 0
+                         and float((v_new - v_prev).abs().max()) < tol)
+            v_prev = v_new
+            if return_intermediates:
+                intermediates.append(v_new)
+            if converged:
+                break
+            if budget_ms is not None and (time.perf_counter() - t_start) * 1000 >= budget_ms:
+                break
+
+        return _decoder_output(v_new, intermediates, t + 1,
+                               return_intermediates, return_iterations)
+
+    def forward(self, x, return_intermediates=False, tol=None, budget_ms=None,
+                return_iterations=False):
+        """Same (B, 2, H, W) interface as HeuristicNetV2."""
+        return self.decode(self.encode(x[:, :1]), x[:, 1:2],
+                           return_intermediates, tol, budget_ms, return_iterations)
+
+    @classmethod
+    def from_v2(cls, v2):
+        """
+        Late-fusion model initialised from a trained HeuristicNetV2.
+
+        Copies the encoder, bottleneck, gates and output head, and splits
+        the first conv of each V2 decoder stage into its up and skip
+        halves. Goal weights start at zero and must be learned.
+
+        This does not preserve V2's accuracy: the goal only reaches the
+        decoder through those zeroed weights (V2's encoder saw it from the
+        first layer), and V2's second conv of every decoder stage has no
+        counterpart here and is dropped. Train the result before use;
+        NeuralPathfinder refuses late checkpoints saved without training.
+        """
+        late = cls(num_iterations=v2.num_iterations)
+        state = {k: v for k, v in v2.state_dict().items()
+                 if not k.startswith(("e1.", "d3.", "d2.", "d1."))}
+        state.update({f"e1.{k}": v for k, v in v2.e1.state_dict().items()})
+        # V2's e1 reads [obstacles, goal]; keep the obstacle filters
+        state["e1.block.0.weight"] = v2.e1.block[0].weight[:, :1].clone()
+        for name in ("d3", "d2", "d1"):
+            conv, bn = getattr(v2, name).block[0], getattr(v2, name).block[1]
+            stage = getattr(late, name)
+            up_ch = stage.up_conv.in_channels
+            state[f"{name}.up_conv.weight"] = conv.weight[:, :up_ch].clone()
+            state[f"{name}.up_conv.bias"] = conv.bias.clone()
+            state[f"{name}.skip_conv.weight"] = conv.weight[:, up_ch:].clone()
+            state[f"{name}.goal_conv.weight"] = torch.zeros_like(stage.goal_conv.weight)
+            for k, v in bn.state_dict().items():
+                state[f"{name}.bn.{k}"] = v.clone()
+        state["goal_inject.weight"] = torch.zeros_like(late.goal_inject.weight)
+        state["goal_inject.bias"] = torch.zeros_like(late.goal_inject.bias)
+        late.load_state_dict(state)
+        return late
 
 
 # ---------------------------------------------------------------------------
 # Utility
 # ---------------------------------------------------------------------------
 
+def _decoder_output(v, intermediates, iterations, return_intermediates,
+                    return_iterations):
+    """Iterative decoders' return value: v, then intermediates and/or passes run."""
+    out = (v,)
+    if return_intermediates:
+        out += (intermediates,)
+    if return_iterations:
+        out += (iterations,)
+    return out if len(out) > 1 else v
+
+
 def count_parameters(model):
     return sum(p.numel() for p in model.parameters() if p.requires_grad)
 
@@ -256,3 +487,10 @@ if __name__ == "__main__":
     y2, intermediates = net2(x, return_intermediates=True)
     print(f"Input: {x.shape} -> Output: {y2.shape}")
     print(f"Intermediate outputs: {len(intermediates)}")
+
+    print("\n=== Late: HeuristicNetLate ===")
+    net3 = HeuristicNetLate.from_v2(net2)
+    print(f"Parameters: {count_parameters(net3):,}")
+    features = net3.encode(x[:1, :1])
+    y3 = net3.decode(features, x[:, 1:2])
+    print(f"Features of 1 grid -> {y3.shape[0]} goals: {y3.shape}")
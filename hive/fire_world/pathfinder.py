@@ -11,59 +11,175 @@ Usage:
     pf = NeuralPathfinder("checkpoints/best_model.pt")
     path = pf.find_path(grid, start=(10, 5), goal=(50, 60))
     # path is a list of (row, col) tuples, or None if no path exists
+
+    # Many bots at once: one batched forward pass, then one A* per request
+    paths = pf.find_paths_batch(grid, [((10, 5), (50, 60)), ((3, 3), (40, 12))])
+
+    # Exact cost-to-go instead of the CNN, or one flow field per goal
+    path = pf.find_path(grid, (10, 5), (50, 60), heuristic=ExactHeuristic())
+    paths = pf.find_paths_batch(grid, requests, mode="flow")
+
+    # Jump Point Search; JPS+ tables are built once per static grid
+    path = pf.find_path(grid, (10, 5), (50, 60), mode="jps+")
+
+    # Grids larger than 64x64 are planned hierarchically in 64x64 tiles
+    path = pf.find_path(big_grid, (10, 5), (400, 380))
+
+    # CPU deployment: frozen TorchScript, NHWC, two intra-op threads
+    pf = NeuralPathfinder("checkpoints/best_model.pt", backend="script",
+                          threads=2, channels_last=True)
+
+    # V2 only: stop decoder iterations early (see bench_early_exit.py)
+    pf = NeuralPathfinder("checkpoints/best_model.pt", early_exit_tol=0.5,
+                          budget_ms=20)
+    path, stats = pf.find_path(grid, (10, 5), (50, 60), return_stats=True)
+    stats.iterations   # decoder passes the call's forward ran
+
+    # Late-fusion checkpoints (late_fusion.py) encode each grid once and
+    # only run the decoder per goal
+    pf = NeuralPathfinder("checkpoints/late_model.pt")
+
+    # Where planning time goes: per call, per callback, or in aggregate
+    path, stats = pf.find_path(grid, (10, 5), (50, 60), return_stats=True)
+    pf = NeuralPathfinder("checkpoints/best_model.pt", on_stats=print)
+    pf.stats_info()
+
+    # Anytime A* (ARA*): best path found within the deadline, with a bound
+    path, stats = pf.find_path(grid, (10, 5), (50, 60), mode="anytime",
+                               deadline_ms=5, return_stats=True)
+    stats.bound   # path cost <= bound * optimal cost
 """
 
-import heapq
-import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
 import numpy as np
 import torch
 
-from model import HeuristicNetV2, HeuristicNet
+from backends import load_backend
+from model import HeuristicNetLate, HeuristicNetV2, HeuristicNet
 
-_DIRS = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
-         (-1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)),
-         (1, -1, math.sqrt(2)), (1, 1, math.sqrt(2))]
+# Shared search kernel lives in hive/pathfinding
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pathfinding.anytime import ara_star
+from pathfinding.fields import ExactHeuristic, FlowField
+from pathfinding.hierarchy import HierarchicalGraph
+from pathfinding.jps import JumpPointGraph
+from pathfinding.search import GridGraph, grid_digest
 
+_EXACT = ExactHeuristic()
 
-def _astar(grid, start, goal, heuristic_fn):
-    """A* search with a custom heuristic. Returns path or None."""
-    h, w = grid.shape
-    sr, sc = start
-    gr, gc = goal
 
-    g_cost = {(sr, sc): 0.0}
-    parent = {(sr, sc): None}
-    closed = set()
-    heap = [(heuristic_fn(sr, sc), 0.0, sr, sc)]
-
-    while heap:
-        _f, g, r, c = heapq.heappop(heap)
-        if (r, c) in closed:
-            continue
-        closed.add((r, c))
+class PlanStats:
+    """
+    Where one find_path / find_paths_batch call spent its time.
+
+    heuristic is "neural" or the provider's name, backend the inference
+    backend when the CNN served the call (None otherwise), mode the search
+    mode. Times are wall-clock milliseconds: inference_ms covers producing
+    heuristic maps and flow fields (network, encoder or provider), search_ms
+    the searches and flow-field walks, total_ms the whole call. expanded,
+    pushes and reopened are summed over the searches (jump points for JPS);
+    cache_hits and cache_misses count heuristic-map cache lookups.
+    bound is set by mode "anytime": the largest suboptimality bound over
+    the call's paths (None otherwise). iterations is the most decoder
+    passes any of the call's forwards ran, set only when an eager V2 or
+    late-fusion model ran (None on cache hits and for other models).
+    """
 
-        if (r, c) == (gr, gc):
-            path = []
-            node = (gr, gc)
-            while node is not None:
-                path.append(node)
-                node = parent[node]
-            path.reverse()
-            return path
+    COUNTERS = ("requests", "inference_ms", "search_ms", "total_ms", "expanded",
+                "pushes", "reopened", "cache_hits", "cache_misses", "flow_goals")
+
+    def __init__(self, heuristic, backend, mode):
+        self.heuristic = heuristic
+        self.backend = backend
+        self.mode = mode
+        self.tiled = False
+        self.bound = None
+        self.iterations = None
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+
+    def as_dict(self):
+        out = {"heuristic": self.heuristic, "backend": self.backend,
+               "mode": self.mode, "tiled": self.tiled, "bound": self.bound,
+               "iterations": self.iterations}
+        out.update((name, getattr(self, name)) for name in self.COUNTERS)
+        return out
+
+    def __repr__(self):
+        return (f"PlanStats({self.heuristic}/{self.backend or '-'}, {self.mode}: "
+                f"{self.requests} req, infer {self.inference_ms:.1f} ms, "
+                f"search {self.search_ms:.1f} ms, {self.expanded} expanded, "
+                f"cache {self.cache_hits}/{self.cache_hits + self.cache_misses})")
+
+
+class _HeuristicCache:
+    """
+    Thread-safe LRU cache of heuristic maps keyed by (grid digest, goal).
 
-        for dr, dc, move_cost in _DIRS:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < h and 0 <= nc < w and grid[nr, nc] == 0:
-                ng = g + move_cost
-                if (nr, nc) not in g_cost or ng < g_cost[(nr, nc)]:
-                    g_cost[(nr, nc)] = ng
-                    f = ng + heuristic_fn(nr, nc)
-                    parent[(nr, nc)] = (r, c)
-                    heapq.heappush(heap, (f, ng, nr, nc))
+    Evicts least-recently-used maps once either max_entries or max_bytes
+    is exceeded. max_entries=0 disables caching.
+    """
 
-    return None  # no path
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self._maps = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            h_map = self._maps.get(key)
+            if h_map is None:
+                self.misses += 1
+                return None
+            self._maps.move_to_end(key)
+            self.hits += 1
+            return h_map
+
+    def put(self, key, h_map):
+        if self.max_entries == 0 or h_map.nbytes > self.max_bytes:
+            return
+        h_map.setflags(write=False)
+        with self._lock:
+            old = self._maps.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._maps[key] = h_map
+            self._nbytes += h_map.nbytes
+            while (len(self._maps) > self.max_entries
+                   or self._nbytes > self.max_bytes):
+                _key, evicted = self._maps.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+    def invalidate(self, digest=None):
+        """Drop every entry, or only those computed on the given grid digest."""
+        with self._lock:
+            if digest is None:
+                self._maps.clear()
+                self._nbytes = 0
+                return
+            for key in [k for k in self._maps if k[0] == digest]:
+                self._nbytes -= self._maps.pop(key).nbytes
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._maps),
+                "bytes": self._nbytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
 
 
 class NeuralPathfinder:
@@ -73,9 +189,82 @@ class NeuralPathfinder:
     Load once, call find_path() repeatedly for different start/goal pairs.
     The model runs a single forward pass to produce a heuristic map for the
     entire grid, then A* uses that map for lookup.
+
+    find_paths_batch() plans many start/goal pairs on the same grid with one
+    forward pass per max_batch goals instead of one per request.
+
+    Heuristic maps are kept in an LRU cache keyed by the grid contents and
+    the goal cell, so re-planning to the same goal on an unchanged grid
+    skips the network entirely. The cache is bounded by cache_entries and
+    cache_mb; call invalidate_cache() when a grid is discarded.
+
+    Any heuristic provider (an object with a name and a
+    heuristic_map(grid, goal) method, e.g. pathfinding.fields.ExactHeuristic)
+    can replace the CNN per call; its maps share the same cache.
+
+    Search modes:
+        "astar" — one A* search per request (default)
+        "jps"   — Jump Point Search: same optimal paths on uniform grids,
+                  with far fewer open-list entries
+        "jps+"  — JPS with jump distances precomputed once per static grid
+        "flow"  — one exact flow field per distinct goal; every bot heading
+                  there reads its path from the field with no search
+
+    The model only accepts TILE x TILE inputs. Larger grids are planned
+    with pathfinding.hierarchy: an abstract graph over TILE x TILE tiles
+    picks the route, then each in-tile hop is searched on its tile with the
+    settings above. The abstract graph is kept per grid shape and only
+    tiles that changed between calls are rebuilt.
+
+    The forward pass runs through an inference backend (see backends.py):
+    "eager" by default, or "script", "compile", "onnx" or "int8" on the
+    CPU, with an explicit intra-op thread count and optional channels_last.
+    Non-eager backends convert the checkpoint once and check parity with
+    the eager model after converting.
+
+    V2 checkpoints can stop their decoder iterations early with the eager
+    backend: early_exit_tol (in path-cost units) ends the loop once a pass
+    moves no cell's estimate by more than that, budget_ms once the forward
+    has taken that long. PlanStats.iterations holds the passes actually run.
+
+    Late-fusion checkpoints (model_version "late", HeuristicNetLate) run
+    their encoder once per grid and keep the features for the last
+    FEATURE_GRIDS grids; each goal then only costs a decoder pass. They
+    run eagerly, and accept early exit like V2. Only checkpoints trained
+    by late_fusion.py are accepted: a model just converted from V2 has not
+    learned to use the goal yet.
+
+    Pass return_stats=True to find_path / find_paths_batch to get a
+    PlanStats with the call's timings and search counters, or on_stats to
+    receive every call's PlanStats; stats_info() sums them per instance.
+
+    mode "anytime" runs ARA* (pathfinding.anytime): a weighted search with
+    a falling inflation factor that returns the best path found within
+    deadline_ms (ANYTIME_DEADLINE_MS by default, shared by the call's
+    requests) and records its suboptimality bound in PlanStats.bound. The
+    bound holds for the CNN heuristic as well as the classical ones.
     """
 
-    def __init__(self, checkpoint_path, device=None):
+    MODES = ("astar", "jps", "jps+", "flow", "anytime")
+
+    # Time budget of an anytime call when no deadline_ms is given
+    ANYTIME_DEADLINE_MS = 20.0
+
+    # JumpPointGraphs kept for recently seen grids (holds JPS+ tables)
+    JUMP_GRAPHS = 4
+
+    # Model input size; larger grids are split into tiles of this size
+    TILE = 64
+
+    # Encoder outputs kept for recently seen grids (late-fusion models)
+    FEATURE_GRIDS = 4
+
+    def __init__(self, checkpoint_path, device=None, max_batch=64,
+                 cache_entries=256, cache_mb=64, backend="eager", threads=None,
+                 channels_last=False, early_exit_tol=None, budget_ms=None,
+                 on_stats=None):
+        if device is None and backend != "eager":
+            device = torch.device("cpu")  # converted backends are CPU-only
         if device is None:
             if torch.backends.mps.is_available():
                 device = torch.device("mps")
@@ -84,6 +273,17 @@ class NeuralPathfinder:
             else:
                 device = torch.device("cpu")
         self.device = device
+        self.max_batch = max(1, int(max_batch))
+        self._cache = _HeuristicCache(cache_entries, cache_mb * 1024 * 1024)
+        self._jump_graphs = OrderedDict()
+        self._jump_graphs_lock = threading.Lock()
+        self._hierarchies = {}  # grid shape -> HierarchicalGraph
+        self._hierarchy_lock = threading.Lock()
+        self._features = OrderedDict()  # grid digest -> encoder features
+        self._features_lock = threading.Lock()
+        self.on_stats = on_stats  # callable(PlanStats) after every call
+        self._totals = {}
+        self._totals_lock = threading.Lock()
 
         ckpt = torch.load(checkpoint_path, map_location=device, weights_only=False)
         version = ckpt.get("model_version", "v1")
@@ -91,6 +291,19 @@ class NeuralPathfinder:
             self.model = HeuristicNetV2(
                 num_iterations=ckpt.get("num_iterations", 4)
             )
+        elif version == "late":
+            if backend != "eager":
+                raise ValueError(
+                    f"Late-fusion checkpoints run eagerly, got backend {backend!r}"
+                )
+            if not ckpt.get("train_steps"):
+                raise ValueError(
+                    f"{checkpoint_path} is an untrained late-fusion conversion; "
+                    "train it first (late_fusion.py convert --steps N)"
+                )
+            self.model = HeuristicNetLate(
+                num_iterations=ckpt.get("num_iterations", 4)
+            )
         else:
             self.model = HeuristicNet()
 
@@ -99,44 +312,342 @@ class NeuralPathfinder:
         self.model.eval()
         self.max_cost = ckpt["max_cost"]
 
+        self._forward_kwargs = {}
+        if early_exit_tol is not None or budget_ms is not None:
+            if version not in ("v2", "late") or backend != "eager":
+                raise ValueError(
+                    "early_exit_tol / budget_ms need a V2 or late-fusion "
+                    f"checkpoint and the eager backend (got {version}, {backend!r})"
+                )
+            if early_exit_tol is not None:
+                self._forward_kwargs["tol"] = early_exit_tol / self.max_cost
+            self._forward_kwargs["budget_ms"] = budget_ms
+        # Eager V2 / late-fusion forwards report their decoder passes
+        if version in ("v2", "late") and backend == "eager":
+            self._forward_kwargs["return_iterations"] = True
+
+        self.backend = backend
+        self._infer = load_backend(self.model, checkpoint_path, backend,
+                                   threads, channels_last, device, self.TILE)
+
     def _get_heuristic_map(self, grid, goal):
         """Run the CNN and return a (H, W) heuristic cost array."""
-        H, W = grid.shape
-        ch_obstacle = grid.astype(np.float32)
-        ch_goal = np.zeros((H, W), dtype=np.float32)
-        ch_goal[goal[0], goal[1]] = 1.0
+        return self._get_heuristic_maps(grid, [goal])[0]
 
-        x = np.stack([ch_obstacle, ch_goal])[np.newaxis]  # (1, 2, H, W)
-        x_t = torch.from_numpy(x).to(self.device)
+    def _get_heuristic_maps(self, grid, goals, stats=None):
+        """
+        Heuristic maps for several goals on the same grid.
 
-        with torch.no_grad():
-            pred = self.model(x_t)
+        Cached maps are reused. The rest are computed by the CNN with goal
+        channels stacked into (B, 2, H, W) tensors of at most max_batch
+        samples. Returns a list of read-only (H, W) arrays in goal order.
+        Late-fusion models encode the grid once and decode each chunk.
+        """
+        digest = grid_digest(grid)
+        h_maps = [self._cache.get((digest, goal, "neural")) for goal in goals]
+        missing = [i for i, h_map in enumerate(h_maps) if h_map is None]
+        if stats is not None:
+            stats.cache_hits += len(goals) - len(missing)
+            stats.cache_misses += len(missing)
+        if not missing:
+            return h_maps
+
+        t0 = time.perf_counter()
+        H, W = grid.shape
+        ch_obstacle = grid.astype(np.float32)
+        late = isinstance(self.model, HeuristicNetLate)
+        if late:
+            features = self._grid_features(grid, digest)
+
+        for lo in range(0, len(missing), self.max_batch):
+            chunk = missing[lo:lo + self.max_batch]
+            x = np.zeros((len(chunk), 2, H, W), dtype=np.float32)
+            x[:, 0] = ch_obstacle
+            for b, i in enumerate(chunk):
+                x[b, 1, goals[i][0], goals[i][1]] = 1.0
+            if late:
+                goal = torch.from_numpy(x[:, 1:2]).to(self.device)
+                with torch.inference_mode():
+                    out, passes = self.model.decode(features, goal, **self._forward_kwargs)
+                pred = out[:, 0].float().cpu().numpy() * self.max_cost
+            else:
+                out = self._infer(x, **self._forward_kwargs)
+                out, passes = out if isinstance(out, tuple) else (out, None)
+                pred = out[:, 0] * self.max_cost  # (B, H, W)
+            if stats is not None and passes is not None:
+                stats.iterations = max(stats.iterations or 0, passes)
+            for b, i in enumerate(chunk):
+                h_map = np.maximum(pred[b], 0.0)
+                self._cache.put((digest, goals[i], "neural"), h_map)
+                h_maps[i] = h_map
+
+        if stats is not None:
+            stats.inference_ms += (time.perf_counter() - t0) * 1000
+        return h_maps
+
+    def _grid_features(self, grid, digest):
+        """Late-fusion encoder features for grid, reused while unchanged."""
+        with self._features_lock:
+            features = self._features.get(digest)
+            if features is not None:
+                self._features.move_to_end(digest)
+                return features
+        obstacles = torch.from_numpy(grid.astype(np.float32))[None, None].to(self.device)
+        with torch.inference_mode():
+            features = self.model.encode(obstacles)
+        with self._features_lock:
+            self._features[digest] = features
+            while len(self._features) > self.FEATURE_GRIDS:
+                self._features.popitem(last=False)
+        return features
+
+    def _provider_maps(self, grid, goals, heuristic, stats=None):
+        """Heuristic maps from a provider, or from the CNN if it is None."""
+        if heuristic is None:
+            return self._get_heuristic_maps(grid, goals, stats)
+
+        digest = grid_digest(grid)
+        h_maps = []
+        for goal in goals:
+            key = (digest, goal, heuristic.name)
+            h_map = self._cache.get(key)
+            if h_map is None:
+                t0 = time.perf_counter()
+                h_map = np.asarray(heuristic.heuristic_map(grid, goal))
+                self._cache.put(key, h_map)
+                if stats is not None:
+                    stats.inference_ms += (time.perf_counter() - t0) * 1000
+                    stats.cache_misses += 1
+            elif stats is not None:
+                stats.cache_hits += 1
+            h_maps.append(h_map)
+        return h_maps
+
+    def flow_field(self, grid, goal, stats=None):
+        """Exact FlowField toward goal; the distance field is cached."""
+        goal = (int(goal[0]), int(goal[1]))
+        dist = self._provider_maps(grid, [goal], _EXACT, stats)[0]
+        return FlowField(grid, goal, dist)
+
+    def _jump_graph(self, grid):
+        """JumpPointGraph for grid, reused while the grid is unchanged."""
+        digest = grid_digest(grid)
+        with self._jump_graphs_lock:
+            graph = self._jump_graphs.get(digest)
+            if graph is None:
+                graph = JumpPointGraph(grid)
+                self._jump_graphs[digest] = graph
+                while len(self._jump_graphs) > self.JUMP_GRAPHS:
+                    self._jump_graphs.popitem(last=False)
+            else:
+                self._jump_graphs.move_to_end(digest)
+        return graph
+
+    def _find_paths_tiled(self, grid, pairs, heuristic, mode, shared_flow, stats,
+                          t_end):
+        """Hierarchical planning for grids larger than TILE x TILE."""
+        tile = self.TILE
+        stats.tiled = True
+
+        def refine(tile_grid, tile_pairs):
+            # Edge tiles are padded with obstacles to the model input size
+            padded = np.ones((tile, tile), dtype=grid.dtype)
+            padded[:tile_grid.shape[0], :tile_grid.shape[1]] = tile_grid
+            return self._plan(padded, tile_pairs, heuristic, mode, shared_flow,
+                              stats, t_end)
+
+        with self._hierarchy_lock:
+            graph = self._hierarchies.get(grid.shape)
+            if graph is None:
+                graph = HierarchicalGraph(grid, tile=tile)
+                self._hierarchies[grid.shape] = graph
+            else:
+                graph.update(grid)
+            return graph.find_paths(pairs, refine)
+
+    def cache_info(self):
+        """Heuristic-map cache counters: hits, misses, entries, bytes, limits."""
+        return self._cache.info()
+
+    def stats_info(self):
+        """PlanStats counters summed over every call, plus the call count."""
+        with self._totals_lock:
+            return dict(self._totals)
+
+    def reset_stats(self):
+        """Zero the counters reported by stats_info()."""
+        with self._totals_lock:
+            self._totals.clear()
+
+    def _record(self, stats):
+        with self._totals_lock:
+            self._totals["calls"] = self._totals.get("calls", 0) + 1
+            for name in PlanStats.COUNTERS:
+                self._totals[name] = self._totals.get(name, 0) + getattr(stats, name)
+        if self.on_stats is not None:
+            self.on_stats(stats)
+
+    def invalidate_cache(self, grid=None):
+        """
+        Drop cached heuristic maps, encoder features, JPS+ tables and tile
+        graphs.
 
-        h_map = pred.squeeze().cpu().numpy() * self.max_cost
-        return np.maximum(h_map, 0.0)
+        Args:
+            grid: if given, only data computed on this grid is dropped;
+                  otherwise the whole cache is cleared.
+        """
+        digest = None if grid is None else grid_digest(grid)
+        self._cache.invalidate(digest)
+        with self._jump_graphs_lock:
+            if digest is None:
+                self._jump_graphs.clear()
+            else:
+                self._jump_graphs.pop(digest, None)
+        with self._features_lock:
+            if digest is None:
+                self._features.clear()
+            else:
+                self._features.pop(digest, None)
+        with self._hierarchy_lock:
+            if grid is None:
+                self._hierarchies.clear()
+            else:
+                self._hierarchies.pop(grid.shape, None)
 
-    def find_path(self, grid, start, goal):
+    def find_path(self, grid, start, goal, heuristic=None, mode="astar",
+                  deadline_ms=None, return_stats=False):
         """
         Find a path from start to goal on the given grid.
 
         Args:
-            grid:  (H, W) numpy array — 0 = free, 1 = obstacle
-            start: (row, col) tuple — bot's current position
-            goal:  (row, col) tuple — target position
+            grid:         (H, W) numpy array — 0 = free, 1 = obstacle
+            start:        (row, col) tuple — bot's current position
+            goal:         (row, col) tuple — target position
+            heuristic:    heuristic provider, or None for the neural heuristic
+            mode:         one of MODES
+            deadline_ms:  time budget for mode "anytime"
+            return_stats: also return the call's PlanStats
 
         Returns:
             List of (row, col) tuples from start to goal, or None if
-            no path exists.
+            no path exists; (path, PlanStats) if return_stats.
         """
-        start = (int(start[0]), int(start[1]))
-        goal = (int(goal[0]), int(goal[1]))
+        paths, stats = self.find_paths_batch(grid, [(start, goal)], heuristic,
+                                             mode, deadline_ms=deadline_ms,
+                                             return_stats=True)
+        return (paths[0], stats) if return_stats else paths[0]
 
-        h_map = self._get_heuristic_map(grid, goal)
+    def find_paths_batch(self, grid, requests, heuristic=None, mode="astar",
+                         shared_flow=False, deadline_ms=None, return_stats=False):
+        """
+        Find paths for many start/goal pairs on the same grid.
 
-        def heuristic(r, c):
-            return float(h_map[r, c])
+        All distinct goals share one batched forward pass (chunked to
+        max_batch), then a search runs per request. Goals served by a
+        flow field skip both the network and the search.
 
-        return _astar(grid, start, goal, heuristic)
+        Args:
+            grid:        (H, W) numpy array — 0 = free, 1 = obstacle
+            requests:    list of ((row, col) start, (row, col) goal) pairs
+            heuristic:   heuristic provider, or None for the neural heuristic
+            mode:        one of MODES
+            shared_flow: serve goals requested by several bots from one
+                         flow field, whatever the mode
+            deadline_ms: time budget for mode "anytime", counted from the
+                         start of the call and split over the requests
+                         still to plan (default ANYTIME_DEADLINE_MS)
+            return_stats: also return the call's PlanStats
+
+        Returns:
+            List of paths in request order; each is a list of (row, col)
+            tuples, or None if no path exists; (paths, PlanStats) if
+            return_stats.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode {mode!r}; choose from {self.MODES}")
+
+        t0 = time.perf_counter()
+        if deadline_ms is None:
+            deadline_ms = self.ANYTIME_DEADLINE_MS
+        t_end = t0 + deadline_ms / 1000.0
+        pairs = [((int(s[0]), int(s[1])), (int(g[0]), int(g[1])))
+                 for s, g in requests]
+        if heuristic is None:
+            stats = PlanStats("neural", self.backend, mode)
+        else:
+            stats = PlanStats(heuristic.name, None, mode)
+        stats.requests = len(pairs)
+
+        if not pairs:
+            paths = []
+        elif grid.shape[0] > self.TILE or grid.shape[1] > self.TILE:
+            paths = self._find_paths_tiled(grid, pairs, heuristic, mode,
+                                           shared_flow, stats, t_end)
+        else:
+            paths = self._plan(grid, pairs, heuristic, mode, shared_flow, stats,
+                               t_end)
+
+        stats.total_ms = (time.perf_counter() - t0) * 1000
+        self._record(stats)
+        return (paths, stats) if return_stats else paths
+
+    def _plan(self, grid, pairs, heuristic, mode, shared_flow, stats, t_end):
+        """find_paths_batch on a grid of at most TILE x TILE cells."""
+        # Bots sharing a goal share a heuristic map or flow field
+        goal_count = {}
+        for _start, goal in pairs:
+            goal_count[goal] = goal_count.get(goal, 0) + 1
+        if mode == "flow":
+            flow_goals = list(goal_count)
+        elif shared_flow:
+            flow_goals = [g for g, n in goal_count.items() if n > 1]
+        else:
+            flow_goals = []
+        search_goals = [g for g in goal_count if g not in flow_goals]
+
+        fields = {g: self.flow_field(grid, g, stats) for g in flow_goals}
+        h_maps = dict(zip(search_goals,
+                          self._provider_maps(grid, search_goals, heuristic, stats)))
+        stats.flow_goals += len(flow_goals)
+
+        t0 = time.perf_counter()
+        counters = {}
+        if mode in ("jps", "jps+"):
+            jump_graph = self._jump_graph(grid)
+            plus = mode == "jps+"
+
+            def search(start, goal, h_map):
+                return jump_graph.jps(start, goal, h_map, plus, counters)
+        elif mode == "anytime":
+            admissible = getattr(heuristic, "admissible", False)
+            remaining = [sum(goal not in fields for _start, goal in pairs)]
+
+            def search(start, goal, h_map):
+                # Split what is left of the deadline over the rest
+                share = max(0.0, t_end - time.perf_counter()) * 1000 / remaining[0]
+                remaining[0] -= 1
+                path, bound = ara_star(grid, start, goal, h_map, share,
+                                       admissible=admissible, stats=counters)
+                if bound is not None:
+                    stats.bound = max(stats.bound or 1.0, bound)
+                return path
+        else:
+            graph = GridGraph(grid)
+
+            def search(start, goal, h_map):
+                return graph.astar(start, goal, h_map, counters)
+
+        paths = []
+        for start, goal in pairs:
+            if goal in fields:
+                paths.append(fields[goal].path(start))
+            else:
+                paths.append(search(start, goal, h_maps[goal]))
+
+        stats.search_ms += (time.perf_counter() - t0) * 1000
+        for name in ("expanded", "pushes", "reopened"):
+            setattr(stats, name, getattr(stats, name) + counters.get(name, 0))
+        return paths
 
     def find_path_pixel(self, grid, start_xy, goal_xy, grid_origin=(0, 0),
                         cell_size=1.0):
@@ -181,8 +692,6 @@ class NeuralPathfinder:
 
 if __name__ == "__main__":
     # Quick demo
-    import time
-
     pf = NeuralPathfinder("checkpoints/best_model.pt")
     print(f"Model loaded on {pf.device}")
 
@@ -205,4 +714,4 @@ if __name__ == "__main__":
         else:
             print("No path found")
     else:
-        print("No sample data found for demo")
+        print("No sample data found for demo (bench_pathfinding.py generates its own grids)")
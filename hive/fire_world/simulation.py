@@ -2,15 +2,17 @@
 Fire World Simulation
 
 Standalone process -- communicates with main.py via files:
-    Writes:  files/sim_state.json      (bots, fires, stats, every frame)
+    Writes:  shared memory "openhive_sim" (bots, fire clusters, stats, every change)
+             files/sim_state.json      (JSON export of the same, ~1 s, debugging)
              files/sim_screenshot.png   (grid image, every ~500ms)
-    Reads:   files/sim_commands.json    (move/extinguish commands from main.py)
+    Reads:   files/sim_commands.journal (move/extinguish commands from main.py)
 
 The world features:
     - Random fire clusters that spawn periodically
     - Two firefighting bots that navigate and extinguish fires
     - Visual smoke effects when extinguishing fires
-    - Pathfinding through obstacles and around fires
+    - Pathfinding through obstacles and around fires; paths are repaired
+      incrementally (D* Lite) as fires spread or are put out
 
 Controls:
     Left click  -- set target for nearest bot
@@ -32,6 +34,15 @@ import pygame
 
 from pathfinder import NeuralPathfinder
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from pathfinding.incremental import IncrementalPlanner
+from doorbell import Doorbell, ring
+from events import EventWriter
+from journal import MAX_BYTES, CommandJournal, JournalReader
+from state_plane import StatePlane
+from pathfinding.service import connect
+from pathfinding.smoothing import rasterize, smooth_path
+
 GRID_SIZE = 64
 CELL_PX = 10
 GRID_PX = GRID_SIZE * CELL_PX
@@ -41,6 +52,8 @@ WINDOW_H = GRID_PX + INPUT_HEIGHT
 FPS = 30
 MOVE_DELAY_MS = 60
 SCREENSHOT_INTERVAL_MS = 500
+STATE_EXPORT_INTERVAL_MS = 1000
+COMMAND_POLL_MS = 1000  # journal re-check when no doorbell ring arrives
 NUM_BOTS = 3
 
 # Fire spawning parameters
@@ -99,11 +112,22 @@ class SmokeParticle:
 FILES_DIR = Path(__file__).parent.parent / "files"
 STATE_PATH = FILES_DIR / "sim_state.json"
 SCREENSHOT_PATH = FILES_DIR / "sim_screenshot.png"
-COMMANDS_PATH = FILES_DIR / "sim_commands.json"
+COMMANDS_PATH = FILES_DIR / "sim_commands.journal"
+EVENTS_PATH = FILES_DIR / "sim_events.jsonl"
 TASKS_PATH = FILES_DIR / "tasks.json"
+STATE_SHM = "openhive_sim"
+
+# Pathfinder: the shared service (move_world/pathfind_server.py) when it is
+# running, otherwise our own model (intra-op threads capped: the sims and
+# main.py share the CPU)
+PF_THREADS = 2
+_pf = connect() or NeuralPathfinder(
+    str(Path(__file__).parent / "checkpoints" / "best_model.pt"), threads=PF_THREADS
+)
 
-# Pathfinder
-_pf = NeuralPathfinder(str(Path(__file__).parent / "checkpoints" / "best_model.pt"))
+# Walk line-of-sight paths (string-pulled, then rasterized) instead of
+# the search's staircase of cells
+SMOOTH_PATHS = False
 
 
 def _compute_orientation(prev_pos, curr_pos):
@@ -115,19 +139,40 @@ def _compute_orientation(prev_pos, curr_pos):
     return math.atan2(dr, dc)
 
 
-def _write_state(bots, fires, fire_clusters, stats):
-    """Write current state to IPC file."""
+_plane = None  # StatePlane, created in main()
+_export = {"last": -STATE_EXPORT_INTERVAL_MS, "pending": False}
+
+
+def _write_state(bots, fire_clusters, stats):
+    """Publish current state; the JSON export follows within STATE_EXPORT_INTERVAL_MS."""
+    # Every fire belongs to a cluster, so the label layer carries both;
+    # labels follow each cluster's first cell to stay put between frames
+    labels = np.zeros((GRID_SIZE, GRID_SIZE), dtype=np.int16)
+    for label, cluster in enumerate(sorted(fire_clusters, key=min), start=1):
+        for r, c in cluster:
+            labels[r, c] = label
+    _plane.publish(bots, layers={"clusters": labels}, scalars=stats)
+    _export["pending"] = True
+    _export_state(bots, fire_clusters, stats)
+
+
+def _export_state(bots, fire_clusters, stats):
+    """Write sim_state.json if a publish is pending and the interval has passed."""
+    now = pygame.time.get_ticks()
+    if not _export["pending"] or now - _export["last"] < STATE_EXPORT_INTERVAL_MS:
+        return
     data = {
         "bots": [
             {"pos": list(b["pos"]), "orientation": round(b["orientation"], 4)}
             for b in bots
         ],
-        "fires": [list(f) for f in fires],
         "fire_clusters": [[list(cell) for cell in cluster] for cluster in fire_clusters],
         "active_bots": [i for i, b in enumerate(bots) if b["path"] and b["path_idx"] < len(b["path"])],
         "stats": stats,
     }
     STATE_PATH.write_text(json.dumps(data))
+    _export["last"] = now
+    _export["pending"] = False
 
 
 def _write_screenshot(screen):
@@ -136,21 +181,6 @@ def _write_screenshot(screen):
     pygame.image.save(grid_surface, str(SCREENSHOT_PATH))
 
 
-def _read_commands():
-    """Read and clear command queue from IPC file."""
-    if not COMMANDS_PATH.exists():
-        return []
-    text = COMMANDS_PATH.read_text().strip()
-    if not text:
-        return []
-    try:
-        commands = json.loads(text)
-    except json.JSONDecodeError:
-        return []
-    COMMANDS_PATH.write_text("[]")
-    return commands
-
-
 def _add_task(task_text):
     """Add a task to the task queue."""
     tasks = []
@@ -163,6 +193,7 @@ def _add_task(task_text):
                 tasks = []
     tasks.append(task_text)
     TASKS_PATH.write_text(json.dumps(tasks, indent=2))
+    ring(TASKS_PATH)
 
 
 def random_grid(obstacle_pct=0.10):
@@ -194,6 +225,21 @@ def random_grid(obstacle_pct=0.10):
     return grid
 
 
+def blocked_grid(grid, fires):
+    """Planning grid: obstacles plus burning cells."""
+    blocked = grid.copy()
+    for r, c in fires:
+        blocked[r, c] = 1
+    return blocked
+
+
+def straighten(grid, path):
+    """path with its staircases pulled straight, if SMOOTH_PATHS is set."""
+    if not SMOOTH_PATHS or not path:
+        return path
+    return rasterize(smooth_path(grid, path))
+
+
 def random_free_cell(grid, fires, exclude=set()):
     """Find a random free cell (not obstacle, not fire, not excluded)."""
     attempts = 0
@@ -319,10 +365,27 @@ def make_bot(grid, fires, exclude):
         "path": [],
         "path_idx": 0,
         "visited": set(),
+        "path_id": 0,   # paths started, for arrival events
+        "cmd": None,    # id of the command that started the path
         "last_move": 0,
     }
 
 
+def set_path(events, bot_idx, bot, path, cmd=None):
+    """Start bot on a new path (None if there is none) and publish it."""
+    bot["path_id"] += 1
+    bot["cmd"] = cmd
+    bot["path"] = path or []
+    bot["path_idx"] = 1 if path else 0
+    bot["visited"] = set()
+    if not path:
+        events.bot_event(bot_idx, bot, "failed")
+        return
+    events.bot_event(bot_idx, bot, "start")
+    if len(path) == 1:
+        events.bot_event(bot_idx, bot, "arrived")
+
+
 def draw(screen, font, grid, bots, fires, smoke_particles, stats, input_text):
     """Render the entire scene."""
     # Grid background
@@ -404,8 +467,13 @@ def draw(screen, font, grid, bots, fires, smoke_particles, stats, input_text):
 
 
 def main():
+    global _plane
     FILES_DIR.mkdir(parents=True, exist_ok=True)
-    COMMANDS_PATH.write_text("[]")
+    CommandJournal(COMMANDS_PATH).reset()
+    journal = JournalReader(COMMANDS_PATH, compact_bytes=MAX_BYTES)
+    commands_bell = Doorbell(COMMANDS_PATH)
+    last_command_check = 0
+    events = EventWriter(EVENTS_PATH)
 
     pygame.init()
     screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
@@ -416,6 +484,9 @@ def main():
     grid = random_grid()
     fires = set()
     smoke_particles = []
+    _plane = StatePlane.create(STATE_SHM, grid.shape, NUM_BOTS,
+                               layers={"clusters": np.int16},
+                               scalars=("fires_active", "cells_extinguished"))
 
     # Spawn initial fire cluster
     fires.update(spawn_fire_cluster(grid, fires))
@@ -437,7 +508,11 @@ def main():
     input_text = ""
 
     fire_clusters = find_fire_clusters(fires)
-    _write_state(bots, fires, fire_clusters, stats)
+    _write_state(bots, fire_clusters, stats)
+
+    # Per-bot D* Lite state; paths are repaired when burning cells change
+    replanner = IncrementalPlanner(blocked_grid(grid, fires))
+    planned_fires = set(fires)
 
     print(f"[sim] Fire World running. IPC via {FILES_DIR}")
     print(f"[sim] {NUM_BOTS} bots ready. R=reset world, F=fire at cursor, E=extinguish, Click=move")
@@ -455,6 +530,7 @@ def main():
                     running = False
                 elif event.key == pygame.K_r and not input_text:
                     # Reset world - regenerate grid, bots, and fires
+                    _pf.invalidate_cache()
                     grid = random_grid()
                     fires = set()
                     smoke_particles = []
@@ -468,7 +544,9 @@ def main():
                         "cells_extinguished": 0,
                     }
                     fire_clusters = find_fire_clusters(fires)
-                    _write_state(bots, fires, fire_clusters, stats)
+                    _write_state(bots, fire_clusters, stats)
+                    replanner.reset(blocked_grid(grid, fires))
+                    planned_fires = set(fires)
                     print(f"[sim] World reset: new grid, {NUM_BOTS} bots, {len(fires)} fire cells")
                 elif event.key == pygame.K_e and not input_text:
                     # Manual extinguish for testing
@@ -518,17 +596,23 @@ def main():
                         )
                         bot = bots[nearest]
                         bot["target"] = (tr, tc)
-                        result = _pf.find_path(grid, start=bot["pos"], goal=(tr, tc))
+                        planning = blocked_grid(grid, fires)
+                        result = straighten(
+                            planning, _pf.find_path(planning, start=bot["pos"], goal=(tr, tc))
+                        )
+                        set_path(events, nearest, bot, result)
                         if result:
-                            bot["path"] = result
-                            bot["path_idx"] = 1
+                            replanner.plan(nearest, bot["pos"], (tr, tc), path=result)
                         else:
-                            bot["path"] = []
-                            bot["path_idx"] = 0
-                        bot["visited"] = set()
+                            replanner.drop(nearest)
 
         # Check for commands from main.py
-        commands = _read_commands()
+        commands = []
+        if commands_bell.rung() or pygame.time.get_ticks() - last_command_check >= COMMAND_POLL_MS:
+            commands = journal.read()
+            last_command_check = pygame.time.get_ticks()
+        moves = {}  # bot_idx -> goal, planned together after the loop
+        cmd_ids = {}  # bot_idx -> id of the move_to command, if any
         for cmd in commands:
             action = cmd.get("action")
             bot_idx = cmd.get("bot", 0)
@@ -542,17 +626,13 @@ def main():
                 tr, tc = int(tr), int(tc)
                 if 0 <= tr < GRID_SIZE and 0 <= tc < GRID_SIZE and grid[tr, tc] == 0:
                     bot["target"] = (tr, tc)
-                    result = _pf.find_path(grid, start=bot["pos"], goal=(tr, tc))
-                    if result:
-                        bot["path"] = result
-                        bot["path_idx"] = 1
-                        print(f"[sim] Bot {bot_idx}: moving to ({tr}, {tc}) -- {len(result)} steps")
-                    else:
-                        print(f"[sim] Bot {bot_idx}: no path to ({tr}, {tc})")
-                        bot["path"] = []
-                        bot["path_idx"] = 0
-                    bot["visited"] = set()
-            
+                    moves[bot_idx] = (tr, tc)
+                    cmd_ids[bot_idx] = cmd.get("id")
+                else:
+                    # Rejected: the bot carries on with its current path
+                    print(f"[sim] Bot {bot_idx}: invalid target ({tr}, {tc})")
+                    events.bot_event(bot_idx, bot, "failed", cmd.get("id"))
+
             elif action == "extinguish":
                 cluster = extinguish_cluster(bot["pos"], fire_clusters)
                 if cluster:
@@ -566,6 +646,28 @@ def main():
                 else:
                     print(f"[sim] Bot {bot_idx}: no fire cluster adjacent to {bot['pos']}")
 
+        # Plan this frame's moves together: one batched forward pass for
+        # all goals, one flow field for goals shared by several bots, and
+        # JPS+ for the long cross-map runs (tables built once per grid)
+        if moves:
+            planning = blocked_grid(grid, fires)
+            plans, plan_stats = _pf.find_paths_batch(
+                planning,
+                [(bots[i]["pos"], goal) for i, goal in moves.items()],
+                mode="jps+", shared_flow=True, return_stats=True,
+            )
+            print(f"[sim] {plan_stats}")
+            for (bot_idx, (tr, tc)), result in zip(moves.items(), plans):
+                bot = bots[bot_idx]
+                result = straighten(planning, result)
+                set_path(events, bot_idx, bot, result, cmd_ids[bot_idx])
+                if result:
+                    replanner.plan(bot_idx, bot["pos"], (tr, tc), path=result)
+                    print(f"[sim] Bot {bot_idx}: moving to ({tr}, {tc}) -- {len(result)} steps")
+                else:
+                    print(f"[sim] Bot {bot_idx}: no path to ({tr}, {tc})")
+                    replanner.drop(bot_idx)
+
         # Spawn new fire clusters periodically
         if now - last_fire_spawn >= FIRE_SPAWN_INTERVAL:
             new_fires = spawn_fire_cluster(grid, fires, exclude={b["pos"] for b in bots})
@@ -581,6 +683,30 @@ def main():
                 fires.update(new_fires)
             last_fire_spread = now
 
+        # Repair the paths of moving bots around cells that caught fire or
+        # were put out since the last frame
+        changed = fires ^ planned_fires
+        if changed:
+            planning = blocked_grid(grid, fires)
+            replanner.update(planning, changed)
+            planned_fires = set(fires)
+            moving = {i: b["pos"] for i, b in enumerate(bots) if b["path"]}
+            for i, result in replanner.repair(moving).items():
+                bot = bots[i]
+                result = straighten(planning, result)
+                if result:
+                    # Same path id: waiters see a longer path, not a new one
+                    bot["path"] = result
+                    bot["path_idx"] = 1
+                    print(f"[sim] Bot {i}: path repaired -- {len(result)} steps")
+                else:
+                    print(f"[sim] Bot {i}: target {bot['target']} cut off by fire, stopping")
+                    events.bot_event(i, bot, "failed")
+                    bot["path"] = []
+                    bot["path_idx"] = 0
+                    bot["target"] = None
+                    replanner.drop(i)
+
         # Animate bots along their paths
         state_changed = False
         for i, bot in enumerate(bots):
@@ -597,8 +723,13 @@ def main():
                     bot["orientation"] = new_orient
 
                 if bot["path_idx"] >= len(bot["path"]):
+                    events.bot_event(i, bot, "arrived")
                     bot["target"] = None
                     bot["path"] = []
+                    replanner.drop(i)
+                else:
+                    events.bot_event(i, bot, "progress")
+        events.flush()
 
         # Update fire clusters
         fire_clusters = find_fire_clusters(fires)
@@ -608,7 +739,9 @@ def main():
         smoke_particles = [p for p in smoke_particles if p.update()]
 
         if state_changed or len(smoke_particles) > 0:
-            _write_state(bots, fires, fire_clusters, stats)
+            _write_state(bots, fire_clusters, stats)
+        else:
+            _export_state(bots, fire_clusters, stats)
 
         # Save screenshot periodically
         if now - last_screenshot >= SCREENSHOT_INTERVAL_MS:
@@ -618,6 +751,8 @@ def main():
         draw(screen, font, grid, bots, fires, smoke_particles, stats, input_text)
         clock.tick(FPS)
 
+    commands_bell.close()
+    _plane.close()
     pygame.quit()
     sys.exit()
 
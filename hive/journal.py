@@ -0,0 +1,173 @@
+"""
+Append-only command journal between the actions and a simulation.
+
+Commands used to go through a JSON list file: every writer read the whole
+list, appended, and rewrote it under a lock that only covered its own
+process, and the simulation rewrote "[]" after reading. A write landing
+between the simulation's read and its truncation was lost, and every
+write cost a parse and rewrite of the whole queue.
+
+The journal is a file of length-prefixed records, one per batch, after
+an 8-byte header:
+
+    <uint64 little-endian generation>
+    <uint32 little-endian length><JSON list of commands>
+    ...
+
+CommandJournal.append() writes one batch (a whole wave of mimic moves,
+or a single move_to) as one record with one write() under an exclusive
+flock, so appends from any number of threads and processes never
+interleave, then rings the journal's doorbell. Each JournalReader keeps
+its own offset and returns only the complete records past it; a record
+still being written is picked up on the next read. The simulation's
+reader also compacts the file: once it has consumed everything and the
+file is past compact_bytes, it truncates it under the same lock and bumps
+the generation, as reset() does. Other readers compare the generation
+on every read and start over from the first record when it changed, even
+if the file has grown back past their offset since.
+
+Usage (actions):
+    journal = CommandJournal(COMMANDS_PATH)
+    journal.append([{"action": "move_to", "bot": 3, "target": [10, 20]}])
+
+Usage (simulation):
+    CommandJournal(COMMANDS_PATH).reset()      # at startup
+    commands = JournalReader(COMMANDS_PATH, compact_bytes=MAX_BYTES)
+    for cmd in commands.read():                # every frame
+        ...
+"""
+
+import fcntl
+import json
+import os
+import struct
+
+from doorbell import ring
+
+# The consumer truncates a fully read journal past this size
+MAX_BYTES = 1024 * 1024
+
+_LENGTH = struct.Struct("<I")
+_GENERATION = struct.Struct("<Q")
+_HEADER = _GENERATION.size
+
+
+class _Locked:
+    """Open path for appending and hold an exclusive flock on it (header written if new)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        if os.fstat(self.fd).st_size < _HEADER:
+            _restart(self.fd, 0)
+        return self.fd
+
+    def __exit__(self, *exc):
+        os.close(self.fd)  # releases the lock
+
+
+def _generation(fd):
+    """Generation in the header of an open journal, or None before it is written."""
+    data = os.pread(fd, _HEADER, 0)
+    return _GENERATION.unpack(data)[0] if len(data) == _HEADER else None
+
+
+def _restart(fd, generation):
+    """Truncate a locked journal to a bare header with the given generation."""
+    os.ftruncate(fd, 0)
+    os.write(fd, _GENERATION.pack(generation))  # O_APPEND: lands at offset 0
+
+
+class CommandJournal:
+    """Writer side: appends batches of commands as single records."""
+
+    def __init__(self, path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def append(self, commands):
+        """Append commands (a list of JSON-serializable dicts) as one record."""
+        if not commands:
+            return
+        payload = json.dumps(commands).encode()
+        record = _LENGTH.pack(len(payload)) + payload
+        with _Locked(self.path) as fd:
+            view = memoryview(record)
+            while view:
+                view = view[os.write(fd, view):]
+        ring(self.path)
+
+    def reset(self):
+        """Drop every record (the simulation does this when it starts)."""
+        with _Locked(self.path) as fd:
+            _restart(fd, _generation(fd) + 1)
+
+
+class JournalReader:
+    """
+    Consumer side: returns the commands appended since the last read.
+
+    Args:
+        path:          journal file
+        from_start:    read records already in the file (default), or only
+                       those appended after the reader was made
+        compact_bytes: truncate the file once it has been read to the end
+                       and is at least this large (None = never; give it
+                       to one reader per journal, the simulation)
+    """
+
+    def __init__(self, path, from_start=True, compact_bytes=None):
+        self.path = path
+        self.compact_bytes = compact_bytes
+        self.offset = _HEADER
+        self.generation = None
+        if not from_start and path.exists():
+            with open(path, "rb") as f:
+                self.generation = _generation(f.fileno())
+                self.offset = max(_HEADER, os.fstat(f.fileno()).st_size)
+
+    def read(self):
+        """Commands of every complete record past this reader's offset, oldest first."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            generation = _generation(f.fileno())
+            if generation is None:
+                return []
+            if generation != self.generation:
+                # Compacted or reset since the last read (or first read)
+                if self.generation is not None:
+                    self.offset = _HEADER
+                self.generation = generation
+            if os.fstat(f.fileno()).st_size <= self.offset:
+                return []
+            f.seek(self.offset)
+            data = f.read()
+        commands = []
+        pos = 0
+        while pos + _LENGTH.size <= len(data):
+            (length,) = _LENGTH.unpack_from(data, pos)
+            end = pos + _LENGTH.size + length
+            if end > len(data):
+                break  # still being written
+            try:
+                commands.extend(json.loads(data[pos + _LENGTH.size:end]))
+            except json.JSONDecodeError:
+                pass
+            pos = end
+        self.offset += pos
+
+        if self.compact_bytes is not None and self.offset >= self.compact_bytes:
+            with _Locked(self.path) as fd:
+                # Nothing new since the read
+                if (_generation(fd) == self.generation
+                        and os.fstat(fd).st_size == self.offset):
+                    self.generation += 1
+                    _restart(fd, self.generation)
+                    self.offset = _HEADER
+        return commands
@@ -13,7 +13,8 @@ Then run main.py — it communicates with the simulation via files.
 
 Flow:
     1. Reads init.md, runs the init prompt to generate a world document
-    2. Starts a poll loop (every 3s):
+    2. Starts a task loop, woken by the tasks.json doorbell as soon as a task
+       is added (and at least every POLL_INTERVAL seconds when idle):
        a. Refreshes world state via detect_world_state (screenshot + bots → matrix)
        b. Saves state to files/state.json
        c. Checks files/tasks.json — if tasks exist, sends to LLM which returns
@@ -30,6 +31,8 @@ import importlib
 import inspect
 from pathlib import Path
 
+from doorbell import Doorbell, ring
+from events import DONE, EventReader
 from ohm import chat
 from prompts import init_prompt, action_prompt, verify_prompt
 
@@ -37,7 +40,10 @@ HIVE_DIR = Path(__file__).parent
 TASKS_FILE = HIVE_DIR / "files" / "tasks.json"
 WORLD_FILE = HIVE_DIR / "files" / "world.md"
 STATE_FILE = HIVE_DIR / "files" / "state.json"
-POLL_INTERVAL = 3
+# Idle wakeups back off from POLL_MIN to POLL_INTERVAL seconds; a new
+# task rings the doorbell and is picked up at once
+POLL_MIN = 1
+POLL_INTERVAL = 10
 
 DEFAULT_MODEL = "claude-sonnet-4-5-20250929"
 
@@ -62,6 +68,7 @@ def add_task(task_text):
     tasks = load_tasks()
     tasks.append(task_text)
     save_tasks(tasks)
+    ring(TASKS_FILE)
 
 
 def get_available_actions():
@@ -118,10 +125,30 @@ def run_init(world_dir: Path):
     return world_doc
 
 
-def _wait_for_bot_idle(bot_id, timeout=30, poll=0.5):
-    """Wait until the bot finishes its current movement or timeout."""
+def _wait_for_bot_idle(bot_id, timeout=30, poll=0.5, reader=None):
+    """
+    Wait until the bot finishes its current movement or timeout.
+
+    With reader (an EventReader made before the move was sent) this blocks
+    on the simulation's events: the bot's first new path, then its arrival.
+    Worlds without an event file fall back to polling active_bots.
+    """
     start = time.time()
     print(f"[exec] Bot {bot_id}: waiting for movement to finish...")
+    if reader is not None:
+        event = reader.wait(lambda e: e["bot"] == bot_id and e["event"] in ("start",) + DONE,
+                            timeout)
+        if event is not None and event["event"] == "start":
+            path_id = event["path"]
+            event = reader.wait(lambda e: (e["bot"] == bot_id and e["event"] in DONE
+                                           and e["path"] >= path_id),
+                                timeout - (time.time() - start))
+        if event is None:
+            print(f"[exec] Bot {bot_id}: timeout waiting for movement")
+            return False
+        print(f"[exec] Bot {bot_id}: movement {event['event']}")
+        return event["event"] == "arrived"
+
     time.sleep(1.0)
     while time.time() - start < timeout:
         try:
@@ -161,6 +188,12 @@ def _run_bot_sequence(bot_id, calls):
         if "bot_id" not in sig.parameters and "bot_id" in params:
             params.pop("bot_id")
 
+        # Listen for the bot's events from before the command goes out
+        reader = None
+        events_path = getattr(_actions_module, "EVENTS_PATH", None)
+        if fn_name in ("move_to", "push_and_exit") and events_path is not None:
+            reader = EventReader(events_path)
+
         print(f"[exec] Bot {bot_id}: {fn_name}({params})")
         try:
             result = fn(**params)
@@ -171,7 +204,7 @@ def _run_bot_sequence(bot_id, calls):
 
         # Wait for movement commands to finish before next call
         if fn_name in ("move_to", "push_and_exit"):
-            _wait_for_bot_idle(bot_id)
+            _wait_for_bot_idle(bot_id, reader=reader)
 
 
 def execute_task(task, world_doc, state, available_actions):
@@ -342,18 +375,22 @@ def main():
     t = threading.Thread(target=input_thread, daemon=True)
     t.start()
 
-    # Step 3: Poll loop
-    print(f"\n[loop] Running every {POLL_INTERVAL}s... (type commands below)\n")
+    # Step 3: Task loop
+    print("\n[loop] Waiting for tasks... (type commands below)\n")
+    tasks_bell = Doorbell(TASKS_FILE, min_timeout=POLL_MIN, max_timeout=POLL_INTERVAL)
+    idle = False
 
     try:
         while True:
             # Refresh world state
-            print("[loop] Refreshing state...")
+            if not idle:
+                print("[loop] Refreshing state...")
             state = refresh_state()
 
             # Check for tasks
             tasks = load_tasks()
             if tasks:
+                idle = False
                 task = tasks.pop(0)
                 print(f"[loop] Executing task: {task}")
 
@@ -372,14 +409,19 @@ def main():
 
                 save_tasks(tasks)
                 print(f"[loop] {len(tasks)} task(s) remaining")
-            else:
-                print("[loop] No tasks.")
+                print()
+                continue
 
-            print()
-            time.sleep(POLL_INTERVAL)
+            if not idle:
+                print("[loop] No tasks.")
+                print()
+                idle = True
+            tasks_bell.wait()
 
     except KeyboardInterrupt:
         print("\n[loop] Stopped.")
+    finally:
+        tasks_bell.close()
 
 
 if __name__ == "__main__":
@@ -2,13 +2,16 @@
 Mimic World actions — exposed to main.py / LLM.
 
 Coordinates 50 bots to arrange into shapes by sending pathfinding
-requests to Modal and writing move commands to the simulation.
+requests to the local pathfinding service or Modal and writing move
+commands to the simulation.
 
-Hand tracking mode: captures webcam every 5s, detects hand via
-MediaPipe, asks Claude what shape the hand is forming, and
-calls form_shape accordingly.
+Hand tracking mode: a capture thread streams webcam frames into
+MediaPipe's LIVE_STREAM hand landmarker, and the tracking loop moves
+the bots onto the latest hand pose.
 """
 
+import collections
+import itertools
 import json
 import math
 import time
@@ -19,40 +22,95 @@ import numpy as np
 import cv2
 import mediapipe as mediapipe
 from pathlib import Path
-from scipy.optimize import linear_sum_assignment
 
 # Add parent dir for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from events import DONE, EventReader
+from journal import CommandJournal
+from pathfinding.assignment import TargetAssigner
+from pathfinding.reservation import plan_waves
+from pathfinding.search import GridGraph, grid_digest
+from pathfinding.service import connect
+from state_plane import StateReader, bot_list
 
 GRID_SIZE = 64
 WEBCAM_INDEX = 1  # MacBook Pro Camera
-HAND_CHECK_INTERVAL = 1
+HAND_CHECK_INTERVAL = 0.1  # minimum seconds between hand-pose dispatches
+# Frames kept by the capture thread (results arrive a few frames late)
+FRAME_BUFFER = 8
+# Seconds between debug dumps of the tracked frame to WEBCAM_PATH (None = off)
+WEBCAM_DUMP_INTERVAL = 5.0
+# A hand target that moved by at most this many cells (Chebyshev) still
+# counts as the same target: its bot keeps going to where it was sent
+RETARGET_TOLERANCE = 1
 
 # IPC file paths
 FILES_DIR = Path(__file__).parent.parent / "files"
 STATE_PATH = FILES_DIR / "mimic_state.json"
+GRID_PATH = FILES_DIR / "mimic_grid.json"
 SCREENSHOT_PATH = FILES_DIR / "mimic_screenshot.png"
 WEBCAM_PATH = FILES_DIR / "webcam_frame.png"
-COMMANDS_PATH = FILES_DIR / "mimic_commands.json"
-
-_cmd_lock = threading.Lock()
+COMMANDS_PATH = FILES_DIR / "mimic_commands.journal"
+EVENTS_PATH = FILES_DIR / "mimic_events.jsonl"
+STATE_SHM = "openhive_mimic"
+
+# Upper bound on one simulation step (a frame at 30 FPS is ~33 ms); a wave
+# wait gives up after this per step of its longest path
+WAVE_STEP_TIMEOUT_S = 0.1
+# Hand dispatch replans its waves while kept bots advance during planning,
+# at most this many times
+HAND_REPLANS = 3
+
+_journal = CommandJournal(COMMANDS_PATH)
+_dispatch_ids = itertools.count(1)
+_assigner = TargetAssigner()  # distance fields cached across dispatches
+_state_reader = StateReader(STATE_SHM)  # shared-memory state from the simulation
+# Last grid read from GRID_PATH, for the JSON fallback (re-read on a new version)
+_json_grid = {"version": None, "grid": None}
+# Hand tracking's current targets: bot -> cell it was last sent to, and the
+# grid they were planned on; reset whenever another action moves the swarm
+_hand_targets = {}
+_hand_grid = None
+_hand_paths = {}  # bot -> (command id, timed path) sent to its hand target
+_hand_steps = {}  # command id -> step reached on its timed path (None: failed)
+_hand_reader = None  # EventReader feeding _hand_steps, from the first hand dispatch
 _hand_tracking_active = False
 _tracking_thread = None
 
 
 def _read_state():
-    """Read current simulation state."""
+    """
+    Read current simulation state from the state plane (grid as a numpy
+    array), or from the JSON export if the plane is unavailable.
+    """
+    snap = _state_reader.snapshot()
+    if snap is not None:
+        state = {"bots": bot_list(snap), "grid": snap["grid"], "num_bots": len(snap["pos"])}
+        if snap["target_shape"]:
+            state["target_shape"] = snap["target_shape"]
+        return state
     if not STATE_PATH.exists():
         return {}
     try:
-        return json.loads(STATE_PATH.read_text())
-    except (json.JSONDecodeError, KeyError):
+        state = json.loads(STATE_PATH.read_text())
+        # The grid is exported separately, once per version
+        version = state.pop("grid_version", None)
+        if version is not None and version != _json_grid["version"]:
+            exported = json.loads(GRID_PATH.read_text())
+            _json_grid.update(version=exported["version"], grid=np.array(exported["grid"]))
+        if _json_grid["grid"] is not None and "grid" not in state:
+            state["grid"] = _json_grid["grid"]
+        return state
+    except (OSError, json.JSONDecodeError, KeyError):
         return {}
 
 
 def _get_state():
     """Return current world state (called by main.py poll loop)."""
-    return _read_state()
+    state = _read_state()
+    if isinstance(state.get("grid"), np.ndarray):
+        state["grid"] = state["grid"].tolist()
+    return state
 
 
 def _get_screenshot():
@@ -78,50 +136,38 @@ def _to_native(obj):
 
 
 def _send_commands(commands):
-    """Write move commands to IPC file for simulation."""
-    with _cmd_lock:
-        existing = []
-        if COMMANDS_PATH.exists():
-            text = COMMANDS_PATH.read_text().strip()
-            if text:
-                try:
-                    existing = json.loads(text)
-                except json.JSONDecodeError:
-                    existing = []
-        existing.extend(_to_native(commands))
-        COMMANDS_PATH.write_text(json.dumps(existing))
+    """Append move commands to the simulation's journal as one record."""
+    _journal.append(_to_native(commands))
 
 
-def _assign_bots_to_targets(bot_positions, target_positions):
+def _assign_bots_to_targets(grid, bot_positions, target_positions):
     """
-    Optimal assignment of bots to targets using Hungarian algorithm.
-    Minimizes total manhattan distance across all assignments.
+    Optimal assignment of bots to targets by path length around obstacles.
+
+    Bots already on a target keep it; the rest are matched on exact
+    distance fields (cached per target across calls) with the Hungarian
+    algorithm. See pathfinding.assignment.
 
     Returns:
         list of (bot_idx, target_idx) pairs
     """
-    n_bots = len(bot_positions)
-    n_targets = len(target_positions)
-    n = max(n_bots, n_targets)
-
-    # Build cost matrix (manhattan distance)
-    cost = np.zeros((n, n), dtype=np.float64)
-    for i in range(n_bots):
-        for j in range(n_targets):
-            br, bc = bot_positions[i]
-            tr, tc = target_positions[j]
-            cost[i, j] = abs(br - tr) + abs(bc - tc)
-
-    row_ind, col_ind = linear_sum_assignment(cost)
-    assignments = []
-    for i, j in zip(row_ind, col_ind):
-        if i < n_bots and j < n_targets:
-            assignments.append((i, j))
+    stats = {}
+    t0 = time.perf_counter()
+    assignments = _assigner.assign(grid, bot_positions, target_positions, stats=stats)
+    print(f"[actions] Assignment: {stats['kept']} kept, {stats['solved']} solved, "
+          f"{stats.get('fields', 0)} new fields, {(time.perf_counter() - t0) * 1000:.0f} ms")
     return assignments
 
 
 def _find_paths_modal(grid, requests):
-    """Send pathfinding requests to Modal. Falls back to local if unavailable."""
+    """
+    Send pathfinding requests to the local pathfinding service if it is
+    running (move_world/pathfind_server.py), else to Modal. Falls back to
+    local A* if neither is available.
+    """
+    results = _find_paths_service(grid, requests)
+    if results is not None:
+        return results
     try:
         import modal
         Pathfinder = modal.Cls.from_name("mimic-world-pathfinder", "Pathfinder")
@@ -134,98 +180,137 @@ def _find_paths_modal(grid, requests):
         return _find_paths_local(grid, requests)
 
 
-def _build_waves(results):
+def _plan_timed_waves(grid, results, bots, parked=None, reserved=()):
     """
-    Group paths into non-overlapping waves to avoid collisions.
+    Collision-free timed paths for every result, so bots start together.
 
-    Two paths overlap if they share any grid cell. Paths in the same
-    wave can move simultaneously. Waves are dispatched sequentially.
+    Paths are re-timed on a space-time reservation table
+    (pathfinding.reservation): bots wait in place where they would meet.
+    Each step of a timed path is one simulation frame (MOVE_DELAY_MS is
+    shorter than a frame, so every moving bot steps once per frame). Bots
+    that cannot be fit go in a later wave, planned with the earlier waves
+    parked on their targets. Bots without a result hold their position,
+    unless parked gives the cells to keep clear instead; reserved holds
+    the remaining timed paths of bots already on their way.
 
     Returns:
         list of waves, where each wave is a list of result dicts
     """
-    waves = []
-    for result in results:
-        if not result["path"]:
-            continue
-        path_cells = set(tuple(p) for p in result["path"])
-
-        # Try to fit into an existing wave
-        placed = False
-        for wave in waves:
-            conflict = False
-            for existing in wave:
-                existing_cells = set(tuple(p) for p in existing["path"])
-                if path_cells & existing_cells:
-                    conflict = True
-                    break
-            if not conflict:
-                wave.append(result)
-                placed = True
-                break
+    if parked is None:
+        moving = {r["bot_id"] for r in results}
+        parked = [tuple(b["pos"]) for i, b in enumerate(bots) if i not in moving]
+    requests = [(tuple(r["path"][0]), tuple(r["path"][-1])) for r in results]
+
+    stats = {}
+    t0 = time.perf_counter()
+    waves = plan_waves(grid, requests, parked, [r["path"] for r in results],
+                       reserved=reserved, stats=stats)
+    print(f"[actions] Reservation plan: {stats['planned']}/{len(results)} bots, "
+          f"{stats['waves']} wave(s), makespan {stats['makespan']} steps, "
+          f"{(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    return [
+        [{"bot_id": results[i]["bot_id"], "path": [list(p) for p in path],
+          "length": len(path)} for i, path in wave.items()]
+        for wave in waves
+    ]
+
+
+def _send_wave(wave, dispatch_id):
+    """Send a wave's move_to commands, tagging each result with its command id."""
+    commands = []
+    for result in wave:
+        result["id"] = f"{dispatch_id}-{result['bot_id']}"
+        commands.append({
+            "id": result["id"],
+            "action": "move_to",
+            "bot": result["bot_id"],
+            "target": result["path"][-1],
+            "path": result["path"],
+        })
+    _send_commands(commands)
 
-        if not placed:
-            waves.append([result])
 
-    return waves
+def _wait_for_wave(reader, sent, next_wave, progress):
+    """
+    Block until next_wave can start, from the simulation's bot events.
 
+    next_wave was planned with every earlier wave parked on its targets,
+    so it only has to wait for each bot already sent to get past the last
+    cell it shares with next_wave's paths — not for those bots to arrive.
+    That covers every earlier wave, not just the latest: a slow bot from
+    wave 1 can still be in the way of wave 3. progress ({command id:
+    furthest path index reached, inf once done}) carries what earlier
+    waits saw over to the next one. Gives up after WAVE_STEP_TIMEOUT_S
+    per step of the longest path.
 
-def _wait_for_wave(wave, move_delay_ms=10):
-    """Wait for the longest path in a wave to finish.
+    Args:
+        reader:    EventReader made before the first wave was sent
+        sent:      the waves sent so far
+        next_wave: the wave to start next
+        progress:  dict shared by the waits of one dispatch
 
-    Each step takes move_delay_ms in the simulation, so we wait
-    (longest_path * move_delay_ms) + a small buffer.
+    Returns:
+        True if the conflicts cleared, False on timeout
     """
-    longest = max(r["length"] for r in wave)
-    wait_secs = (longest * move_delay_ms / 1000.0) + 0.1
-    time.sleep(wait_secs)
+    sent = [r for wave in sent for r in wave]
+    cells = {tuple(p) for r in next_wave for p in r["path"]}
+    pending = {}  # command id -> last path index shared with next_wave
+    for r in sent:
+        last = max((i for i, p in enumerate(r["path"]) if tuple(p) in cells), default=-1)
+        if last >= 0 and progress.get(r["id"], -1) <= last:
+            pending[r["id"]] = last
+
+    bot_of = {r["id"]: r["bot_id"] for r in sent}
+    deadline = time.time() + WAVE_STEP_TIMEOUT_S * max(r["length"] for r in sent)
+    while pending:
+        event = reader.wait(lambda e: e.get("cmd") in bot_of, deadline - time.time())
+        if event is None:
+            print(f"[actions] Timed out waiting for bots {sorted(bot_of[c] for c in pending)}")
+            return False
+        cmd = event["cmd"]
+        if event["event"] in DONE:
+            progress[cmd] = math.inf
+        else:
+            progress[cmd] = max(progress.get(cmd, -1), event["idx"])
+        if cmd in pending and progress[cmd] > pending[cmd]:
+            del pending[cmd]
+    return True
 
 
-def _find_paths_local(grid, requests):
-    """Fallback: local A* without neural heuristic."""
-    import heapq
-
-    DIRS = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
-            (-1, -1, 1.414), (-1, 1, 1.414), (1, -1, 1.414), (1, 1, 1.414)]
-
-    def astar(grid, start, goal):
-        h, w = grid.shape
-        sr, sc = start
-        gr, gc = goal
-        g_cost = {(sr, sc): 0.0}
-        parent = {(sr, sc): None}
-        closed = set()
-        heuristic = lambda r, c: abs(r - gr) + abs(c - gc)
-        heap = [(heuristic(sr, sc), 0.0, sr, sc)]
-        while heap:
-            _f, g, r, c = heapq.heappop(heap)
-            if (r, c) in closed:
-                continue
-            closed.add((r, c))
-            if (r, c) == (gr, gc):
-                path = []
-                node = (gr, gc)
-                while node is not None:
-                    path.append(list(node))
-                    node = parent[node]
-                path.reverse()
-                return path
-            for dr, dc, mc in DIRS:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < h and 0 <= nc < w and grid[nr, nc] == 0:
-                    ng = g + mc
-                    if (nr, nc) not in g_cost or ng < g_cost[(nr, nc)]:
-                        g_cost[(nr, nc)] = ng
-                        parent[(nr, nc)] = (r, c)
-                        heapq.heappush(heap, (ng + heuristic(nr, nc), ng, nr, nc))
+def _find_paths_service(grid, requests):
+    """Neural A* on the local pathfinding service, or None if it is down."""
+    pf = connect()
+    if pf is None:
+        return None
+    try:
+        paths = pf.find_paths_batch(grid, [(req["start"], req["goal"]) for req in requests])
+    except OSError as e:
+        print(f"[actions] Pathfinding service failed ({e})")
         return None
+    print(f"[actions] Pathfinding service returned {len(paths)} results")
+    return [
+        {
+            "bot_id": req["bot_id"],
+            "path": [list(p) for p in path] if path else None,
+            "length": len(path) if path else 0,
+        }
+        for req, path in zip(requests, paths)
+    ]
+
 
+def _find_paths_local(grid, requests):
+    """Fallback: local A* without neural heuristic (Manhattan distance)."""
+    graph = GridGraph(grid, diag_cost=1.414)
+    rows, cols = np.indices(grid.shape)
     results = []
     for req in requests:
-        path = astar(grid, tuple(req["start"]), tuple(req["goal"]))
+        gr, gc = req["goal"]
+        h = np.abs(rows - gr) + np.abs(cols - gc)
+        path = graph.astar(tuple(req["start"]), (gr, gc), h)
         results.append({
             "bot_id": req["bot_id"],
-            "path": path,
+            "path": [list(p) for p in path] if path else None,
             "length": len(path) if path else 0,
         })
     return results
@@ -242,6 +327,7 @@ _HandLandmarkerOptions = mediapipe.tasks.vision.HandLandmarkerOptions
 _BaseOptions = mediapipe.tasks.BaseOptions
 _MPImage = mediapipe.Image
 _MPImageFormat = mediapipe.ImageFormat
+_RunningMode = mediapipe.tasks.vision.RunningMode
 
 # Lazy-loaded landmarker (created once, reused)
 _landmarker = None
@@ -267,24 +353,65 @@ GRID_PAD = 4  # padding from grid edges
 
 
 def _get_landmarker():
-    """Get or create the MediaPipe HandLandmarker (singleton)."""
+    """
+    Get or create the MediaPipe HandLandmarker (singleton).
+
+    Runs in LIVE_STREAM mode: frames go in with detect_async() and results
+    come back on _on_hand_result, so tracking carries over between frames
+    instead of detecting the hand from scratch on every image.
+    """
     global _landmarker
     if _landmarker is None:
         with _landmarker_lock:
             if _landmarker is None:
                 options = _HandLandmarkerOptions(
                     base_options=_BaseOptions(model_asset_path=_HAND_MODEL_PATH),
+                    running_mode=_RunningMode.LIVE_STREAM,
                     num_hands=1,
                     min_hand_detection_confidence=0.3,
                     min_hand_presence_confidence=0.3,
+                    result_callback=_on_hand_result,
                 )
                 _landmarker = _HandLandmarker.create_from_options(options)
     return _landmarker
 
 
+# Latest landmarker result: (frame timestamp ms, landmarks or None)
+_hand_result = None
+_hand_cond = threading.Condition()
+
+
+def _on_hand_result(result, _image, timestamp_ms):
+    """LIVE_STREAM callback (MediaPipe's thread): publish the newest result."""
+    global _hand_result
+    landmarks = result.hand_landmarks[0] if result.hand_landmarks else None
+    with _hand_cond:
+        _hand_result = (timestamp_ms, landmarks)
+        _hand_cond.notify_all()
+
+
+def _wait_for_hand(after_ms, timeout):
+    """
+    First landmarker result for a frame newer than after_ms.
+
+    Returns:
+        (timestamp ms, landmarks or None), or None after timeout seconds
+    """
+    with _hand_cond:
+        if _hand_cond.wait_for(lambda: _hand_result is not None and _hand_result[0] > after_ms,
+                               timeout):
+            return _hand_result
+    return None
+
+
 _cap = None
 _cap_lock = threading.Lock()
 
+# Ring buffer of the newest (timestamp ms, BGR frame) pairs from the camera
+_frames = collections.deque(maxlen=FRAME_BUFFER)
+_frames_lock = threading.Lock()
+_capture_thread = None
+
 
 def _get_camera():
     """Get or open the persistent webcam capture."""
@@ -303,26 +430,49 @@ def _get_camera():
     return _cap
 
 
-def _capture_webcam():
-    """Grab the latest frame from the persistent webcam stream."""
-    cap = _get_camera()
-    if cap is None or not cap.isOpened():
-        return None
-    ret, frame = cap.read()
-    if not ret:
-        print("[hand] Failed to read frame")
-        return None
-    cv2.imwrite(str(WEBCAM_PATH), frame)
-    return frame
+def _capture_loop():
+    """
+    Capture thread: read frames as fast as the camera delivers them.
 
+    Each frame goes into the ring buffer and straight to the landmarker,
+    so neither the camera nor inference ever waits on the tracking loop.
+    """
+    global _cap
+    last_ms = 0
+    try:
+        while _hand_tracking_active:
+            cap = _get_camera()
+            if cap is None or not cap.isOpened():
+                time.sleep(1.0)
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                print("[hand] Failed to read frame")
+                time.sleep(0.1)
+                continue
+
+            # LIVE_STREAM needs strictly increasing timestamps
+            timestamp_ms = max(int(time.monotonic() * 1000), last_ms + 1)
+            last_ms = timestamp_ms
+            with _frames_lock:
+                _frames.append((timestamp_ms, frame))
 
-def _detect_hand(frame):
-    """Use MediaPipe to detect hand landmarks. Returns landmarks list or None."""
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    mp_image = _MPImage(image_format=_MPImageFormat.SRGB, data=rgb)
-    result = _get_landmarker().detect(mp_image)
-    if result.hand_landmarks:
-        return result.hand_landmarks[0]
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            mp_image = _MPImage(image_format=_MPImageFormat.SRGB, data=rgb)
+            _get_landmarker().detect_async(mp_image, timestamp_ms)
+    finally:
+        with _cap_lock:
+            if _cap is not None:
+                _cap.release()
+                _cap = None
+
+
+def _frame_at(timestamp_ms):
+    """The buffered frame with this timestamp, or None if it was overwritten."""
+    with _frames_lock:
+        for ts, frame in reversed(_frames):
+            if ts == timestamp_ms:
+                return frame
     return None
 
 
@@ -402,11 +552,97 @@ def _landmarks_to_targets(landmarks, n_bots):
     return targets
 
 
-def _dispatch_to_targets(target_positions):
+def _match_targets(current, targets, tolerance):
+    """
+    Split a new target set against the targets bots were last sent to.
+
+    Each (bot, old target) claims the closest new target within tolerance
+    cells (Chebyshev), closest pairs first.
+
+    Returns:
+        (kept, moved): kept is {bot: old target} for bots whose target is
+        still there, moved the indices of new targets nobody claimed
+    """
+    if not current or not targets:
+        return {}, list(range(len(targets)))
+    bot_ids = list(current)
+    old = np.array([current[b] for b in bot_ids])
+    new = np.array(targets)
+    dist = np.abs(old[:, None, :] - new[None, :, :]).max(axis=2)
+    close = np.argwhere(dist <= tolerance)
+    close = close[np.argsort(dist[close[:, 0], close[:, 1]], kind="stable")]
+
+    kept = {}
+    claimed = set()
+    for i, j in close.tolist():
+        if bot_ids[i] not in kept and j not in claimed:
+            kept[bot_ids[i]] = current[bot_ids[i]]
+            claimed.add(j)
+    return kept, [j for j in range(len(targets)) if j not in claimed]
+
+
+def _update_hand_steps():
+    """Fold the simulation's new events for hand commands into _hand_steps."""
+    lengths = {cmd: len(path) for cmd, path in _hand_paths.values()}
+    for event in _hand_reader.poll():
+        cmd = event.get("cmd")
+        if cmd not in lengths or _hand_steps.get(cmd, 0) is None:
+            continue
+        if event["event"] == "failed":
+            _hand_steps[cmd] = None
+        elif event["event"] == "arrived":
+            _hand_steps[cmd] = lengths[cmd] - 1
+        else:
+            _hand_steps[cmd] = max(_hand_steps.get(cmd, 0), event["idx"])
+
+
+def _kept_steps(kept):
+    """Step each kept bot has reached on its hand path (None if it has none)."""
+    return {b: _hand_steps.get(_hand_paths[b][0], 0) if b in _hand_paths else None
+            for b in kept}
+
+
+def _hold_cells(bots, kept, moving, steps):
+    """
+    Cells the bots that are not replanned keep clear, for _plan_timed_waves.
+
+    A kept bot still on its way reserves the rest of its timed path from
+    the step it has reached (steps, from its events; waits included, so
+    a bot partway through a wait keeps only the rest of it). Any other
+    bot parks where it stands, and a kept bot whose path failed also keeps
+    its target clear.
+
+    Returns:
+        (parked cells, reserved timed paths)
+    """
+    parked, reserved = [], []
+    for i, b in enumerate(bots):
+        if i in moving:
+            continue
+        step = steps.get(i)
+        if step is not None and step < len(_hand_paths[i][1]) - 1:
+            reserved.append(_hand_paths[i][1][step:])
+            continue
+        parked.append(tuple(b["pos"]))
+        if i in kept:
+            parked.append(tuple(kept[i]))  # may still be heading there
+    return parked, reserved
+
+
+def _dispatch_to_targets(target_positions, tolerance=RETARGET_TOLERANCE):
     """
     Move bots to arbitrary target positions using the same
-    Hungarian + wave dispatch pipeline as form_shape.
+    Hungarian + reservation dispatch pipeline as form_shape.
+
+    Incremental across calls: targets within tolerance cells of where a
+    bot was last sent count as unchanged, and that bot keeps going (no
+    new command). Only bots whose target went away are reassigned to the
+    targets that appeared, replanned and redispatched; if no target moved
+    nothing is planned at all.
     """
+    global _hand_targets, _hand_grid, _hand_paths, _hand_steps, _hand_reader
+    if _hand_reader is None:
+        _hand_reader = EventReader(EVENTS_PATH)  # before the first hand command
     state = _read_state()
     if not state or "bots" not in state:
         return "No simulation state — is simulation.py running?"
@@ -440,20 +676,36 @@ def _dispatch_to_targets(target_positions):
                             break
 
     n_assign = min(len(bots), len(valid_targets))
-    bot_positions = [tuple(b["pos"]) for b in bots[:n_assign]]
-
-    assignments = _assign_bots_to_targets(bot_positions, valid_targets[:n_assign])
-
+    valid_targets = valid_targets[:n_assign]
+
+    # Keep the bots whose target is (nearly) unchanged
+    digest = grid_digest(grid)
+    current = _hand_targets if digest == _hand_grid else {}
+    current = {b: t for b, t in current.items() if b < n_assign}
+    kept, moved = _match_targets(current, valid_targets, tolerance)
+    if not moved:
+        return f"Gesture unchanged — {len(kept)} bots kept"
+    print(f"[hand] Retarget: {n_assign - len(kept)} replanned, {len(kept)} kept")
+
+    free_bots = [i for i in range(n_assign) if i not in kept]
+    bot_positions = [tuple(bots[i]["pos"]) for i in free_bots]
+    new_targets = [valid_targets[j] for j in moved]
+    assignments = _assign_bots_to_targets(grid, bot_positions, new_targets)
+
+    targets = dict(kept)
     path_requests = []
     for bot_idx, target_idx in assignments:
+        bot_id = free_bots[bot_idx]
         bp = bot_positions[bot_idx]
-        tp = valid_targets[target_idx]
+        tp = new_targets[target_idx]
+        targets[bot_id] = tp
         if bp != tp:
             path_requests.append({
-                "bot_id": bot_idx,
+                "bot_id": bot_id,
                 "start": list(bp),
                 "goal": list(tp),
             })
+    _hand_targets, _hand_grid = targets, digest
 
     if not path_requests:
         return "Bots already in position"
@@ -463,44 +715,83 @@ def _dispatch_to_targets(target_positions):
 
     valid_results = [r for r in results if r["path"]]
     if not valid_results:
+        _hand_targets = kept
         return "No paths found"
 
-    waves = _build_waves(valid_results)
+    # Kept bots still on their way keep the rest of their timed path; they
+    # keep stepping while this plans, so replan until the plan starts from
+    # the steps they have actually reached
+    moving = {r["bot_id"] for r in valid_results}
+    _update_hand_steps()
+    steps = _kept_steps(kept)
+    for _attempt in range(HAND_REPLANS):
+        parked, reserved = _hold_cells(bots, kept, moving, steps)
+        waves = _plan_timed_waves(grid, valid_results, bots, parked, reserved)
+        _update_hand_steps()
+        planned_from, steps = steps, _kept_steps(kept)
+        if steps == planned_from:
+            break
+    else:
+        print("[hand] Kept bots still moving after replanning; sending the last plan")
     print(f"[hand] {len(valid_results)} paths, {len(waves)} waves")
 
+    # Bots that could not be sent are free for the next cycle
+    sent = {r["bot_id"] for wave in waves for r in wave}
+    unsent = {r["bot_id"] for r in path_requests} - sent
+    _hand_targets = {b: t for b, t in targets.items() if b not in unsent}
+    _hand_paths = {b: p for b, p in _hand_paths.items() if b in kept}
+
+    dispatch_id = next(_dispatch_ids)
+    reader = EventReader(EVENTS_PATH)
+    progress = {}  # command id -> furthest path index, across the waves
     for wave_idx, wave in enumerate(waves):
-        commands = []
-        for result in wave:
-            commands.append({
-                "action": "move_to",
-                "bot": result["bot_id"],
-                "target": result["path"][-1],
-                "path": result["path"],
-            })
-        _send_commands(commands)
+        _send_wave(wave, dispatch_id)
         if wave_idx < len(waves) - 1:
-            _wait_for_wave(wave)
+            _wait_for_wave(reader, waves[:wave_idx + 1], waves[wave_idx + 1], progress)
 
+    _hand_paths.update((r["bot_id"], (r["id"], r["path"])) for wave in waves for r in wave)
+    live = {cmd for cmd, _path in _hand_paths.values()}
+    _hand_steps = {cmd: step for cmd, step in _hand_steps.items() if cmd in live}
     return f"{len(valid_results)} bots dispatched in {len(waves)} waves"
 
 
 def _hand_tracking_loop():
-    """Background loop: webcam → mediapipe → landmarks → dispatch bots."""
-    global _hand_tracking_active
+    """
+    Background loop: webcam → mediapipe → landmarks → dispatch bots.
+
+    Frames and landmarks come from the capture thread; each cycle takes
+    the newest result and dispatches at most every HAND_CHECK_INTERVAL.
+    Dispatch is change-gated (see _dispatch_to_targets): a steady hand
+    plans nothing, and a changed pose only moves the bots it affects.
+    """
+    global _capture_thread
 
     print(f"[hand] Tracking started (webcam {WEBCAM_INDEX}, every {HAND_CHECK_INTERVAL}s)")
+    _capture_thread = threading.Thread(target=_capture_loop, daemon=True)
+    _capture_thread.start()
 
+    last_ms = int(time.monotonic() * 1000)  # results from an earlier run are stale
+    last_dump = 0.0
+    hand_seen = None
     while _hand_tracking_active:
-        frame = _capture_webcam()
-        if frame is None:
-            time.sleep(HAND_CHECK_INTERVAL)
+        hand = _wait_for_hand(last_ms, timeout=1.0)
+        if hand is None:
             continue
+        last_ms, landmarks = hand
+
+        if WEBCAM_DUMP_INTERVAL is not None and time.time() - last_dump >= WEBCAM_DUMP_INTERVAL:
+            frame = _frame_at(last_ms)
+            if frame is not None:
+                cv2.imwrite(str(WEBCAM_PATH), frame)
+                last_dump = time.time()
 
-        landmarks = _detect_hand(frame)
         if landmarks is None:
-            print("[hand] No hand detected — holding position")
+            if hand_seen is not False:
+                print("[hand] No hand detected — holding position")
+            hand_seen = False
             time.sleep(HAND_CHECK_INTERVAL)
             continue
+        hand_seen = True
 
         # Read bot count from state
         state = _read_state()
@@ -508,9 +799,9 @@ def _hand_tracking_loop():
 
         targets = _landmarks_to_targets(landmarks, n_bots)
 
-        print(f"[hand] Hand detected — {len(targets)} target positions")
         result = _dispatch_to_targets(targets)
-        print(f"[hand] {result}")
+        if not result.startswith("Gesture unchanged"):  # quiet while the hand holds still
+            print(f"[hand] {result}")
 
         time.sleep(HAND_CHECK_INTERVAL)
 
@@ -523,14 +814,17 @@ def _hand_tracking_loop():
 
 def form_shape(shape_name):
     """
-    Arrange bots into a shape using wave-based dispatch.
+    Arrange bots into a shape using reservation-planned dispatch.
 
     1. Generates target positions for the shape
     2. Skips any target that lands on an obstacle (no bot placed there)
-    3. Assigns remaining bots to remaining targets (Hungarian algorithm)
+    3. Assigns remaining bots to remaining targets (Hungarian algorithm
+       on path lengths around obstacles)
     4. Computes all paths via Modal (neural A*)
-    5. Groups paths into non-overlapping waves
-    6. Dispatches waves sequentially so bots don't collide
+    5. Times the paths on a space-time reservation table so they never
+       meet; bots that cannot be fit go in a later wave
+    6. Dispatches each wave at once; the next wave starts as soon as the
+       simulation's events show this one has cleared its cells
 
     Args:
         shape_name: one of "circle", "square", "triangle", "star", "grid"
@@ -538,6 +832,7 @@ def form_shape(shape_name):
     Returns:
         str — summary of the operation
     """
+    global _hand_targets
     from simulation import SHAPES
 
     if shape_name not in SHAPES:
@@ -570,7 +865,7 @@ def form_shape(shape_name):
     bot_positions = [tuple(b["pos"]) for b in bots[:n_assign]]
 
     # Optimal assignment
-    assignments = _assign_bots_to_targets(bot_positions, target_positions[:n_assign])
+    assignments = _assign_bots_to_targets(grid, bot_positions, target_positions[:n_assign])
 
     # Build pathfinding requests
     path_requests = []
@@ -586,6 +881,7 @@ def form_shape(shape_name):
 
     if not path_requests:
         return f"All bots already in {shape_name} formation!"
+    _hand_targets = {}  # the swarm leaves the hand pose
 
     # Compute all paths via Modal
     print(f"[actions] Computing {len(path_requests)} paths via Modal...")
@@ -596,26 +892,21 @@ def form_shape(shape_name):
     if not valid_results:
         return f"No paths found for shape '{shape_name}'"
 
-    # Group into non-overlapping waves
-    waves = _build_waves(valid_results)
+    # Time the paths against each other so the bots can start together
+    waves = _plan_timed_waves(grid, valid_results, bots)
     print(f"[actions] {len(valid_results)} paths split into {len(waves)} waves")
 
     # Dispatch waves sequentially
+    dispatch_id = next(_dispatch_ids)
+    reader = EventReader(EVENTS_PATH)
+    progress = {}  # command id -> furthest path index, across the waves
     for wave_idx, wave in enumerate(waves):
         print(f"[actions] Wave {wave_idx + 1}/{len(waves)}: {len(wave)} bots")
-        commands = []
-        for result in wave:
-            commands.append({
-                "action": "move_to",
-                "bot": result["bot_id"],
-                "target": result["path"][-1],
-                "path": result["path"],
-            })
-        _send_commands(commands)
+        _send_wave(wave, dispatch_id)
 
-        # Wait for this wave to finish before sending next
+        # Start the next wave as soon as this one is out of its way
         if wave_idx < len(waves) - 1:
-            _wait_for_wave(wave)
+            _wait_for_wave(reader, waves[:wave_idx + 1], waves[wave_idx + 1], progress)
 
     return (
         f"Shape '{shape_name}': {len(valid_results)}/{len(path_requests)} paths found, "
@@ -650,6 +941,7 @@ def move_bot(target_pos, bot_id=0):
     results = _find_paths_modal(grid, [{"bot_id": bot_id, "start": start, "goal": goal}])
 
     if results and results[0]["path"]:
+        _hand_targets.pop(bot_id, None)
         _send_commands([{
             "action": "move_to",
             "bot": bot_id,
@@ -686,9 +978,9 @@ def get_positions(bot_id=None):
 
 def start_hand_tracking():
     """
-    Start webcam hand tracking. Captures a photo every 5 seconds,
-    detects hand via MediaPipe, asks Claude what shape the gesture
-    represents, and calls form_shape automatically.
+    Start webcam hand tracking. Streams the webcam through MediaPipe's
+    hand landmarker and moves the bots onto the hand pose whenever it
+    changes (up to 1 / HAND_CHECK_INTERVAL times a second).
 
     Returns:
         str — confirmation message
@@ -699,7 +991,7 @@ def start_hand_tracking():
     _hand_tracking_active = True
     _tracking_thread = threading.Thread(target=_hand_tracking_loop, daemon=True)
     _tracking_thread.start()
-    return "Hand tracking started — checking webcam every 5s"
+    return f"Hand tracking started — following the hand every {HAND_CHECK_INTERVAL}s"
 
 
 def stop_hand_tracking():
@@ -709,13 +1001,13 @@ def stop_hand_tracking():
     Returns:
         str — confirmation message
     """
-    global _hand_tracking_active, _cap
+    global _hand_tracking_active
     if not _hand_tracking_active:
         return "Hand tracking is not running"
     _hand_tracking_active = False
-    if _cap is not None:
-        _cap.release()
-        _cap = None
+    # The capture thread releases the camera once its current read returns
+    if _capture_thread is not None:
+        _capture_thread.join(timeout=2.0)
     return "Hand tracking stopped"
 
 
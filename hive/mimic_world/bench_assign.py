@@ -0,0 +1,122 @@
+"""
+Bot-to-target assignment benchmark: Manhattan Hungarian vs. TargetAssigner.
+
+Each trial scatters bots and targets over one of the simulation's random
+grids and assigns them three ways:
+
+    manhattan  the old _assign_bots_to_targets(): cost matrix filled in a
+               Python double loop, Hungarian solve, obstacles ignored
+    cold       TargetAssigner on a fresh instance (every field computed)
+    settled    the hand-tracking case: the bots have reached their
+               targets and --moved of the targets shift by a few cells
+
+Reported per method: time, and the total path length of the assignment
+measured around obstacles (what the bots will actually drive).
+
+    python bench_assign.py
+    python bench_assign.py --bots 100 500 1000 --trials 3 --moved 0.1
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pathfinding.assignment import TargetAssigner
+
+from bench_dispatch import load_simulation
+
+
+def manhattan_assign(bots, targets):
+    """The assignment TargetAssigner replaced (unchanged)."""
+    n_bots = len(bots)
+    n_targets = len(targets)
+    n = max(n_bots, n_targets)
+
+    cost = np.zeros((n, n), dtype=np.float64)
+    for i in range(n_bots):
+        for j in range(n_targets):
+            br, bc = bots[i]
+            tr, tc = targets[j]
+            cost[i, j] = abs(br - tr) + abs(bc - tc)
+
+    row_ind, col_ind = linear_sum_assignment(cost)
+    return [(i, j) for i, j in zip(row_ind, col_ind) if i < n_bots and j < n_targets]
+
+
+def shift_targets(grid, targets, fraction, rng):
+    """Move fraction of the targets by up to two cells onto free, unused cells."""
+    H, W = grid.shape
+    targets = list(targets)
+    used = set(targets)
+    for k in rng.sample(range(len(targets)), int(len(targets) * fraction)):
+        r, c = targets[k]
+        for _ in range(20):
+            cand = (r + rng.randint(-2, 2), c + rng.randint(-2, 2))
+            if (0 <= cand[0] < H and 0 <= cand[1] < W and grid[cand] == 0
+                    and cand not in used):
+                used.discard(targets[k])
+                used.add(cand)
+                targets[k] = cand
+                break
+    return targets
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bot-to-target assignment")
+    parser.add_argument("--bots", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--moved", type=float, default=0.1,
+                        help="fraction of targets shifted between settled calls")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random_grid, _shapes = load_simulation(max(args.bots))
+    print(f"{'bots':>6}  {'method':<11}{'ms':>9}{'path length':>13}")
+    for n in args.bots:
+        rows = {"manhattan": [], "cold": [], "settled": []}
+        for trial in range(args.trials):
+            rng = random.Random(args.seed + trial)
+            random.seed(args.seed + trial)
+            grid = random_grid()
+            free = [tuple(c) for c in np.argwhere(grid == 0).tolist()]
+            cells = rng.sample(free, 2 * n)
+            bots, targets = cells[:n], cells[n:]
+
+            # Path lengths of every pair, to score each method the same way
+            scorer = TargetAssigner()
+            cost = scorer.cost_matrix(grid, bots, targets)
+
+            pairs, ms = timed(manhattan_assign, bots, targets)
+            rows["manhattan"].append((ms, sum(cost[i, j] for i, j in pairs)))
+
+            assigner = TargetAssigner()
+            pairs, ms = timed(assigner.assign, grid, bots, targets)
+            rows["cold"].append((ms, sum(cost[i, j] for i, j in pairs)))
+
+            settled = list(bots)
+            for i, j in pairs:
+                settled[i] = targets[j]
+            moved = shift_targets(grid, targets, args.moved, rng)
+            pairs, ms = timed(assigner.assign, grid, settled, moved)
+            cost = scorer.cost_matrix(grid, settled, moved)
+            rows["settled"].append((ms, sum(cost[i, j] for i, j in pairs)))
+
+        for method, runs in rows.items():
+            ms, length = np.mean(runs, axis=0)
+            print(f"{n:>6}  {method:<11}{ms:>9.1f}{length:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Command IPC benchmark: JSON list file vs. append-only journal.
+
+Writer processes send waves of move commands while a consumer process
+polls once per frame, as the simulation does:
+
+    json     the old scheme: each writer reads sim_commands.json, appends
+             and rewrites it; the consumer reads it and rewrites "[]"
+    journal  CommandJournal.append() (one record per wave) and a
+             JournalReader that compacts the file as it goes
+
+Reported per scheme: commands written per second, mean time per wave
+write, and commands lost (written but never seen by the consumer).
+
+    python bench_commands.py
+    python bench_commands.py --writers 1 4 --waves 200 --wave-size 100
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from journal import CommandJournal, JournalReader
+
+
+def json_send(path, commands):
+    """The writer the journal replaced (a per-process lock guarded it, so none here)."""
+    existing = []
+    if path.exists():
+        text = path.read_text().strip()
+        if text:
+            try:
+                existing = json.loads(text)
+            except json.JSONDecodeError:
+                existing = []
+    existing.extend(commands)
+    path.write_text(json.dumps(existing))
+
+
+def json_consumer(path):
+    """The simulation's old _read_commands()."""
+    if not path.exists():
+        return []
+    text = path.read_text().strip()
+    if not text:
+        return []
+    try:
+        commands = json.loads(text)
+    except json.JSONDecodeError:
+        return []
+    path.write_text("[]")
+    return commands
+
+
+def writer(scheme, path, writer_id, waves, wave_size, out):
+    journal = CommandJournal(path)
+    total = 0.0
+    for k in range(waves):
+        wave = [{"action": "move_to", "bot": b, "target": [k % 64, b % 64],
+                 "id": f"{writer_id}-{k}-{b}"} for b in range(wave_size)]
+        t0 = time.perf_counter()
+        if scheme == "json":
+            json_send(path, wave)
+        else:
+            journal.append(wave)
+        total += time.perf_counter() - t0
+    out.put(total)
+
+
+def consumer(scheme, path, frame_s, done, out):
+    reader = JournalReader(path, compact_bytes=256 * 1024)
+    seen = set()
+    idle = 0
+    while idle < 3:
+        commands = json_consumer(path) if scheme == "json" else reader.read()
+        seen.update(c["id"] for c in commands)
+        idle = idle + 1 if done.is_set() and not commands else 0
+        time.sleep(frame_s)
+    out.put(len(seen))
+
+
+def run(scheme, n_writers, waves, wave_size, frame_s):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / ("commands.json" if scheme == "json" else "commands.journal")
+        if scheme == "json":
+            path.write_text("[]")
+        else:
+            CommandJournal(path).reset()
+        done = mp.Event()
+        seen_q, time_q = mp.Queue(), mp.Queue()
+        cons = mp.Process(target=consumer, args=(scheme, path, frame_s, done, seen_q))
+        cons.start()
+        writers = [mp.Process(target=writer, args=(scheme, path, w, waves, wave_size, time_q))
+                   for w in range(n_writers)]
+        t0 = time.perf_counter()
+        for p in writers:
+            p.start()
+        write_s = [time_q.get() for _ in writers]
+        elapsed = time.perf_counter() - t0
+        for p in writers:
+            p.join()
+        done.set()
+        seen = seen_q.get()
+        cons.join()
+
+    sent = n_writers * waves * wave_size
+    return {
+        "rate": sent / elapsed,
+        "wave_ms": 1000 * sum(write_s) / (n_writers * waves),
+        "lost": sent - seen,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark command IPC schemes")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--waves", type=int, default=100)
+    parser.add_argument("--wave-size", type=int, default=100)
+    parser.add_argument("--frame-ms", type=float, default=33.0,
+                        help="consumer poll interval (one simulation frame)")
+    args = parser.parse_args()
+
+    print(f"{'writers':>7}  {'scheme':<8}{'cmds/s':>11}{'ms/wave':>9}{'lost':>8}")
+    for n in args.writers:
+        for scheme in ("json", "journal"):
+            r = run(scheme, n, args.waves, args.wave_size, args.frame_ms / 1000)
+            print(f"{n:>7}  {scheme:<8}{r['rate']:>11.0f}{r['wave_ms']:>9.2f}{r['lost']:>8}")
+
+
+if __name__ == "__main__":
+    main()
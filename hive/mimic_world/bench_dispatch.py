@@ -0,0 +1,157 @@
+"""
+Swarm dispatch benchmark: cell-disjoint waves vs. reservation planning.
+
+Each trial places the simulation's bots on one of its random grids,
+assigns them to a shape (TargetAssigner on path lengths, as actions.py
+does), plans single-bot paths, and dispatches them two ways:
+
+    waves        the old _build_waves(): paths that share any cell go in
+                 different waves, which run one after another
+    reservation  pathfinding.reservation.plan_waves(): paths are timed on
+                 a (cell, step) reservation table and start together
+
+Reported per method: planning time, number of waves, and makespan in
+simulation steps (frames) until the last bot arrives. Waves run back to
+back, so their makespan is the sum of each wave's longest path.
+
+    python bench_dispatch.py
+    python bench_dispatch.py --bots 200 --trials 5 --shapes circle star
+"""
+
+import argparse
+import ast
+import math
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pathfinding.assignment import TargetAssigner
+from pathfinding.reservation import plan_waves
+from pathfinding.search import GridGraph
+
+SIM_PATH = Path(__file__).parent / "simulation.py"
+SHAPES = ("circle", "square", "triangle", "star", "grid")
+
+
+def load_simulation(num_bots):
+    """
+    random_grid() and the SHAPES table of simulation.py, read from the
+    source: importing it opens a pygame window.
+    """
+    tree = ast.parse(SIM_PATH.read_text())
+    keep = [node for node in tree.body
+            if (isinstance(node, ast.FunctionDef)
+                and (node.name == "random_grid" or node.name.startswith("shape_")))
+            or (isinstance(node, ast.Assign)
+                and any(getattr(t, "id", None) == "SHAPES" for t in node.targets))]
+    namespace = {"np": np, "math": math, "random": random,
+                 "GRID_SIZE": 64, "NUM_BOTS": num_bots}
+    exec(compile(ast.Module(keep, []), str(SIM_PATH), "exec"), namespace)
+    return namespace["random_grid"], namespace["SHAPES"]
+
+
+def build_waves(results):
+    """The wave builder reservation planning replaced (unchanged)."""
+    waves = []
+    for result in results:
+        if not result["path"]:
+            continue
+        path_cells = set(tuple(p) for p in result["path"])
+
+        placed = False
+        for wave in waves:
+            conflict = False
+            for existing in wave:
+                existing_cells = set(tuple(p) for p in existing["path"])
+                if path_cells & existing_cells:
+                    conflict = True
+                    break
+            if not conflict:
+                wave.append(result)
+                placed = True
+                break
+
+        if not placed:
+            waves.append([result])
+
+    return waves
+
+
+def make_trial(random_grid, shape_fn, num_bots, seed):
+    """(grid, bot positions, single-bot path results) for one trial."""
+    random.seed(seed)
+    grid = random_grid()
+    free = [tuple(c) for c in np.argwhere(grid == 0).tolist()]
+    bots = random.sample(free, num_bots)
+
+    targets = []
+    for r, c in shape_fn():
+        if grid[r, c] == 0 and (r, c) not in targets:
+            targets.append((r, c))
+    n = min(len(bots), len(targets))
+    pairs = TargetAssigner().assign(grid, bots[:n], targets[:n])
+
+    graph = GridGraph(grid)
+    results = []
+    for i, j in pairs:
+        if bots[i] != targets[j]:
+            path = graph.astar(bots[i], targets[j])
+            if path:
+                results.append({"bot_id": int(i), "path": [list(p) for p in path],
+                                "length": len(path)})
+    return grid, bots, results
+
+
+def run_waves(results):
+    t0 = time.perf_counter()
+    waves = build_waves(results)
+    ms = (time.perf_counter() - t0) * 1000
+    makespan = sum(max(r["length"] for r in wave) - 1 for wave in waves)
+    return {"ms": ms, "waves": len(waves), "makespan": makespan, "placed": len(results)}
+
+
+def run_reservation(grid, bots, results):
+    moving = {r["bot_id"] for r in results}
+    parked = [p for i, p in enumerate(bots) if i not in moving]
+    requests = [(tuple(r["path"][0]), tuple(r["path"][-1])) for r in results]
+    stats = {}
+    t0 = time.perf_counter()
+    plan_waves(grid, requests, parked, [r["path"] for r in results], stats=stats)
+    ms = (time.perf_counter() - t0) * 1000
+    return {"ms": ms, "waves": stats["waves"], "makespan": stats["makespan"],
+            "placed": stats["planned"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark swarm dispatch planners")
+    parser.add_argument("--bots", type=int, default=100)
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=SHAPES)
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random_grid, shapes = load_simulation(args.bots)
+    print(f"{'shape':<10}{'method':<13}{'paths':>7}{'placed':>8}{'waves':>7}"
+          f"{'makespan':>10}{'plan ms':>10}")
+    for shape in args.shapes:
+        rows = {"waves": [], "reservation": []}
+        n_paths = []
+        for trial in range(args.trials):
+            grid, bots, results = make_trial(random_grid, shapes[shape], args.bots,
+                                             args.seed + trial)
+            n_paths.append(len(results))
+            rows["waves"].append(run_waves(results))
+            rows["reservation"].append(run_reservation(grid, bots, results))
+        for method, runs in rows.items():
+            mean = {k: float(np.mean([r[k] for r in runs])) for k in runs[0]}
+            print(f"{shape:<10}{method:<13}{np.mean(n_paths):>7.1f}{mean['placed']:>8.1f}"
+                  f"{mean['waves']:>7.1f}{mean['makespan']:>10.1f}{mean['ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+State publishing benchmark: full JSON per frame vs. the versioned plane.
+
+Bots random-walk on one of the simulation's grids (--moving of them step
+each frame) and every frame is published and then read back:
+
+    json      the old _write_state(): bots and the whole grid as JSON each
+              frame; the reader parses all of it
+    snapshot  StatePlane.publish() and a full StatePlane.snapshot()
+    delta     StatePlane.publish() and StateReader.changes(), which only
+              copies what changed since its last call
+
+Reported per scheme: bytes written per frame and per second at the
+simulation's 30 FPS, and the time per read. Bytes for the plane count
+what publish() stores: the moved bots, their change-log entries, and the
+seqlock counter (the grid is unchanged after the first frame).
+
+    python bench_state.py
+    python bench_state.py --bots 100 500 1000 --frames 300 --moving 0.5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from state_plane import StatePlane, StateReader
+
+from bench_dispatch import load_simulation
+
+FPS = 30
+# Bytes publish() writes per moved bot: pos, orientation, active, log entry
+BOT_BYTES = 2 * 2 + 4 + 1 + (8 + 2 + 2 * 2 + 4 + 1)
+
+
+def json_state(bots, grid):
+    """The mimic world's old per-frame state (unchanged)."""
+    return json.dumps({
+        "bots": [
+            {"pos": list(b["pos"]), "orientation": round(b["orientation"], 4)}
+            for b in bots
+        ],
+        "grid": grid.tolist(),
+        "num_bots": len(bots),
+    })
+
+
+def step(grid, bots, moving, rng):
+    """Move a random moving fraction of the bots one free cell; returns how many moved."""
+    H, W = grid.shape
+    moved = 0
+    for b in rng.sample(bots, int(len(bots) * moving)):
+        r, c = b["pos"]
+        dr, dc = rng.choice([(-1, 0), (1, 0), (0, -1), (0, 1)])
+        if 0 <= r + dr < H and 0 <= c + dc < W and grid[r + dr, c + dc] == 0:
+            b["pos"] = (r + dr, c + dc)
+            b["orientation"] = float(np.arctan2(dr, dc))
+            moved += 1
+    return moved
+
+
+def run(grid, n, frames, moving, seed):
+    rng = random.Random(seed)
+    free = [tuple(c) for c in np.argwhere(grid == 0).tolist()]
+    cells = rng.sample(free, n)
+    make = lambda: [{"pos": p, "orientation": 0.0, "path": [p], "path_idx": 0} for p in cells]
+    results = {}
+
+    # json
+    bots = make()
+    written = 0
+    read_s = 0.0
+    for _ in range(frames):
+        step(grid, bots, moving, rng)
+        text = json_state(bots, grid)
+        written += len(text)
+        t0 = time.perf_counter()
+        state = json.loads(text)
+        np.array(state["grid"])
+        read_s += time.perf_counter() - t0
+    results["json"] = (written / frames, read_s / frames)
+
+    for scheme in ("snapshot", "delta"):
+        rng = random.Random(seed)
+        rng.sample(free, n)
+        bots = make()
+        name = f"openhive_bench_{os.getpid()}"
+        plane = StatePlane.create(name, grid.shape, n)
+        reader = StateReader(name)
+        plane.publish(bots, grid=grid)
+        reader.changes()
+        written = 0
+        read_s = 0.0
+        for _ in range(frames):
+            moved = step(grid, bots, moving, rng)
+            plane.publish(bots, grid=grid)
+            written += moved * BOT_BYTES + 16
+            t0 = time.perf_counter()
+            if scheme == "snapshot":
+                plane.snapshot()
+            else:
+                reader.changes()
+            read_s += time.perf_counter() - t0
+        results[scheme] = (written / frames, read_s / frames)
+        reader.plane().close()
+        plane.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark state publishing")
+    parser.add_argument("--bots", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--moving", type=float, default=1.0,
+                        help="fraction of bots that step each frame")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random_grid, _shapes = load_simulation(max(args.bots))
+    random.seed(args.seed)
+    grid = random_grid()
+    print(f"{'bots':>6}  {'scheme':<9}{'B/frame':>10}{'KB/s':>9}{'read us':>10}")
+    for n in args.bots:
+        for scheme, (per_frame, read_s) in run(grid, n, args.frames, args.moving, args.seed).items():
+            print(f"{n:>6}  {scheme:<9}{per_frame:>10.0f}{per_frame * FPS / 1024:>9.1f}"
+                  f"{read_s * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
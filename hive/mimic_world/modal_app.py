@@ -18,6 +18,7 @@ app = modal.App("mimic-world-pathfinder")
 
 # Image with model code + checkpoint mounted at runtime
 move_world_dir = str(Path(__file__).parent.parent / "move_world")
+pathfinding_dir = str(Path(__file__).parent.parent / "pathfinding")
 
 pathfinder_image = (
     modal.Image.debian_slim(python_version="3.11")
@@ -27,6 +28,11 @@ pathfinder_image = (
         remote_path="/root/move_world",
         ignore=lambda p: not str(p).endswith((".py", ".pt")),
     )
+    .add_local_dir(
+        pathfinding_dir,
+        remote_path="/root/pathfinding",
+        ignore=lambda p: not str(p).endswith(".py"),
+    )
 )
 
 
@@ -43,7 +49,8 @@ class Pathfinder:
     """Neural A* pathfinder running on GPU.
 
     Model loads once per container via @modal.enter.
-    Each request runs a single forward pass + A* search.
+    find_path runs a single forward pass + A* search; find_paths_batch
+    runs one batched forward pass for all goals, then the A* searches.
     Up to 50 concurrent requests per container.
     """
 
@@ -66,14 +73,18 @@ class Pathfinder:
             goal: [row, col]
 
         Returns:
-            {"path": [[r,c], ...], "length": int} or {"path": None, "length": 0}
+            {"path": [[r,c], ...], "length": int, "stats": dict} or
+            {"path": None, "length": 0, "stats": dict}; stats is the
+            call's PlanStats (timings, nodes expanded, cache hits)
         """
         import numpy as np
         grid = np.array(grid_list, dtype=np.int32)
-        path = self.pf.find_path(grid, tuple(start), tuple(goal))
+        path, stats = self.pf.find_path(grid, tuple(start), tuple(goal),
+                                        return_stats=True)
         if path is None:
-            return {"path": None, "length": 0}
-        return {"path": [list(p) for p in path], "length": len(path)}
+            return {"path": None, "length": 0, "stats": stats.as_dict()}
+        return {"path": [list(p) for p in path], "length": len(path),
+                "stats": stats.as_dict()}
 
     @modal.method()
     def find_paths_batch(self, grid_list: list, requests: list) -> list:
@@ -88,11 +99,11 @@ class Pathfinder:
         """
         import numpy as np
         grid = np.array(grid_list, dtype=np.int32)
+        paths = self.pf.find_paths_batch(
+            grid, [(req["start"], req["goal"]) for req in requests]
+        )
         results = []
-        for req in requests:
-            start = tuple(req["start"])
-            goal = tuple(req["goal"])
-            path = self.pf.find_path(grid, start, goal)
+        for req, path in zip(requests, paths):
             if path is None:
                 results.append({"bot_id": req["bot_id"], "path": None, "length": 0})
             else:
@@ -103,6 +114,11 @@ class Pathfinder:
                 })
         return results
 
+    @modal.method()
+    def stats(self) -> dict:
+        """PlanStats totals of this container since it started."""
+        return self.pf.stats_info()
+
 
 @app.local_entrypoint()
 def main():
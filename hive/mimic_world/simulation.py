@@ -2,9 +2,11 @@
 Mimic World simulation — 50 bots arranging into shapes.
 
 Standalone process — communicates with main.py via files:
-    Writes:  files/mimic_state.json      (all bot positions, every frame)
+    Writes:  shared memory "openhive_mimic" (bot positions + grid, every change)
+             files/mimic_state.json      (JSON export of the bots, ~1 s, debugging)
+             files/mimic_grid.json       (JSON export of the grid, on regeneration)
              files/mimic_screenshot.png   (grid image, every ~500ms)
-    Reads:   files/mimic_commands.json    (move commands from actions.py)
+    Reads:   files/mimic_commands.journal (move commands from actions.py)
 
 Controls:
     1-5     — load shape preset (circle, square, triangle, star, grid)
@@ -22,6 +24,12 @@ from pathlib import Path
 import numpy as np
 import pygame
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from doorbell import Doorbell, ring
+from events import EventWriter
+from journal import MAX_BYTES, CommandJournal, JournalReader
+from state_plane import StatePlane
+
 GRID_SIZE = 64
 CELL_PX = 10
 GRID_PX = GRID_SIZE * CELL_PX
@@ -31,6 +39,8 @@ WINDOW_H = GRID_PX + INPUT_HEIGHT
 FPS = 30
 MOVE_DELAY_MS = 10
 SCREENSHOT_INTERVAL_MS = 500
+STATE_EXPORT_INTERVAL_MS = 1000
+COMMAND_POLL_MS = 1000  # journal re-check when no doorbell ring arrives
 NUM_BOTS = 100
 
 COLOR_FREE = (30, 30, 30)
@@ -45,9 +55,12 @@ COLOR_STATUS = (200, 200, 200)
 # IPC file paths
 FILES_DIR = Path(__file__).parent.parent / "files"
 STATE_PATH = FILES_DIR / "mimic_state.json"
+GRID_PATH = FILES_DIR / "mimic_grid.json"
 SCREENSHOT_PATH = FILES_DIR / "mimic_screenshot.png"
-COMMANDS_PATH = FILES_DIR / "mimic_commands.json"
+COMMANDS_PATH = FILES_DIR / "mimic_commands.journal"
+EVENTS_PATH = FILES_DIR / "mimic_events.jsonl"
 TASKS_PATH = FILES_DIR / "tasks.json"
+STATE_SHM = "openhive_mimic"
 
 
 def _hsv_to_rgb(h, s, v):
@@ -225,6 +238,8 @@ def make_bots(grid, n=NUM_BOTS):
             "target": None,
             "path": [],
             "path_idx": 0,
+            "path_id": 0,   # paths started, for arrival events
+            "cmd": None,    # id of the command that started the path
             "last_move": 0,
         })
     return bots
@@ -238,20 +253,67 @@ def _compute_orientation(prev, curr):
     return math.atan2(dr, dc)
 
 
+def move_to(events, grid, bot_idx, bot, cmd):
+    """
+    Apply a move_to command carrying its planned path.
+
+    An out-of-bounds or obstacle target is rejected: the bot keeps its
+    current path and only a "failed" event for the command goes out.
+    """
+    tr, tc = int(cmd["target"][0]), int(cmd["target"][1])
+    if not (0 <= tr < GRID_SIZE and 0 <= tc < GRID_SIZE and grid[tr, tc] == 0):
+        events.bot_event(bot_idx, bot, "failed", cmd.get("id"))
+        return
+    path = cmd.get("path")
+    bot["path_id"] += 1
+    bot["cmd"] = cmd.get("id")
+    bot["target"] = (tr, tc)
+    bot["path"] = [tuple(p) for p in path] if path else []
+    bot["path_idx"] = 1 if path else 0
+    if not path:
+        events.bot_event(bot_idx, bot, "failed")
+        return
+    events.bot_event(bot_idx, bot, "start")
+    if len(bot["path"]) == 1:
+        events.bot_event(bot_idx, bot, "arrived")
+
+
 # --- IPC ---
 
+_plane = None  # StatePlane, created in main()
+_export = {"last": -STATE_EXPORT_INTERVAL_MS, "pending": False, "grid_version": None}
+
+
 def _write_state(bots, grid, target_shape=None):
+    """Publish the state; the JSON export follows within STATE_EXPORT_INTERVAL_MS."""
+    _plane.publish(bots, grid=grid, texts={"target_shape": target_shape})
+    _export["pending"] = True
+    _export_state(bots, grid, target_shape)
+
+
+def _export_state(bots, grid, target_shape=None):
+    """Write mimic_state.json if a publish is pending and the interval has passed."""
+    now = pygame.time.get_ticks()
+    if not _export["pending"] or now - _export["last"] < STATE_EXPORT_INTERVAL_MS:
+        return
+    # The grid only changes on regeneration: export it once per version
+    grid_version = _plane.version("grid")
+    if grid_version != _export["grid_version"]:
+        GRID_PATH.write_text(json.dumps({"version": grid_version, "grid": grid.tolist()}))
+        _export["grid_version"] = grid_version
     data = {
         "bots": [
             {"pos": list(b["pos"]), "orientation": round(b["orientation"], 4)}
             for b in bots
         ],
-        "grid": grid.tolist(),
+        "grid_version": grid_version,
         "num_bots": len(bots),
     }
     if target_shape:
         data["target_shape"] = target_shape
     STATE_PATH.write_text(json.dumps(data))
+    _export["last"] = now
+    _export["pending"] = False
 
 
 def _write_screenshot(screen):
@@ -259,20 +321,6 @@ def _write_screenshot(screen):
     pygame.image.save(grid_surface, str(SCREENSHOT_PATH))
 
 
-def _read_commands():
-    if not COMMANDS_PATH.exists():
-        return []
-    text = COMMANDS_PATH.read_text().strip()
-    if not text:
-        return []
-    try:
-        commands = json.loads(text)
-    except json.JSONDecodeError:
-        return []
-    COMMANDS_PATH.write_text("[]")
-    return commands
-
-
 def _add_task(task_text):
     tasks = []
     if TASKS_PATH.exists():
@@ -284,6 +332,7 @@ def _add_task(task_text):
                 tasks = []
     tasks.append(task_text)
     TASKS_PATH.write_text(json.dumps(tasks, indent=2))
+    ring(TASKS_PATH)
 
 
 # --- Drawing ---
@@ -350,8 +399,13 @@ def draw(screen, font, grid, bots, target_positions, input_text, shape_name):
 # --- Main ---
 
 def main():
+    global _plane
     FILES_DIR.mkdir(parents=True, exist_ok=True)
-    COMMANDS_PATH.write_text("[]")
+    CommandJournal(COMMANDS_PATH).reset()
+    journal = JournalReader(COMMANDS_PATH, compact_bytes=MAX_BYTES)
+    commands_bell = Doorbell(COMMANDS_PATH)
+    last_command_check = 0
+    events = EventWriter(EVENTS_PATH)
 
     pygame.init()
     screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
@@ -361,6 +415,7 @@ def main():
 
     grid = random_grid()
     bots = make_bots(grid)
+    _plane = StatePlane.create(STATE_SHM, grid.shape, NUM_BOTS, texts=("target_shape",))
     target_positions = []
     shape_name = None
     last_screenshot = 0
@@ -413,7 +468,10 @@ def main():
                     input_text += event.unicode
 
         # Process commands from actions.py
-        commands = _read_commands()
+        commands = []
+        if commands_bell.rung() or pygame.time.get_ticks() - last_command_check >= COMMAND_POLL_MS:
+            commands = journal.read()
+            last_command_check = pygame.time.get_ticks()
         for cmd in commands:
             action = cmd.get("action")
             bot_idx = cmd.get("bot", 0)
@@ -422,22 +480,12 @@ def main():
             bot = bots[bot_idx]
 
             if action == "move_to":
-                tr, tc = cmd["target"]
-                tr, tc = int(tr), int(tc)
-                if 0 <= tr < GRID_SIZE and 0 <= tc < GRID_SIZE and grid[tr, tc] == 0:
-                    bot["target"] = (tr, tc)
-                    path = cmd.get("path")
-                    if path:
-                        bot["path"] = [tuple(p) for p in path]
-                        bot["path_idx"] = 1
-                    else:
-                        bot["path"] = []
-                        bot["path_idx"] = 0
+                move_to(events, grid, bot_idx, bot, cmd)
 
         # Animate bots
         now = pygame.time.get_ticks()
         state_changed = False
-        for bot in bots:
+        for i, bot in enumerate(bots):
             if bot["path"] and bot["path_idx"] < len(bot["path"]) and now - bot["last_move"] >= MOVE_DELAY_MS:
                 prev = bot["pos"]
                 bot["pos"] = bot["path"][bot["path_idx"]]
@@ -450,11 +498,17 @@ def main():
                     bot["orientation"] = orient
 
                 if bot["path_idx"] >= len(bot["path"]):
+                    events.bot_event(i, bot, "arrived")
                     bot["target"] = None
                     bot["path"] = []
+                else:
+                    events.bot_event(i, bot, "progress")
+        events.flush()
 
         if state_changed:
             _write_state(bots, grid, shape_name)
+        else:
+            _export_state(bots, grid, shape_name)
 
         if now - last_screenshot >= SCREENSHOT_INTERVAL_MS:
             _write_screenshot(screen)
@@ -463,6 +517,8 @@ def main():
         draw(screen, font, grid, bots, target_positions, input_text, shape_name)
         clock.tick(FPS)
 
+    commands_bell.close()
+    _plane.close()
     pygame.quit()
     sys.exit()
 
@@ -2,13 +2,14 @@ import base64
 import json
 import sys
 import os
-import threading
 import numpy as np
 from pathlib import Path
 
 # Add parent dir so we can import llms
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from llms import oai
+from journal import CommandJournal
+from state_plane import StateReader, bot_list, cells
 
 GRID_SIZE = 64
 
@@ -21,10 +22,15 @@ CELL_OBSTACLE = 2
 FILES_DIR = Path(__file__).parent.parent / "files"
 STATE_PATH = FILES_DIR / "sim_state.json"
 SCREENSHOT_PATH = FILES_DIR / "sim_screenshot.png"
-COMMANDS_PATH = FILES_DIR / "sim_commands.json"
+COMMANDS_PATH = FILES_DIR / "sim_commands.journal"
+EVENTS_PATH = FILES_DIR / "sim_events.jsonl"
+STATE_SHM = "openhive_sim"
 
-# Lock to prevent concurrent threads from clobbering each other's commands
-_cmd_lock = threading.Lock()
+# Shared-memory state published by the simulation (JSON file as fallback)
+_state_reader = StateReader(STATE_SHM)
+
+# Commands are appended atomically, so concurrent bot threads need no lock
+_journal = CommandJournal(COMMANDS_PATH)
 
 DETECT_OBSTACLES_PROMPT = (
     "You are a grid-world vision system. You are given:\n"
@@ -41,20 +47,22 @@ DETECT_OBSTACLES_PROMPT = (
 
 def _get_bots():
     """Read bot positions and orientations from the simulation."""
-    if not STATE_PATH.exists():
-        return []
-    try:
-        data = json.loads(STATE_PATH.read_text())
-        return [
-            {"pos": tuple(b["pos"]), "orientation": b["orientation"]}
-            for b in data["bots"]
-        ]
-    except (json.JSONDecodeError, KeyError):
-        return []
+    return [
+        {"pos": tuple(b["pos"]), "orientation": b["orientation"]}
+        for b in _get_state().get("bots", [])
+    ]
 
 
 def _get_state():
-    """Read full simulation state from the IPC file."""
+    """Read full simulation state from the state plane, or the JSON export."""
+    snap = _state_reader.snapshot()
+    if snap is not None:
+        return {
+            "bots": bot_list(snap),
+            "coins": cells(snap["coins"]),
+            "score": int(snap["score"]),
+            "active_bots": snap["active"].nonzero()[0].tolist(),
+        }
     if not STATE_PATH.exists():
         return {}
     try:
@@ -89,22 +97,11 @@ def move_to(target_pos, bot_id=0):
     Returns:
         str — confirmation that command was sent
     """
-    with _cmd_lock:
-        commands = []
-        if COMMANDS_PATH.exists():
-            text = COMMANDS_PATH.read_text().strip()
-            if text:
-                try:
-                    commands = json.loads(text)
-                except json.JSONDecodeError:
-                    commands = []
-
-        commands.append({
-            "action": "move_to",
-            "target": list(target_pos),
-            "bot": bot_id,
-        })
-        COMMANDS_PATH.write_text(json.dumps(commands))
+    _journal.append([{
+        "action": "move_to",
+        "target": [int(v) for v in target_pos],
+        "bot": bot_id,
+    }])
     return f"Sent move_to command: bot={bot_id}, target={target_pos}"
 
 
@@ -121,18 +118,7 @@ def collect(bot_id=0):
     Returns:
         str — result of the collect attempt
     """
-    with _cmd_lock:
-        commands = []
-        if COMMANDS_PATH.exists():
-            text = COMMANDS_PATH.read_text().strip()
-            if text:
-                try:
-                    commands = json.loads(text)
-                except json.JSONDecodeError:
-                    commands = []
-
-        commands.append({"action": "collect", "bot": bot_id})
-        COMMANDS_PATH.write_text(json.dumps(commands))
+    _journal.append([{"action": "collect", "bot": bot_id}])
     return f"Sent collect command for bot {bot_id}"
 
 
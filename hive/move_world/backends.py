@@ -0,0 +1,260 @@
+"""
+CPU inference backends for the heuristic models.
+
+NeuralPathfinder runs its model through one of these:
+
+    "eager"   — the PyTorch module as loaded (the reference output)
+    "script"  — traced and frozen TorchScript (BatchNorm folded into the
+                convolutions), saved next to the checkpoint as *.script.pt
+    "compile" — torch.compile of the eager module, compiled in-process
+    "onnx"    — ONNX export run with onnxruntime, saved as *.onnx (needs
+                the optional onnx and onnxruntime packages)
+    "int8"    — dynamic int8 quantization of the Linear layers (attention
+                and its FFN), traced and saved as *.int8.pt
+
+Every backend takes an explicit intra-op thread count. Each simulation is
+its own process, so torch's default of one thread per core makes them
+oversubscribe every core; pass threads=1 or 2 per process instead.
+channels_last switches the conv stack to NHWC activations (onnxruntime
+picks its own layout and ignores it).
+
+Converted files are only rebuilt when missing or older than the
+checkpoint. Each conversion is followed by check_parity() against the
+eager model; run this file to convert a checkpoint to every format and
+print parity and latency:
+
+    python backends.py checkpoints/best_model.pt --threads 2
+"""
+
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+BACKENDS = ("eager", "script", "compile", "onnx", "int8")
+
+# Optional packages each backend needs beyond torch
+REQUIRES = {"onnx": ("onnx", "onnxruntime")}
+
+# Max |eager - backend| on the normalised output (cost / max_cost)
+PARITY_TOL = {"script": 1e-4, "compile": 1e-4, "onnx": 1e-4, "int8": 5e-2}
+
+
+class TorchBackend:
+    """Runs a torch module (eager, TorchScript or compiled)."""
+
+    def __init__(self, name, module, device=torch.device("cpu"),
+                 channels_last=False):
+        self.name = name
+        self.module = module
+        self.device = device
+        self.channels_last = channels_last
+
+    def __call__(self, x, **kwargs):
+        """
+        (B, C, H, W) float32 array -> (B, 1, H, W) float32 array.
+        kwargs go to the module's forward (eager only, e.g. tol / budget_ms);
+        with return_iterations=True the result is (array, decoder passes).
+        """
+        x_t = torch.from_numpy(x).to(self.device)
+        if self.channels_last:
+            x_t = x_t.contiguous(memory_format=torch.channels_last)
+        with torch.inference_mode():
+            out = self.module(x_t, **kwargs)
+        if isinstance(out, tuple):
+            return out[0].float().cpu().numpy(), out[1]
+        return out.float().cpu().numpy()
+
+
+class OnnxBackend:
+    """Runs an exported ONNX model with onnxruntime on the CPU."""
+
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.name = "onnx"
+        self.session = ort.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, x):
+        return self.session.run(None, {"x": x})[0]
+
+
+def _artifact(checkpoint_path, kind, channels_last):
+    """Converted-model path next to the checkpoint, e.g. best_model.script.pt."""
+    ckpt = Path(checkpoint_path)
+    layout = "-cl" if channels_last else ""
+    suffix = ".onnx" if kind == "onnx" else f".{kind}{layout}.pt"
+    return ckpt.with_name(ckpt.stem + suffix)
+
+
+def _is_stale(artifact, checkpoint_path):
+    return (not artifact.exists()
+            or artifact.stat().st_mtime < Path(checkpoint_path).stat().st_mtime)
+
+
+def _example_input(grid_size, batch=2):
+    x = torch.zeros(batch, 2, grid_size, grid_size)
+    x[:, 1, grid_size // 2, grid_size // 2] = 1.0
+    return x
+
+
+def _convert(model, kind, artifact, grid_size, channels_last):
+    """Write one converted model to disk."""
+    example = _example_input(grid_size)
+    if kind == "int8":
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {nn.Linear}, dtype=torch.qint8
+        )
+    if channels_last:
+        model = model.to(memory_format=torch.channels_last)
+        example = example.contiguous(memory_format=torch.channels_last)
+
+    if kind == "onnx":
+        torch.onnx.export(
+            model, (example,), str(artifact),
+            input_names=["x"], output_names=["h"],
+            dynamic_axes={"x": {0: "batch"}, "h": {0: "batch"}},
+            external_data=False,
+        )
+        return
+
+    with torch.inference_mode():
+        traced = torch.jit.trace(model, example)
+    torch.jit.freeze(traced.eval()).save(str(artifact))
+
+
+def load_backend(model, checkpoint_path, backend="eager", threads=None,
+                 channels_last=False, device=torch.device("cpu"), grid_size=64):
+    """
+    Wrap an eval-mode model in the requested backend.
+
+    Args:
+        model:           loaded model (eval mode, on device)
+        checkpoint_path: checkpoint the model came from; converted files
+                         are written next to it
+        backend:         one of BACKENDS
+        threads:         intra-op threads for torch / onnxruntime, or None
+                         to keep the library default
+        channels_last:   use NHWC activations for the conv stack
+        device:          device of model; only "eager" runs off the CPU
+        grid_size:       input size used for tracing and export
+
+    Returns:
+        Callable mapping a (B, 2, H, W) float32 array to (B, 1, H, W).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; choose from {BACKENDS}")
+    if backend != "eager" and device.type != "cpu":
+        raise ValueError(f"Backend {backend!r} is CPU-only, got device {device}")
+    missing = [m for m in REQUIRES.get(backend, ()) if importlib.util.find_spec(m) is None]
+    if missing:
+        raise ImportError(
+            f"Backend {backend!r} needs {', '.join(missing)} (pip install {' '.join(missing)})"
+        )
+    if threads:
+        torch.set_num_threads(int(threads))
+
+    if backend == "eager":
+        if channels_last:
+            model = model.to(memory_format=torch.channels_last)
+        return TorchBackend("eager", model, device, channels_last)
+    if backend == "compile":
+        if channels_last:
+            model = model.to(memory_format=torch.channels_last)
+        return TorchBackend("compile", torch.compile(model, dynamic=True),
+                            device, channels_last)
+
+    artifact = _artifact(checkpoint_path, backend, channels_last)
+    converted = _is_stale(artifact, checkpoint_path)
+    if converted:
+        print(f"[pathfind] Converting {Path(checkpoint_path).name} -> {artifact.name}")
+        _convert(model, backend, artifact, grid_size, channels_last)
+
+    if backend == "onnx":
+        runner = OnnxBackend(artifact, threads)
+    else:
+        runner = TorchBackend(backend, torch.jit.load(str(artifact)),
+                              device, channels_last)
+
+    if converted:
+        err = check_parity(runner, model, grid_size)
+        print(f"[pathfind] {backend} parity vs eager: max |diff| = {err:.2e}")
+        if err > PARITY_TOL[backend]:
+            artifact.unlink()
+            raise RuntimeError(
+                f"{backend} output differs from eager by {err:.2e} "
+                f"(tolerance {PARITY_TOL[backend]:.0e})"
+            )
+    return runner
+
+
+def random_inputs(n, grid_size=64, obstacle_pct=0.2, seed=0):
+    """n random (obstacle map, goal one-hot) inputs with free goal cells."""
+    rng = np.random.default_rng(seed)
+    x = np.zeros((n, 2, grid_size, grid_size), dtype=np.float32)
+    x[:, 0] = rng.random((n, grid_size, grid_size)) < obstacle_pct
+    for i in range(n):
+        r, c = rng.integers(grid_size, size=2)
+        x[i, 0, r, c] = 0.0
+        x[i, 1, r, c] = 1.0
+    return x
+
+
+def check_parity(runner, model, grid_size=64, n=8, seed=0):
+    """Max absolute difference between a backend and the eager model."""
+    x = random_inputs(n, grid_size, seed=seed)
+    with torch.inference_mode():
+        ref = model(torch.from_numpy(x)).float().numpy()
+    return float(np.abs(runner(x) - ref).max())
+
+
+def _latency_ms(runner, x, repeats=20):
+    runner(x)  # warm-up (and compilation for "compile")
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        runner(x)
+    return (time.perf_counter() - t0) / repeats * 1000
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from model import HeuristicNet, HeuristicNetV2
+
+    parser = argparse.ArgumentParser(description="Convert a checkpoint and compare backends")
+    parser.add_argument("checkpoint")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--channels-last", action="store_true")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 16])
+    args = parser.parse_args()
+
+    ckpt = torch.load(args.checkpoint, map_location="cpu", weights_only=False)
+    if ckpt.get("model_version", "v1") == "v2":
+        net = HeuristicNetV2(num_iterations=ckpt.get("num_iterations", 4))
+    else:
+        net = HeuristicNet()
+    net.load_state_dict(ckpt["model_state_dict"])
+    net.eval()
+
+    print(f"{'backend':<10}{'parity':>12}" + "".join(f"{f'B={b} ms':>12}" for b in args.batch))
+    for kind in BACKENDS:
+        try:
+            runner = load_backend(net, args.checkpoint, kind, args.threads,
+                                  args.channels_last)
+        except Exception as e:
+            print(f"{kind:<10}  unavailable: {e}", file=sys.stderr)
+            continue
+        err = check_parity(runner, net)
+        times = [_latency_ms(runner, random_inputs(b, seed=1)) for b in args.batch]
+        print(f"{kind:<10}{err:>12.2e}" + "".join(f"{t:>12.2f}" for t in times))
@@ -0,0 +1,108 @@
+"""
+Decoder iterations vs. search effort for V2 checkpoints.
+
+For a fixed number of decoder passes, and for early-exit settings
+(tolerance in path-cost units and/or a latency budget), reports mean
+passes run, forward latency, A* node expansions with the resulting
+heuristic, and path cost against the exact (Dijkstra) optimum.
+
+    python bench_early_exit.py checkpoints/best_model.pt --threads 2
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from model import HeuristicNetLate, HeuristicNetV2
+from pathfinder import NeuralPathfinder, PlanStats
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pathfinding.fields import distance_field
+from pathfinding.search import GridGraph
+
+
+def random_problems(n, grid_size=64, obstacle_pct=0.2, seed=0):
+    """n (grid, start, goal) triples with a reachable goal."""
+    rng = np.random.default_rng(seed)
+    problems = []
+    while len(problems) < n:
+        grid = (rng.random((grid_size, grid_size)) < obstacle_pct).astype(np.uint8)
+        free = np.argwhere(grid == 0)
+        s, g = free[rng.choice(len(free), 2, replace=False)]
+        start, goal = (int(s[0]), int(s[1])), (int(g[0]), int(g[1]))
+        dist = distance_field(grid, goal)
+        if np.isfinite(dist[start]) and start != goal:
+            problems.append((grid, start, goal, float(dist[start])))
+    return problems
+
+
+def path_cost(path):
+    return sum(np.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(path, path[1:]))
+
+
+def run(pf, problems, **forward_kwargs):
+    """Mean passes, forward ms, expansions, and suboptimality over problems."""
+    pf._forward_kwargs = dict(forward_kwargs, return_iterations=True)
+    passes, times, expanded, ratios = [], [], [], []
+    for grid, start, goal, optimal in problems:
+        pf.invalidate_cache()
+        stats = PlanStats("neural", pf.backend, "astar")
+        t0 = time.perf_counter()
+        h_map = pf._get_heuristic_maps(grid, [goal], stats)[0]
+        times.append((time.perf_counter() - t0) * 1000)
+        passes.append(stats.iterations)
+
+        graph = GridGraph(grid)
+        path = graph.astar(start, goal, h_map)
+        expanded.append(graph.expanded)
+        ratios.append(path_cost(path) / optimal - 1.0 if path else np.inf)
+    ratios = np.maximum(np.array(ratios), 0.0)  # float noise on optimal paths
+    return {
+        "passes": float(np.mean(passes)),
+        "ms": float(np.mean(times)),
+        "expanded": float(np.mean(expanded)),
+        "subopt_mean": float(ratios.mean()),
+        "subopt_max": float(ratios.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark V2 decoder early exit")
+    parser.add_argument("checkpoint")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--problems", type=int, default=50)
+    parser.add_argument("--obstacle-pct", type=float, default=0.2)
+    parser.add_argument("--tol", type=float, nargs="+", default=[2.0, 1.0, 0.5])
+    parser.add_argument("--budget-ms", type=float, nargs="+", default=[])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pf = NeuralPathfinder(args.checkpoint, threads=args.threads)
+    if not isinstance(pf.model, (HeuristicNetV2, HeuristicNetLate)):
+        sys.exit("Early exit needs a V2 or late-fusion checkpoint")
+    problems = random_problems(args.problems, pf.TILE, args.obstacle_pct, args.seed)
+    trained = pf.model.num_iterations
+
+    print(f"{'setting':<16}{'passes':>8}{'ms':>9}{'expanded':>10}"
+          f"{'subopt':>9}{'worst':>9}")
+
+    def report(label, r):
+        print(f"{label:<16}{r['passes']:>8.2f}{r['ms']:>9.2f}{r['expanded']:>10.1f}"
+              f"{r['subopt_mean']:>8.2%}{r['subopt_max']:>9.2%}")
+
+    for T in range(1, trained + 3):
+        pf.model.num_iterations = T
+        report(f"T={T}", run(pf, problems))
+    pf.model.num_iterations = trained
+
+    for tol in args.tol:
+        report(f"tol={tol:g}", run(pf, problems, tol=tol / pf.max_cost))
+    for budget in args.budget_ms:
+        report(f"budget={budget:g}ms", run(pf, problems, budget_ms=budget))
+
+
+if __name__ == "__main__":
+    main()
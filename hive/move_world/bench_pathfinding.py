@@ -0,0 +1,221 @@
+"""
+Pathfinding benchmark across heuristics and grid families.
+
+Grids come from each world's own random_grid() at several obstacle
+densities, seeded per grid so runs are reproducible. Every heuristic
+plans the same start/goal pairs with the A* kernel and is scored on:
+
+    infer_ms   time to produce the heuristic map (CNN forward pass with
+               the map cache cleared, or the provider's heuristic_map)
+    search_ms  time spent in A*
+    expanded   nodes A* expanded
+    subopt     path cost over the exact (Dijkstra) optimum, minus one
+    failures   reachable goals with no path, or an invalid path
+
+The generators stop at their own cluster counts, so the requested
+density is an upper bound; "filled" records the share of obstacle cells
+actually generated.
+
+Heuristics: one "neural-<version>" entry per checkpoint, plus octile,
+ALT landmarks, the exact distance field and plain Dijkstra (no
+heuristic). Results go to a JSON file; a summary table is printed.
+
+    python bench_pathfinding.py --checkpoints checkpoints/best_model.pt checkpoints/v1_model.pt
+    python bench_pathfinding.py --worlds move_world fire_world --densities 0.1 0.2 --out bench.json
+"""
+
+import argparse
+import ast
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pathfinding.fields import ExactHeuristic, distance_field
+from pathfinding.heuristics import LandmarkHeuristic, OctileHeuristic
+from pathfinding.search import SQRT2, GridGraph
+
+HIVE_DIR = Path(__file__).parent.parent
+WORLDS = ("move_world", "fire_world", "mimic_world")
+GRID_SIZE = 64
+
+
+def load_random_grid(world):
+    """
+    The random_grid() function of a world's simulation.py.
+
+    Read from the source rather than imported: the simulations open
+    pygame and load their own pathfinder at import time.
+    """
+    source = (HIVE_DIR / world / "simulation.py").read_text()
+    tree = ast.parse(source)
+    func = next(node for node in tree.body
+                if isinstance(node, ast.FunctionDef) and node.name == "random_grid")
+    namespace = {"np": np, "random": random, "GRID_SIZE": GRID_SIZE}
+    exec(compile(ast.Module([func], []), f"{world}/simulation.py", "exec"), namespace)
+    return namespace["random_grid"]
+
+
+def make_problems(world, density, grids, pairs, seed):
+    """(grid, start, goal, exact distance field) tuples for one grid family."""
+    random_grid = load_random_grid(world)
+    problems = []
+    for g in range(grids):
+        random.seed(seed + g)
+        rng = np.random.default_rng(seed + g)
+        grid = random_grid(density).astype(np.uint8)
+        free = np.argwhere(grid == 0)
+        for _ in range(pairs):
+            for _attempt in range(100):
+                s, t = free[rng.choice(len(free), 2, replace=False)]
+                start, goal = (int(s[0]), int(s[1])), (int(t[0]), int(t[1]))
+                dist = distance_field(grid, goal)
+                if np.isfinite(dist[start]):
+                    problems.append((grid, start, goal, dist))
+                    break
+    return problems
+
+
+def path_cost(grid, path, start, goal):
+    """Cost of a valid path, or None if it leaves the free cells or jumps."""
+    if not path or tuple(path[0]) != start or tuple(path[-1]) != goal:
+        return None
+    cost = 0.0
+    for a, b in zip(path, path[1:]):
+        dr, dc = abs(b[0] - a[0]), abs(b[1] - a[1])
+        if max(dr, dc) != 1 or grid[b[0], b[1]]:
+            return None
+        cost += SQRT2 if dr and dc else 1.0
+    return cost
+
+
+class _Neural:
+    """CNN heuristic with the pathfinder's map cache bypassed."""
+
+    def __init__(self, pf):
+        self.pf = pf
+
+    def heuristic_map(self, grid, goal):
+        self.pf.invalidate_cache()
+        return self.pf._get_heuristic_map(grid, goal)
+
+
+def heuristics(checkpoints, threads):
+    """(label, provider or None) pairs; None means plain Dijkstra."""
+    out = []
+    if checkpoints:
+        from pathfinder import NeuralPathfinder
+
+        for path in checkpoints:
+            pf = NeuralPathfinder(path, threads=threads)
+            version = type(pf.model).__name__.replace("HeuristicNet", "") or "V1"
+            label = f"neural-{version.lower()}"
+            if any(label == name for name, _ in out):
+                label = f"{label}:{Path(path).stem}"
+            out.append((label, _Neural(pf)))
+    out += [
+        ("octile", OctileHeuristic()),
+        ("alt", LandmarkHeuristic(num_landmarks=8)),
+        ("exact", ExactHeuristic()),
+        ("dijkstra", None),
+    ]
+    return out
+
+
+def run(provider, problems):
+    """Aggregate metrics for one heuristic on one grid family."""
+    infer, search, expanded, subopt = [], [], [], []
+    failures = 0
+    for grid, start, goal, dist in problems:
+        t0 = time.perf_counter()
+        h_map = None if provider is None else provider.heuristic_map(grid, goal)
+        t1 = time.perf_counter()
+        graph = GridGraph(grid)
+        path = graph.astar(start, goal, h_map)
+        t2 = time.perf_counter()
+
+        infer.append((t1 - t0) * 1000)
+        search.append((t2 - t1) * 1000)
+        expanded.append(graph.expanded)
+        cost = path_cost(grid, path, start, goal)
+        if cost is None:
+            failures += 1
+        else:
+            subopt.append(max(cost / dist[start] - 1.0, 0.0) if dist[start] > 0 else 0.0)
+    return {
+        "problems": len(problems),
+        "infer_ms": float(np.mean(infer)),
+        "search_ms": float(np.mean(search)),
+        "search_ms_p95": float(np.percentile(search, 95)),
+        "expanded": float(np.mean(expanded)),
+        "subopt_mean": float(np.mean(subopt)) if subopt else None,
+        "subopt_max": float(np.max(subopt)) if subopt else None,
+        "failures": failures,
+        "failure_rate": failures / len(problems),
+    }
+
+
+def print_table(results):
+    print(f"{'world':<12}{'density':>8}{'filled':>8}  {'heuristic':<16}{'infer ms':>9}{'search ms':>10}"
+          f"{'expanded':>10}{'subopt':>9}{'worst':>9}{'fail':>7}")
+    for r in results:
+        sub = "-" if r["subopt_mean"] is None else f"{r['subopt_mean']:.2%}"
+        worst = "-" if r["subopt_max"] is None else f"{r['subopt_max']:.2%}"
+        print(f"{r['world']:<12}{r['density']:>8.2f}{r['filled']:>8.2f}  {r['heuristic']:<16}{r['infer_ms']:>9.2f}"
+              f"{r['search_ms']:>10.2f}{r['expanded']:>10.1f}{sub:>9}{worst:>9}"
+              f"{r['failure_rate']:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pathfinding heuristics")
+    parser.add_argument("--checkpoints", nargs="*", default=None,
+                        help="model checkpoints (default: checkpoints/best_model.pt if present)")
+    parser.add_argument("--worlds", nargs="+", default=list(WORLDS), choices=WORLDS)
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.05, 0.10, 0.20, 0.30])
+    parser.add_argument("--grids", type=int, default=5, help="grids per world and density")
+    parser.add_argument("--pairs", type=int, default=10, help="start/goal pairs per grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--out", default="bench_pathfinding.json")
+    args = parser.parse_args()
+
+    checkpoints = args.checkpoints
+    if checkpoints is None:
+        default = Path(__file__).parent / "checkpoints" / "best_model.pt"
+        checkpoints = [str(default)] if default.exists() else []
+
+    providers = heuristics(checkpoints, args.threads)
+    results = []
+    for world in args.worlds:
+        for density in args.densities:
+            problems = make_problems(world, density, args.grids, args.pairs, args.seed)
+            filled = float(np.mean([p[0].mean() for p in problems]))
+            for label, provider in providers:
+                r = run(provider, problems)
+                results.append({"world": world, "density": density, "filled": filled,
+                                "heuristic": label, **r})
+
+    report = {
+        "config": {
+            "checkpoints": checkpoints,
+            "worlds": args.worlds,
+            "densities": args.densities,
+            "grids": args.grids,
+            "pairs": args.pairs,
+            "seed": args.seed,
+            "threads": args.threads,
+        },
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print_table(results)
+    print(f"\nWrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Build and evaluate late-fusion checkpoints (HeuristicNetLate).
+
+convert: warm-start a HeuristicNetLate from a V2 checkpoint (encoder,
+bottleneck and decoder weights carried over, see from_v2()), then train
+it on random grids against exact cost-to-go so it learns to use the goal
+planes. Without a V2 checkpoint (--from-scratch) the model is trained
+from random initialisation. The checkpoint records its training steps:
+--steps 0 only converts, and NeuralPathfinder refuses the result, since
+from_v2() alone does not reproduce V2's heuristic.
+
+compare: accuracy of a V2 and a late-fusion checkpoint against exact
+cost-to-go (mean absolute error, share of admissible cells, A* expansions,
+path suboptimality) and the time to plan many goals on one grid.
+
+    python late_fusion.py convert checkpoints/best_model.pt checkpoints/late_model.pt --steps 2000
+    python late_fusion.py compare checkpoints/best_model.pt checkpoints/late_model.pt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from model import HeuristicNetLate, HeuristicNetV2
+from pathfinder import NeuralPathfinder
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pathfinding.fields import distance_field
+from pathfinding.search import GridGraph
+
+
+def random_batch(rng, n, grid_size=64, obstacle_pct=(0.05, 0.35)):
+    """Model inputs and exact cost-to-go targets for n random grids/goals."""
+    x = np.zeros((n, 2, grid_size, grid_size), dtype=np.float32)
+    y = np.zeros((n, 1, grid_size, grid_size), dtype=np.float32)
+    for i in range(n):
+        grid = (rng.random((grid_size, grid_size)) < rng.uniform(*obstacle_pct)).astype(np.uint8)
+        free = np.argwhere(grid == 0)
+        r, c = free[rng.integers(len(free))]
+        x[i, 0] = grid
+        x[i, 1, r, c] = 1.0
+        y[i, 0] = distance_field(grid, (r, c))
+    return x, y
+
+
+def train(model, max_cost, steps, batch=16, lr=1e-3, seed=0, device="cpu"):
+    """Fit model to normalised exact cost-to-go on reachable cells."""
+    rng = np.random.default_rng(seed)
+    model.to(device).train()
+    opt = torch.optim.Adam(model.parameters(), lr=lr)
+    sched = torch.optim.lr_scheduler.CosineAnnealingLR(opt, max(steps, 1))
+    for step in range(steps):
+        x, y = random_batch(rng, batch)
+        x = torch.from_numpy(x).to(device)
+        y = torch.from_numpy(y).to(device)
+        mask = torch.isfinite(y)
+        target = torch.where(mask, y / max_cost, torch.zeros_like(y))
+        pred = model(x)
+        loss = F.smooth_l1_loss(pred[mask], target[mask], beta=0.01)
+        opt.zero_grad()
+        loss.backward()
+        opt.step()
+        sched.step()
+        if step % 100 == 0 or step == steps - 1:
+            print(f"[late] step {step:5d}  loss {loss.item():.5f}")
+    model.eval()
+    return model
+
+
+def convert(args):
+    device = torch.device(args.device)
+    if args.from_scratch:
+        model = HeuristicNetLate(num_iterations=args.num_iterations)
+        max_cost = args.max_cost
+    else:
+        ckpt = torch.load(args.source, map_location="cpu", weights_only=False)
+        if ckpt.get("model_version", "v1") != "v2":
+            sys.exit("convert needs a V2 checkpoint (or --from-scratch)")
+        v2 = HeuristicNetV2(num_iterations=ckpt.get("num_iterations", 4))
+        v2.load_state_dict(ckpt["model_state_dict"])
+        model = HeuristicNetLate.from_v2(v2)
+        max_cost = ckpt["max_cost"]
+
+    train(model, max_cost, args.steps, args.batch, args.lr, args.seed, device)
+    torch.save({
+        "model_state_dict": model.cpu().state_dict(),
+        "model_version": "late",
+        "num_iterations": model.num_iterations,
+        "max_cost": max_cost,
+        "train_steps": args.steps,
+    }, args.output)
+    print(f"[late] Saved {args.output}")
+
+
+def path_cost(path):
+    return sum(np.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(path, path[1:]))
+
+
+def evaluate(pf, problems):
+    """Accuracy of pf's heuristic maps against exact cost-to-go."""
+    errors, admissible, expanded, subopt = [], [], [], []
+    for grid, start, goal, dist in problems:
+        h_map = pf._get_heuristic_map(grid, goal)
+        reach = np.isfinite(dist) & (grid == 0)
+        errors.append(np.abs(h_map[reach] - dist[reach]).mean())
+        admissible.append((h_map[reach] <= dist[reach] + 1e-6).mean())
+        graph = GridGraph(grid)
+        path = graph.astar(start, goal, h_map)
+        expanded.append(graph.expanded)
+        subopt.append(max(path_cost(path) / dist[start] - 1.0, 0.0) if path else np.inf)
+    return {
+        "mae": float(np.mean(errors)),
+        "admissible": float(np.mean(admissible)),
+        "expanded": float(np.mean(expanded)),
+        "subopt": float(np.mean(subopt)),
+    }
+
+
+def time_goals(pf, grid, goals, repeats=3):
+    """Mean ms to get heuristic maps for every goal on a fresh grid."""
+    total = 0.0
+    for _ in range(repeats):
+        pf.invalidate_cache()
+        t0 = time.perf_counter()
+        pf._get_heuristic_maps(grid, goals)
+        total += time.perf_counter() - t0
+    return total / repeats * 1000
+
+
+def compare(args):
+    rng = np.random.default_rng(args.seed)
+    problems = []
+    while len(problems) < args.problems:
+        x, y = random_batch(rng, 1)
+        grid = x[0, 0].astype(np.uint8)
+        goal = tuple(int(v) for v in np.argwhere(x[0, 1])[0])
+        dist = y[0, 0].astype(np.float64)
+        reach = np.argwhere(np.isfinite(dist) & (grid == 0) & (dist > 0))
+        if len(reach):
+            start = tuple(int(v) for v in reach[rng.integers(len(reach))])
+            problems.append((grid, start, goal, dist))
+
+    grid = problems[0][0]
+    goals = [tuple(int(v) for v in p)
+             for p in np.argwhere(grid == 0)[rng.choice((grid == 0).sum(), args.goals, replace=False)]]
+
+    print(f"{'model':<8}{'MAE':>8}{'admiss':>9}{'expanded':>10}{'subopt':>9}"
+          f"{f'{args.goals} goals ms':>16}")
+    for label, path in (("v2", args.v2), ("late", args.late)):
+        pf = NeuralPathfinder(path, device=torch.device("cpu"), threads=args.threads,
+                              max_batch=args.goals)
+        r = evaluate(pf, problems)
+        ms = time_goals(pf, grid, goals)
+        print(f"{label:<8}{r['mae']:>8.3f}{r['admissible']:>8.1%}{r['expanded']:>10.1f}"
+              f"{r['subopt']:>8.2%}{ms:>16.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Late-fusion heuristic model tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("convert", help="warm-start from V2 and train")
+    p.add_argument("source", nargs="?", help="V2 checkpoint")
+    p.add_argument("output")
+    p.add_argument("--from-scratch", action="store_true")
+    p.add_argument("--num-iterations", type=int, default=4)
+    p.add_argument("--max-cost", type=float, default=120.0,
+                   help="cost normalisation when training from scratch")
+    p.add_argument("--steps", type=int, default=2000)
+    p.add_argument("--batch", type=int, default=16)
+    p.add_argument("--lr", type=float, default=1e-3)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--device", default="cpu")
+
+    p = sub.add_parser("compare", help="accuracy and speed against V2")
+    p.add_argument("v2")
+    p.add_argument("late")
+    p.add_argument("--problems", type=int, default=50)
+    p.add_argument("--goals", type=int, default=16)
+    p.add_argument("--threads", type=int, default=None)
+    p.add_argument("--seed", type=int, default=1)
+
+    args = parser.parse_args()
+    if args.command == "convert":
+        if args.source is None and not args.from_scratch:
+            parser.error("convert needs a V2 checkpoint or --from-scratch")
+        convert(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
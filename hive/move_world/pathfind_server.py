@@ -0,0 +1,51 @@
+"""
+Shared local pathfinding service (see pathfinding/service.py).
+
+Loads the checkpoint once, then forks workers that answer every world's
+planning calls over a Unix socket. The move and fire simulations,
+robot_world and mimic_world use it instead of their own model whenever
+it is running.
+
+    python pathfind_server.py
+    python pathfind_server.py checkpoints/best_model.pt --workers 4 --threads 1
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import torch
+
+from pathfinder import NeuralPathfinder
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pathfinding.service import SOCKET_PATH, serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the neural pathfinder locally")
+    parser.add_argument("checkpoint", nargs="?",
+                        default=str(Path(__file__).parent / "checkpoints" / "best_model.pt"))
+    parser.add_argument("--socket", default=str(SOCKET_PATH))
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="worker processes (default: half the cores)")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="intra-op threads per worker")
+    parser.add_argument("--backend", default="eager")
+    args = parser.parse_args()
+
+    # Workers run on the CPU: forking after CUDA / MPS initialisation is unsafe
+    pf = NeuralPathfinder(args.checkpoint, device=torch.device("cpu"),
+                          backend=args.backend, threads=args.threads)
+    print(f"[pathfind] Loaded {Path(args.checkpoint).name} ({args.backend})")
+
+    def worker_init():
+        torch.set_num_threads(args.threads)
+        print(f"[pathfind] Worker {os.getpid()} ready")
+
+    serve(pf, args.socket, args.workers, worker_init)
+
+
+if __name__ == "__main__":
+    main()
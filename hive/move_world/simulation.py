@@ -2,9 +2,10 @@
 Live simulation of the move_world.
 
 Standalone process — communicates with main.py via files:
-    Writes:  files/sim_state.json      (bots + coins, every frame)
+    Writes:  shared memory "openhive_sim" (bots + coins, every change)
+             files/sim_state.json      (JSON export of the same, ~1 s, debugging)
              files/sim_screenshot.png   (grid image, every ~500ms)
-    Reads:   files/sim_commands.json    (move/collect commands from main.py)
+    Reads:   files/sim_commands.journal (move/collect commands from main.py)
 
 Controls:
     Left click  — set target for nearest bot
@@ -24,6 +25,14 @@ import pygame
 
 from pathfinder import NeuralPathfinder
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from doorbell import Doorbell, ring
+from events import EventWriter
+from journal import MAX_BYTES, CommandJournal, JournalReader
+from state_plane import StatePlane
+from pathfinding.service import connect
+from pathfinding.smoothing import rasterize, smooth_path
+
 GRID_SIZE = 64
 CELL_PX = 10
 GRID_PX = GRID_SIZE * CELL_PX
@@ -33,6 +42,8 @@ WINDOW_H = GRID_PX + INPUT_HEIGHT
 FPS = 30
 MOVE_DELAY_MS = 60
 SCREENSHOT_INTERVAL_MS = 500
+STATE_EXPORT_INTERVAL_MS = 1000
+COMMAND_POLL_MS = 1000  # journal re-check when no doorbell ring arrives
 NUM_COINS = 10
 NUM_BOTS = 2
 
@@ -57,11 +68,29 @@ BOT_COLORS = [
 FILES_DIR = Path(__file__).parent.parent / "files"
 STATE_PATH = FILES_DIR / "sim_state.json"
 SCREENSHOT_PATH = FILES_DIR / "sim_screenshot.png"
-COMMANDS_PATH = FILES_DIR / "sim_commands.json"
+COMMANDS_PATH = FILES_DIR / "sim_commands.journal"
+EVENTS_PATH = FILES_DIR / "sim_events.jsonl"
 TASKS_PATH = FILES_DIR / "tasks.json"
+STATE_SHM = "openhive_sim"
+
+# Pathfinder: the shared service (pathfind_server.py) when it is running,
+# otherwise the simulation's own model (intra-op threads capped because
+# the sims and main.py share the CPU)
+PF_THREADS = 2
+_pf = connect() or NeuralPathfinder(
+    str(Path(__file__).parent / "checkpoints" / "best_model.pt"), threads=PF_THREADS
+)
+
+# Walk line-of-sight paths (string-pulled, then rasterized) instead of
+# the search's staircase of cells
+SMOOTH_PATHS = False
+
 
-# Pathfinder (simulation does its own pathfinding)
-_pf = NeuralPathfinder(str(Path(__file__).parent / "checkpoints" / "best_model.pt"))
+def straighten(grid, path):
+    """path with its staircases pulled straight, if SMOOTH_PATHS is set."""
+    if not SMOOTH_PATHS or not path:
+        return path
+    return rasterize(smooth_path(grid, path))
 
 
 def _compute_orientation(prev_pos, curr_pos):
@@ -72,7 +101,26 @@ def _compute_orientation(prev_pos, curr_pos):
     return math.atan2(dr, dc)
 
 
+_plane = None  # StatePlane, created in main()
+_export = {"last": -STATE_EXPORT_INTERVAL_MS, "pending": False}
+
+
 def _write_state(bots, coins, score):
+    """Publish the state; the JSON export follows within STATE_EXPORT_INTERVAL_MS."""
+    coin_layer = np.zeros((GRID_SIZE, GRID_SIZE), dtype=np.uint8)
+    for r, c in coins:
+        coin_layer[r, c] = 1
+    # No grid: obstacles are for the actions to detect from the screenshot
+    _plane.publish(bots, layers={"coins": coin_layer}, scalars={"score": score})
+    _export["pending"] = True
+    _export_state(bots, coins, score)
+
+
+def _export_state(bots, coins, score):
+    """Write sim_state.json if a publish is pending and the interval has passed."""
+    now = pygame.time.get_ticks()
+    if not _export["pending"] or now - _export["last"] < STATE_EXPORT_INTERVAL_MS:
+        return
     data = {
         "bots": [
             {"pos": list(b["pos"]), "orientation": round(b["orientation"], 4)}
@@ -82,6 +130,8 @@ def _write_state(bots, coins, score):
         "score": score,
     }
     STATE_PATH.write_text(json.dumps(data))
+    _export["last"] = now
+    _export["pending"] = False
 
 
 def _write_screenshot(screen):
@@ -89,20 +139,6 @@ def _write_screenshot(screen):
     pygame.image.save(grid_surface, str(SCREENSHOT_PATH))
 
 
-def _read_commands():
-    if not COMMANDS_PATH.exists():
-        return []
-    text = COMMANDS_PATH.read_text().strip()
-    if not text:
-        return []
-    try:
-        commands = json.loads(text)
-    except json.JSONDecodeError:
-        return []
-    COMMANDS_PATH.write_text("[]")
-    return commands
-
-
 def _add_task(task_text):
     tasks = []
     if TASKS_PATH.exists():
@@ -114,6 +150,7 @@ def _add_task(task_text):
                 tasks = []
     tasks.append(task_text)
     TASKS_PATH.write_text(json.dumps(tasks, indent=2))
+    ring(TASKS_PATH)
 
 
 def random_grid(obstacle_pct=0.15):
@@ -190,10 +227,27 @@ def make_bot(grid, exclude):
         "path": [],
         "path_idx": 0,
         "visited": set(),
+        "path_id": 0,   # paths started, for arrival events
+        "cmd": None,    # id of the command that started the path
         "last_move": 0,
     }
 
 
+def set_path(events, bot_idx, bot, path, cmd=None):
+    """Start bot on a new path (None if there is none) and publish it."""
+    bot["path_id"] += 1
+    bot["cmd"] = cmd
+    bot["path"] = path or []
+    bot["path_idx"] = 1 if path else 0
+    bot["visited"] = set()
+    if not path:
+        events.bot_event(bot_idx, bot, "failed")
+        return
+    events.bot_event(bot_idx, bot, "start")
+    if len(path) == 1:
+        events.bot_event(bot_idx, bot, "arrived")
+
+
 def draw(screen, font, grid, bots, coins, score, input_text):
     # --- Grid ---
     for r in range(GRID_SIZE):
@@ -263,8 +317,13 @@ def draw(screen, font, grid, bots, coins, score, input_text):
 
 
 def main():
+    global _plane
     FILES_DIR.mkdir(parents=True, exist_ok=True)
-    COMMANDS_PATH.write_text("[]")
+    CommandJournal(COMMANDS_PATH).reset()
+    journal = JournalReader(COMMANDS_PATH, compact_bytes=MAX_BYTES)
+    commands_bell = Doorbell(COMMANDS_PATH)
+    last_command_check = 0
+    events = EventWriter(EVENTS_PATH)
 
     pygame.init()
     screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
@@ -273,6 +332,8 @@ def main():
     font = pygame.font.SysFont("menlo", 16) or pygame.font.SysFont(None, 18)
 
     grid = random_grid()
+    _plane = StatePlane.create(STATE_SHM, grid.shape, NUM_BOTS,
+                               layers={"coins": np.uint8}, scalars=("score",))
 
     # Spawn bots
     bots = []
@@ -300,6 +361,7 @@ def main():
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 elif event.key == pygame.K_r and not input_text:
+                    _pf.invalidate_cache()
                     grid = random_grid()
                     bots = []
                     for _ in range(NUM_BOTS):
@@ -330,17 +392,18 @@ def main():
                         )
                         bot = bots[nearest]
                         bot["target"] = (tr, tc)
-                        result = _pf.find_path(grid, start=bot["pos"], goal=(tr, tc))
-                        if result:
-                            bot["path"] = result
-                            bot["path_idx"] = 1
-                        else:
-                            bot["path"] = []
-                            bot["path_idx"] = 0
-                        bot["visited"] = set()
+                        result = straighten(
+                            grid, _pf.find_path(grid, start=bot["pos"], goal=(tr, tc))
+                        )
+                        set_path(events, nearest, bot, result)
 
         # Check for commands from main.py
-        commands = _read_commands()
+        commands = []
+        if commands_bell.rung() or pygame.time.get_ticks() - last_command_check >= COMMAND_POLL_MS:
+            commands = journal.read()
+            last_command_check = pygame.time.get_ticks()
+        moves = {}  # bot_idx -> goal, planned together after the loop
+        cmd_ids = {}  # bot_idx -> id of the move_to command, if any
         for cmd in commands:
             action = cmd.get("action")
             bot_idx = cmd.get("bot", 0)
@@ -354,16 +417,12 @@ def main():
                 tr, tc = int(tr), int(tc)
                 if 0 <= tr < GRID_SIZE and 0 <= tc < GRID_SIZE and grid[tr, tc] == 0:
                     bot["target"] = (tr, tc)
-                    result = _pf.find_path(grid, start=bot["pos"], goal=(tr, tc))
-                    if result:
-                        bot["path"] = result
-                        bot["path_idx"] = 1
-                        print(f"[sim] Bot {bot_idx}: moving to ({tr}, {tc}) — {len(result)} steps")
-                    else:
-                        print(f"[sim] Bot {bot_idx}: no path to ({tr}, {tc})")
-                        bot["path"] = []
-                        bot["path_idx"] = 0
-                    bot["visited"] = set()
+                    moves[bot_idx] = (tr, tc)
+                    cmd_ids[bot_idx] = cmd.get("id")
+                else:
+                    # Rejected: the bot carries on with its current path
+                    print(f"[sim] Bot {bot_idx}: invalid target ({tr}, {tc})")
+                    events.bot_event(bot_idx, bot, "failed", cmd.get("id"))
             elif action == "collect":
                 if bot["pos"] in coins:
                     coins.discard(bot["pos"])
@@ -373,6 +432,23 @@ def main():
                 else:
                     print(f"[sim] Bot {bot_idx}: no coin at {bot['pos']}")
 
+        # Plan this frame's moves together: one batched forward pass for
+        # all goals, and one flow field for goals shared by several bots
+        if moves:
+            plans, plan_stats = _pf.find_paths_batch(
+                grid, [(bots[i]["pos"], goal) for i, goal in moves.items()],
+                shared_flow=True, return_stats=True,
+            )
+            print(f"[sim] {plan_stats}")
+            for (bot_idx, (tr, tc)), result in zip(moves.items(), plans):
+                bot = bots[bot_idx]
+                result = straighten(grid, result)
+                set_path(events, bot_idx, bot, result, cmd_ids[bot_idx])
+                if result:
+                    print(f"[sim] Bot {bot_idx}: moving to ({tr}, {tc}) — {len(result)} steps")
+                else:
+                    print(f"[sim] Bot {bot_idx}: no path to ({tr}, {tc})")
+
         # Animate all bots along their paths
         now = pygame.time.get_ticks()
         state_changed = False
@@ -390,11 +466,17 @@ def main():
                     bot["orientation"] = new_orient
 
                 if bot["path_idx"] >= len(bot["path"]):
+                    events.bot_event(i, bot, "arrived")
                     bot["target"] = None
                     bot["path"] = []
+                else:
+                    events.bot_event(i, bot, "progress")
+        events.flush()
 
         if state_changed:
             _write_state(bots, coins, score)
+        else:
+            _export_state(bots, coins, score)
 
         # Save screenshot periodically
         if now - last_screenshot >= SCREENSHOT_INTERVAL_MS:
@@ -404,6 +486,8 @@ def main():
         draw(screen, font, grid, bots, coins, score, input_text)
         clock.tick(FPS)
 
+    commands_bell.close()
+    _plane.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,24 @@
+"""Grid search shared by every world's pathfinder."""
+
+from .search import GridGraph, astar, grid_digest
+from .fields import ExactHeuristic, FlowField, distance_field, distance_fields
+from .jps import JumpPointGraph, jps
+from .hierarchy import HierarchicalGraph
+from .incremental import DStarLite, IncrementalPlanner
+from .heuristics import LandmarkHeuristic, OctileHeuristic
+from .smoothing import line_of_sight, rasterize, smooth_path
+from .anytime import ara_star
+from .reservation import ReservationTable, plan_timed_paths, plan_waves
+from .assignment import TargetAssigner
+
+__all__ = [
+    'GridGraph', 'astar', 'grid_digest',
+    'ExactHeuristic', 'FlowField', 'distance_field', 'distance_fields',
+    'JumpPointGraph', 'jps', 'HierarchicalGraph',
+    'DStarLite', 'IncrementalPlanner',
+    'LandmarkHeuristic', 'OctileHeuristic',
+    'line_of_sight', 'rasterize', 'smooth_path',
+    'ara_star',
+    'ReservationTable', 'plan_timed_paths', 'plan_waves',
+    'TargetAssigner',
+]
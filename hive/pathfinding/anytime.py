@@ -0,0 +1,168 @@
+"""
+Anytime search: ARA* (Anytime Repairing A*) with a deadline.
+
+ARA* first runs weighted A* with f = g + eps * h for a large inflation
+factor eps, which finds a path quickly, then lowers eps step by step and
+repairs the previous search instead of starting over: only states whose
+cost improved after they were expanded (the INCONS list) are re-opened.
+Each finished iteration yields a better (or equal) path; the search
+stops at eps = 1 or when the deadline passes, and returns the best path
+found so far.
+
+The first path is always completed, even past the deadline, so a
+reachable goal never returns None; refinement only happens inside it.
+
+Along with the path, ara_star() reports a suboptimality bound: the path
+cost divided by a lower bound on the optimal cost, min(g + lower) over
+the open and inconsistent states. lower must be admissible (octile
+distance by default), the search heuristic h need not be — the CNN's
+estimates are not. If h is admissible too, eps itself also bounds the
+path and the smaller of the two is reported.
+
+Move rules are the same as pathfinding.search.
+
+Usage:
+    from pathfinding.anytime import ara_star
+
+    path, bound = ara_star(grid, start, goal, h=h_map, deadline_ms=10)
+    # cost(path) <= bound * optimal cost
+"""
+
+import heapq
+import time
+
+from .heuristics import octile_map
+from .search import (SQRT2, add_counters, flat_heuristic, free_mask, neighbor_offsets,
+                     pack, unpack)
+
+_INF = float("inf")
+
+# Expansions between deadline checks
+_CLOCK_EVERY = 256
+
+
+def ara_star(grid, start, goal, h=None, deadline_ms=50.0, eps0=3.0, eps_step=0.5,
+             lower=None, admissible=False, diag_cost=SQRT2, stats=None):
+    """
+    Anytime A* from start to goal within a deadline.
+
+    Args:
+        grid:        (H, W) numpy array — 0 = free, 1 = obstacle
+        start:       (row, col) tuple
+        goal:        (row, col) tuple
+        h:           (H, W) heuristic array, or None for octile distance
+        deadline_ms: time budget; refinement stops once it has passed
+        eps0:        initial inflation factor (>= 1)
+        eps_step:    amount eps is lowered after each iteration
+        lower:       admissible (H, W) lower bound on cost-to-go used for
+                     the reported bound; octile distance if None
+        admissible:  h never overestimates, so eps also bounds the path
+        diag_cost:   cost of a diagonal move
+        stats:       optional dict; expanded / pushes / reopened counts are
+                     added to it, and "iterations" and "eps" (final
+                     inflation factor) are set
+
+    Returns:
+        (path, bound): path is a list of (row, col) tuples or None if no
+        path exists; bound >= 1 limits its cost relative to the optimum
+        (None with no path).
+    """
+    if eps0 < 1.0 or eps_step <= 0:
+        raise ValueError(f"Need eps0 >= 1 and eps_step > 0, got {eps0}, {eps_step}")
+    t_end = time.perf_counter() + deadline_ms / 1000.0
+    grid_shape = grid.shape
+    width = grid_shape[1]
+    if h is None:
+        h = octile_map(grid_shape, goal, diag_cost)
+        admissible = True
+    if lower is None:
+        lower = h if admissible else octile_map(grid_shape, goal, diag_cost)
+
+    free = free_mask(grid)
+    h_flat = flat_heuristic(h)
+    lb_flat = flat_heuristic(lower)
+    offsets = neighbor_offsets(width, diag_cost)
+    n = len(free)
+    s = pack(int(start[0]), int(start[1]), width)
+    t = pack(int(goal[0]), int(goal[1]), width)
+
+    g_cost = [_INF] * n
+    parent = [-1] * n
+    g_cost[s] = 0.0
+    open_nodes = {s}  # nodes with a live open-list entry
+    incons = set()
+    expanded = pushes = reopened = iterations = 0
+
+    best_path, best_bound = None, None
+    eps = float(eps0)
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while True:
+        # (Re)build the open list for this eps, merging INCONS back in
+        open_nodes |= incons
+        incons = set()
+        heap = [(g_cost[u] + eps * h_flat[u], g_cost[u], u) for u in open_nodes]
+        heapq.heapify(heap)
+        pushes += len(heap)
+        closed = bytearray(n)
+        timed_out = False
+
+        while heap and heap[0][0] < g_cost[t]:
+            f, g, u = heappop(heap)
+            if closed[u] or g != g_cost[u]:
+                continue  # stale entry
+            open_nodes.discard(u)
+            closed[u] = 1
+            expanded += 1
+            if (best_path is not None and expanded % _CLOCK_EVERY == 0
+                    and time.perf_counter() >= t_end):
+                timed_out = True
+                break
+            for off, move_cost in offsets:
+                v = u + off
+                if free[v]:
+                    ng = g + move_cost
+                    if ng < g_cost[v]:
+                        g_cost[v] = ng
+                        parent[v] = u
+                        if closed[v]:
+                            incons.add(v)
+                            reopened += 1
+                        else:
+                            open_nodes.add(v)
+                            heappush(heap, (ng + eps * h_flat[v], ng, v))
+                            pushes += 1
+
+        if timed_out:
+            break
+        iterations += 1
+        if g_cost[t] == _INF:
+            break  # goal unreachable
+
+        best_path = _unfold(parent, s, t, width)
+        lb = min((g_cost[u] + lb_flat[u] for u in open_nodes | incons), default=_INF)
+        best_bound = max(1.0, g_cost[t] / lb) if lb > 0 else 1.0
+        if admissible:
+            best_bound = min(best_bound, eps)
+        if eps <= 1.0 or best_bound <= 1.0 or time.perf_counter() >= t_end:
+            break
+        eps = max(1.0, eps - eps_step)
+
+    if stats is not None:
+        add_counters(stats, {"expanded": expanded, "pushes": pushes,
+                             "reopened": reopened})
+        stats["iterations"] = iterations
+        stats["eps"] = eps
+    return best_path, best_bound
+
+
+def _unfold(parent, s, t, width):
+    path = []
+    u = t
+    while u != -1:
+        path.append(unpack(u, width))
+        if u == s:
+            break
+        u = parent[u]
+    path.reverse()
+    return path
@@ -0,0 +1,144 @@
+"""
+Bot-to-target assignment on real path distances.
+
+Matching bots to targets by Manhattan distance sends bots to targets
+behind walls, which they then reach by long detours. TargetAssigner
+builds the cost matrix from exact distance fields instead — one per
+target, all from a single distance_fields() call, read at every bot cell
+with one fancy-indexing gather per target — and solves it with scipy's
+linear_sum_assignment.
+
+Calls in a stream (the hand-tracking loop reassigns about once a second,
+mostly to the same cells) are incremental:
+
+    fields   cached per (grid, target), so only new targets cost a
+             Dijkstra run
+    pairs    a bot already standing on a target keeps it, and only the
+             rest go to the solver; path lengths obey the triangle
+             inequality, so swapping any optimal matching onto these
+             zero-cost pairs never costs more — the result stays optimal
+
+Once the swarm has settled into a formation, a new pose moves only the
+bots whose cells changed, and the solver sees just those.
+
+Usage:
+    from pathfinding.assignment import TargetAssigner
+
+    assigner = TargetAssigner()
+    pairs = assigner.assign(grid, bot_positions, target_positions)
+    # [(bot index, target index), ...] for min(n_bots, n_targets) pairs
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .fields import distance_fields
+from .search import SQRT2, grid_digest
+
+
+class TargetAssigner:
+    """
+    Assigns bots to targets on path distances, reusing work between calls.
+
+    Thread-safe; one instance can serve every call on a world.
+    """
+
+    def __init__(self, max_fields=2048, diag_cost=SQRT2):
+        self.max_fields = max(0, int(max_fields))
+        self.diag_cost = diag_cost
+        self._fields = OrderedDict()  # (grid digest, target) -> distance field
+        self._lock = threading.Lock()
+
+    def _get_fields(self, grid, targets, stats):
+        digest = grid_digest(grid)
+        with self._lock:
+            fields = [self._fields.get((digest, t)) for t in targets]
+            for t, f in zip(targets, fields):
+                if f is not None:
+                    self._fields.move_to_end((digest, t))
+        missing = [t for t, f in zip(targets, fields) if f is None]
+        if missing:
+            fresh = dict(zip(missing, distance_fields(grid, missing, self.diag_cost)))
+            fields = [fresh[t] if f is None else f for t, f in zip(targets, fields)]
+            with self._lock:
+                for t in missing:
+                    self._fields[(digest, t)] = fresh[t]
+                while len(self._fields) > self.max_fields:
+                    self._fields.popitem(last=False)
+        if stats is not None:
+            stats["fields"] = stats.get("fields", 0) + len(missing)
+            stats["cached"] = stats.get("cached", 0) + len(targets) - len(missing)
+        return fields
+
+    def cost_matrix(self, grid, bots, targets, stats=None):
+        """
+        (n_bots, n_targets) path lengths; unreachable pairs cost more than
+        any path on the grid.
+        """
+        grid = np.asarray(grid)
+        targets = [(int(r), int(c)) for r, c in targets]
+        bots = np.asarray(bots, dtype=np.intp).reshape(-1, 2)
+        fields = self._get_fields(grid, targets, stats)
+        cost = np.empty((len(bots), len(targets)))
+        for j, field in enumerate(fields):
+            cost[:, j] = field[bots[:, 0], bots[:, 1]]
+        cost[~np.isfinite(cost)] = 2.0 * grid.size
+        return cost
+
+    def assign(self, grid, bots, targets, stats=None):
+        """
+        Matching of bots to targets with the least total path length.
+
+        Args:
+            grid:    (H, W) numpy array — 0 = free, 1 = obstacle
+            bots:    (row, col) bot positions
+            targets: (row, col) target cells, without duplicates
+            stats:   optional dict; "fields" (computed) / "cached" field
+                     counts are added to it, and "kept" (bots already on
+                     a target), "solved" (bots given to the solver) and
+                     "cost" (total path length) are set
+
+        Returns:
+            list of (bot_idx, target_idx) pairs, min(n_bots, n_targets) long
+        """
+        from scipy.optimize import linear_sum_assignment
+
+        bots = [(int(r), int(c)) for r, c in bots]
+        targets = [(int(r), int(c)) for r, c in targets]
+        if not bots or not targets:
+            return []
+
+        # Bots standing on a target keep it
+        target_idx = {t: j for j, t in enumerate(targets)}
+        pairs = []
+        kept = set()
+        for i, pos in enumerate(bots):
+            j = target_idx.get(pos)
+            if j is not None and j not in kept:
+                pairs.append((i, j))
+                kept.add(j)
+        held = {i for i, _j in pairs}
+        rows = [i for i in range(len(bots)) if i not in held]
+        cols = [j for j in range(len(targets)) if j not in kept]
+
+        cost = 0.0
+        if rows and cols:
+            sub = self.cost_matrix(grid, [bots[i] for i in rows],
+                                   [targets[j] for j in cols], stats)
+            r, c = linear_sum_assignment(sub)
+            pairs += [(rows[a], cols[b]) for a, b in zip(r, c)]
+            cost = float(sub[r, c].sum())
+        pairs.sort()
+
+        if stats is not None:
+            stats["kept"] = len(held)
+            stats["solved"] = len(rows)
+            stats["cost"] = cost
+        return pairs
+
+    def invalidate_cache(self):
+        """Drop every cached field (they are keyed by grid, so this only frees memory)."""
+        with self._lock:
+            self._fields.clear()
@@ -0,0 +1,116 @@
+"""
+Classical heuristic providers for the A* kernel.
+
+A heuristic provider has a name and a heuristic_map(grid, goal) method
+returning an (H, W) cost-to-go estimate, so it can stand in for the CNN in
+NeuralPathfinder.find_path(..., heuristic=provider) or be passed to
+pathfinding.search.astar() directly. Providers whose maps never
+overestimate set admissible = True. Neither provider needs torch.
+
+    OctileHeuristic   — closed-form 8-connected distance ignoring obstacles
+    LandmarkHeuristic — ALT: triangle-inequality bounds from K landmarks
+
+Usage:
+    from pathfinding.heuristics import LandmarkHeuristic
+
+    alt = LandmarkHeuristic(num_landmarks=8)
+    path = astar(grid, start, goal, alt.heuristic_map(grid, goal))
+"""
+
+import numpy as np
+
+from .fields import distance_field
+from .search import SQRT2, grid_digest
+
+
+def octile_map(shape, goal, diag_cost=SQRT2):
+    """(H, W) octile distance from every cell to goal, ignoring obstacles."""
+    rows, cols = np.indices(shape)
+    dr = np.abs(rows - goal[0])
+    dc = np.abs(cols - goal[1])
+    return np.maximum(dr, dc) + (diag_cost - 1.0) * np.minimum(dr, dc)
+
+
+class OctileHeuristic:
+    """Admissible, obstacle-blind baseline heuristic."""
+
+    name = "octile"
+    admissible = True
+
+    def __init__(self, diag_cost=SQRT2):
+        self.diag_cost = diag_cost
+
+    def heuristic_map(self, grid, goal):
+        return octile_map(grid.shape, goal, self.diag_cost)
+
+
+class LandmarkHeuristic:
+    """
+    ALT heuristic: A*, Landmarks and the Triangle inequality.
+
+    For each grid, picks num_landmarks free cells by farthest-point
+    selection and precomputes an exact distance field from each one. For
+    any landmark L, |d(L, goal) - d(L, n)| is a lower bound on d(n, goal),
+    so the max over landmarks (and the octile distance) is admissible.
+
+    Tables are stored as a compact (K, H, W) float32 array and rebuilt only
+    when the grid contents change.
+    """
+
+    name = "alt"
+    admissible = True
+
+    # float32 tables round each distance by up to half an ulp; shaving this
+    # much off every bound keeps the heuristic admissible on 64x64 grids
+    _ROUNDING_SLACK = 1e-3
+
+    def __init__(self, num_landmarks=8, diag_cost=SQRT2):
+        self.num_landmarks = max(1, int(num_landmarks))
+        self.diag_cost = diag_cost
+        self.landmarks = []
+        self.tables = None
+        self._digest = None
+
+    def prepare(self, grid):
+        """Select landmarks and build distance tables (no-op if unchanged)."""
+        digest = grid_digest(grid)
+        if digest == self._digest:
+            return
+        free = np.argwhere(np.asarray(grid) == 0)
+        landmarks, tables = [], []
+        if len(free):
+            # Farthest-point selection; unreachable cells count as
+            # infinitely far, so every connected region gets a landmark.
+            nearest = np.full(grid.shape, np.inf)
+            nearest[np.asarray(grid) != 0] = -1.0
+            seed = tuple(int(x) for x in free[len(free) // 2])
+            far = distance_field(grid, seed, self.diag_cost)
+            far[np.asarray(grid) != 0] = -1.0
+            candidate = np.unravel_index(np.argmax(far), grid.shape)
+            for _ in range(min(self.num_landmarks, len(free))):
+                landmark = (int(candidate[0]), int(candidate[1]))
+                if nearest[landmark] <= 0:
+                    break  # every free cell is already a landmark
+                table = distance_field(grid, landmark, self.diag_cost)
+                landmarks.append(landmark)
+                tables.append(table.astype(np.float32))
+                np.minimum(nearest, table, out=nearest, where=np.asarray(grid) == 0)
+                candidate = np.unravel_index(np.argmax(nearest), grid.shape)
+
+        self.landmarks = landmarks
+        self.tables = np.stack(tables) if tables else np.zeros((0,) + grid.shape, np.float32)
+        self._digest = digest
+
+    def heuristic_map(self, grid, goal):
+        self.prepare(grid)
+        h = octile_map(grid.shape, goal, self.diag_cost)
+        if not len(self.tables):
+            return h
+
+        to_goal = self.tables[:, goal[0], goal[1]][:, np.newaxis, np.newaxis]
+        with np.errstate(invalid="ignore"):
+            bounds = np.abs(to_goal - self.tables)
+        # inf - inf: landmark reaches neither cell, so it gives no bound
+        bounds[np.isnan(bounds)] = 0.0
+        alt = bounds.max(axis=0) - self._ROUNDING_SLACK
+        return np.maximum(h, alt)
@@ -0,0 +1,436 @@
+"""
+Hierarchical pathfinding (HPA*) for grids larger than one model tile.
+
+HeuristicNetV2 only accepts 64x64 inputs, so large arenas are cut into
+square tiles and planned on two levels:
+
+    abstract — transition cells on tile borders form a graph. Inter-tile
+               edges are single steps across a border; intra-tile edges
+               are exact in-tile costs read from a distance field per
+               transition cell. A* over this graph picks the tile sequence.
+    concrete — each in-tile hop is refined inside its tile, either with a
+               caller-supplied search (e.g. NeuralPathfinder on the tile)
+               or by following the cached distance field.
+
+Transitions are grouped by the pair of connected components they join on
+either side of a border, one transition per max_span cells, so noisy
+borders do not explode the graph while every crossing stays reachable.
+Distance fields are computed lazily the first time a transition is
+expanded and are kept until its tile changes; update() diffs the new grid
+tile by tile and only rebuilds borders and edges around changed tiles.
+
+Paths are complete (a path is found whenever one exists) and usually
+within a few percent of optimal.
+
+Usage:
+    from pathfinding.hierarchy import HierarchicalGraph
+
+    graph = HierarchicalGraph(grid, tile=64)     # e.g. a 512x512 arena
+    path = graph.find_path(start, goal)
+    graph.update(new_grid)                       # only changed tiles rebuilt
+"""
+
+import heapq
+from collections import deque
+
+import numpy as np
+
+from .fields import FlowField, distance_field
+from .search import SQRT2, free_mask, neighbor_offsets, pack, unpack
+
+_INF = float("inf")
+
+
+def _components(grid):
+    """8-connected component labels of the free cells; -1 where blocked."""
+    free = np.asarray(grid) == 0
+    H, W = free.shape
+    flat = free_mask(grid)
+    offsets = [o for o, _cost in neighbor_offsets(W)]
+    labels = np.full((H, W), -1, dtype=np.int32)
+    seen = bytearray(len(flat))
+    n_labels = 0
+    for r, c in zip(*np.nonzero(free)):
+        node = pack(int(r), int(c), W)
+        if seen[node]:
+            continue
+        seen[node] = 1
+        queue = deque([node])
+        while queue:
+            u = queue.popleft()
+            labels[unpack(u, W)] = n_labels
+            for o in offsets:
+                v = u + o
+                if flat[v] and not seen[v]:
+                    seen[v] = 1
+                    queue.append(v)
+        n_labels += 1
+    return labels
+
+
+class HierarchicalGraph:
+    """
+    Abstract tile graph over one obstacle grid.
+
+    Args:
+        grid:      (H, W) numpy array — 0 = free, 1 = obstacle
+        tile:      tile side in cells (64 matches the neural heuristic)
+        diag_cost: cost of a diagonal move
+        max_span:  at most one transition per this many border cells for
+                   each pair of connected regions
+    """
+
+    def __init__(self, grid, tile=64, diag_cost=SQRT2, max_span=8):
+        if tile < 2:
+            raise ValueError(f"tile must be at least 2, got {tile}")
+        self.tile = int(tile)
+        self.diag_cost = diag_cost
+        self.max_span = max(1, int(max_span))
+        self.grid = np.array(grid, copy=True)
+        self.shape = self.grid.shape
+        self._free = self.grid == 0
+        H, W = self.shape
+        self.tile_rows = -(-H // self.tile)
+        self.tile_cols = -(-W // self.tile)
+
+        self._labels = {}     # tile -> component labels
+        self._segments = {}   # border key -> [(a, b, cost), ...]
+        self._inter = {}      # cell -> {cell in another tile: cost}
+        self._nodes = {}      # tile -> set of transition cells
+        self._fields = {}     # transition cell -> in-tile distance field
+        self._intra = {}      # transition cell -> [(cell, cost), ...]
+
+        tiles = [(i, j) for i in range(self.tile_rows)
+                 for j in range(self.tile_cols)]
+        for t in tiles:
+            self._nodes[t] = set()
+            self._labels[t] = _components(self.tile_grid(t))
+        for key in self._segment_keys(tiles):
+            self._set_segment(key, self._build_segment(key))
+
+    # -- tiles -------------------------------------------------------------
+
+    def tile_of(self, cell):
+        """Tile index (tile_row, tile_col) containing a (row, col) cell."""
+        return (cell[0] // self.tile, cell[1] // self.tile)
+
+    def tile_slice(self, t):
+        """Row/column slices of tile t in the full grid."""
+        i, j = t
+        return (slice(i * self.tile, min((i + 1) * self.tile, self.shape[0])),
+                slice(j * self.tile, min((j + 1) * self.tile, self.shape[1])))
+
+    def tile_grid(self, t):
+        """Obstacle grid of tile t (a view; edge tiles may be smaller)."""
+        return self.grid[self.tile_slice(t)]
+
+    def _local(self, cell):
+        return (cell[0] % self.tile, cell[1] % self.tile)
+
+    def _label(self, cell):
+        return int(self._labels[self.tile_of(cell)][self._local(cell)])
+
+    # -- borders -----------------------------------------------------------
+
+    def _segment_keys(self, tiles):
+        """Border segments whose transitions depend on any of tiles."""
+        keys = set()
+        for i, j in tiles:
+            for di in (-1, 0):
+                keys.add(("h", i + di, j))
+                for dj in (-1, 0):
+                    keys.add(("v", i + di, j + dj))
+        return [(kind, i, j) for kind, i, j in keys
+                if 0 <= i < self.tile_rows and 0 <= j < self.tile_cols
+                and (kind != "v" or j + 1 < self.tile_cols)
+                and (kind != "h" or i + 1 < self.tile_rows)]
+
+    def _crossings(self, key):
+        """
+        Every single-step move across one border segment, as (a, b, cost).
+
+        "v" segments cross the line between tile columns j and j + 1 for
+        the rows of tile row i, including diagonals into the next tile row;
+        "h" segments cross between tile rows i and i + 1 within tile column
+        j. Diagonals are only listed where both cells bridging them are
+        blocked; otherwise a straight crossing already connects the same
+        regions.
+        """
+        kind, i, j = key
+        free = self._free
+        H, W = self.shape
+        diag = self.diag_cost
+        out = []
+        if kind == "v":
+            c0 = (j + 1) * self.tile - 1
+            for r in range(i * self.tile, min((i + 1) * self.tile, H)):
+                if free[r, c0] and free[r, c0 + 1]:
+                    out.append(((r, c0), (r, c0 + 1), 1.0))
+                if r + 1 >= H:
+                    continue
+                if (free[r, c0] and free[r + 1, c0 + 1]
+                        and not free[r, c0 + 1] and not free[r + 1, c0]):
+                    out.append(((r, c0), (r + 1, c0 + 1), diag))
+                if (free[r + 1, c0] and free[r, c0 + 1]
+                        and not free[r, c0] and not free[r + 1, c0 + 1]):
+                    out.append(((r + 1, c0), (r, c0 + 1), diag))
+        else:
+            r0 = (i + 1) * self.tile - 1
+            lo, hi = j * self.tile, min((j + 1) * self.tile, W)
+            for c in range(lo, hi):
+                if free[r0, c] and free[r0 + 1, c]:
+                    out.append(((r0, c), (r0 + 1, c), 1.0))
+                if c + 1 >= hi:
+                    continue
+                if (free[r0, c] and free[r0 + 1, c + 1]
+                        and not free[r0, c + 1] and not free[r0 + 1, c]):
+                    out.append(((r0, c), (r0 + 1, c + 1), diag))
+                if (free[r0, c + 1] and free[r0 + 1, c]
+                        and not free[r0, c] and not free[r0 + 1, c + 1]):
+                    out.append(((r0, c + 1), (r0 + 1, c), diag))
+        return out
+
+    def _build_segment(self, key):
+        """Transitions for one border segment (see module docstring)."""
+        groups = {}
+        for a, b, cost in self._crossings(key):
+            region = (self.tile_of(a), self._label(a),
+                      self.tile_of(b), self._label(b))
+            groups.setdefault(region, []).append((a, b, cost))
+
+        along = 0 if key[0] == "v" else 1
+        transitions = []
+        for crossings in groups.values():
+            chunk = []
+            for crossing in crossings:
+                if chunk and crossing[0][along] - chunk[0][0][along] >= self.max_span:
+                    transitions.append(chunk[len(chunk) // 2])
+                    chunk = []
+                chunk.append(crossing)
+            transitions.append(chunk[len(chunk) // 2])
+        return transitions
+
+    def _set_segment(self, key, transitions):
+        """Swap a segment's transitions into the graph; returns touched tiles."""
+        touched = set()
+        for a, b, _cost in self._segments.get(key, ()):
+            for u, v in ((a, b), (b, a)):
+                edges = self._inter[u]
+                del edges[v]
+                if not edges:
+                    del self._inter[u]
+                    self._nodes[self.tile_of(u)].discard(u)
+                touched.add(self.tile_of(u))
+        for a, b, cost in transitions:
+            for u, v in ((a, b), (b, a)):
+                self._inter.setdefault(u, {})[v] = cost
+                self._nodes[self.tile_of(u)].add(u)
+                touched.add(self.tile_of(u))
+        self._segments[key] = transitions
+        return touched
+
+    # -- updates -----------------------------------------------------------
+
+    def update(self, grid, tiles=None):
+        """
+        Bring the graph in line with a new grid of the same shape.
+
+        Only tiles whose cells changed (or the given tiles) get new
+        component labels, and only the borders around them and the
+        in-tile edges of tiles whose transitions moved are rebuilt.
+
+        Returns:
+            List of tiles that were rebuilt.
+        """
+        grid = np.asarray(grid)
+        if grid.shape != self.shape:
+            raise ValueError(f"grid shape {grid.shape} != {self.shape}")
+        if tiles is None:
+            tiles = [t for t in self._nodes
+                     if not np.array_equal(grid[self.tile_slice(t)],
+                                           self.grid[self.tile_slice(t)])]
+        tiles = sorted(set(tiles))
+        if not tiles:
+            return []
+
+        self.grid = np.array(grid, copy=True)
+        self._free = self.grid == 0
+        for t in tiles:
+            self._labels[t] = _components(self.tile_grid(t))
+
+        # Fields depend on the cell's own tile; edge lists also on which
+        # transitions share it
+        stale = set(tiles)
+        for key in self._segment_keys(tiles):
+            stale |= self._set_segment(key, self._build_segment(key))
+        for cell in list(self._fields):
+            if self.tile_of(cell) in stale and (
+                    self.tile_of(cell) in tiles or cell not in self._inter):
+                del self._fields[cell]
+        for cell in list(self._intra):
+            if self.tile_of(cell) in stale:
+                del self._intra[cell]
+        return tiles
+
+    def info(self):
+        """Graph size: tiles, transition cells, inter edges, cached fields."""
+        return {
+            "tiles": len(self._nodes),
+            "transitions": sum(len(n) for n in self._nodes.values()),
+            "inter_edges": sum(len(e) for e in self._inter.values()) // 2,
+            "fields": len(self._fields),
+        }
+
+    # -- abstract search ---------------------------------------------------
+
+    def _field(self, cell):
+        """In-tile distance field to cell, cached for transition cells."""
+        dist = self._fields.get(cell)
+        if dist is None:
+            dist = distance_field(self.tile_grid(self.tile_of(cell)),
+                                  self._local(cell), self.diag_cost)
+            if cell in self._inter:
+                self._fields[cell] = dist
+        return dist
+
+    def _intra_edges(self, cell):
+        """(cell, cost) edges to the other transitions in cell's tile."""
+        edges = self._intra.get(cell)
+        if edges is None:
+            dist = self._field(cell)
+            edges = []
+            for v in self._nodes[self.tile_of(cell)]:
+                cost = dist[self._local(v)]
+                if v != cell and cost < _INF:
+                    edges.append((v, float(cost)))
+            self._intra[cell] = edges
+        return edges
+
+    def _octile(self, a, b):
+        dr, dc = abs(a[0] - b[0]), abs(a[1] - b[1])
+        return max(dr, dc) + (self.diag_cost - 1.0) * min(dr, dc)
+
+    def abstract_path(self, start, goal):
+        """
+        Waypoints from start to goal through border transitions.
+
+        Consecutive waypoints are either in the same tile (an in-tile hop)
+        or adjacent across a border (a single step).
+
+        Returns:
+            List of (row, col) tuples, or None if no path exists.
+        """
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        if not (self._free[start] and self._free[goal]):
+            return None
+        if start == goal:
+            return [start]
+
+        s_tile, g_tile = self.tile_of(start), self.tile_of(goal)
+        s_dist = self._field(start)
+        g_dist = self._field(goal)
+
+        def neighbours(u):
+            edges = list(self._inter.get(u, {}).items())
+            if u == start:
+                edges += [(v, float(s_dist[self._local(v)]))
+                          for v in self._nodes[s_tile] if v != start]
+                if g_tile == s_tile:
+                    edges.append((goal, float(s_dist[self._local(goal)])))
+                return edges
+            edges += self._intra_edges(u)
+            if self.tile_of(u) == g_tile:
+                edges.append((goal, float(g_dist[self._local(u)])))
+            return edges
+
+        g_cost = {start: 0.0}
+        parent = {start: None}
+        closed = set()
+        heap = [(self._octile(start, goal), 0.0, start)]
+        while heap:
+            _f, g, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            closed.add(u)
+            if u == goal:
+                waypoints = []
+                while u is not None:
+                    waypoints.append(u)
+                    u = parent[u]
+                return waypoints[::-1]
+            for v, cost in neighbours(u):
+                ng = g + cost
+                if ng < g_cost.get(v, _INF):
+                    g_cost[v] = ng
+                    parent[v] = u
+                    heapq.heappush(heap, (ng + self._octile(v, goal), ng, v))
+        return None
+
+    # -- refinement --------------------------------------------------------
+
+    def _field_hop(self, a, b):
+        """Exact in-tile path a -> b by descending b's distance field."""
+        t = self.tile_of(b)
+        field = FlowField(self.tile_grid(t), self._local(b), self._field(b),
+                          self.diag_cost)
+        local = field.path(self._local(a))
+        if local is None:
+            return None
+        r0, c0 = t[0] * self.tile, t[1] * self.tile
+        return [(r + r0, c + c0) for r, c in local]
+
+    def find_paths(self, requests, refine=None):
+        """
+        Plan many start/goal pairs; in-tile hops are refined per tile.
+
+        Args:
+            requests: list of ((row, col) start, (row, col) goal) pairs
+            refine:   optional callable(tile_grid, [(start, goal), ...])
+                      returning one tile-local path (or None) per pair;
+                      hops it cannot serve fall back to the distance field
+
+        Returns:
+            List of paths in request order; each is a list of (row, col)
+            tuples, or None if no path exists.
+        """
+        plans = [self.abstract_path(s, g) for s, g in requests]
+
+        # In-tile hops to refine, grouped so each tile is refined once
+        hops = {}
+        for waypoints in plans:
+            for a, b in zip(waypoints or (), (waypoints or ())[1:]):
+                t = self.tile_of(a)
+                if t == self.tile_of(b):
+                    hops.setdefault(t, {})[(a, b)] = None
+        for t, pairs in hops.items():
+            keys = list(pairs)
+            local = [None] * len(keys)
+            if refine is not None:
+                local = refine(self.tile_grid(t), [(self._local(a), self._local(b))
+                                                   for a, b in keys])
+            r0, c0 = t[0] * self.tile, t[1] * self.tile
+            for (a, b), path in zip(keys, local):
+                if path is None:
+                    pairs[(a, b)] = self._field_hop(a, b)
+                else:
+                    pairs[(a, b)] = [(int(r) + r0, int(c) + c0) for r, c in path]
+
+        paths = []
+        for waypoints in plans:
+            if waypoints is None:
+                paths.append(None)
+                continue
+            path = [waypoints[0]]
+            for a, b in zip(waypoints, waypoints[1:]):
+                t = self.tile_of(a)
+                if t == self.tile_of(b):
+                    path.extend(hops[t][(a, b)][1:])
+                else:
+                    path.append(b)
+            paths.append(path)
+        return paths
+
+    def find_path(self, start, goal, refine=None):
+        """Single start/goal pair; see find_paths()."""
+        return self.find_paths([(start, goal)], refine)[0]
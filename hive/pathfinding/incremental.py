@@ -0,0 +1,309 @@
+"""
+Incremental replanning with D* Lite.
+
+Fire spreads and camera-detected obstacles change while bots are already
+following their paths. Instead of replanning from scratch, each bot keeps
+a D* Lite search: a backward search from its goal whose g/rhs values
+survive grid changes, so a change only re-expands the cells whose
+cost-to-goal it actually affects, and the bot's own movement is absorbed
+by the key modifier instead of a restart.
+
+IncrementalPlanner holds one search per bot on a shared grid. A bot can
+also be registered with a path from another planner (e.g. the neural
+pathfinder); its D* Lite search is only started the first time a change
+blocks that path.
+
+Move rules match pathfinding.search: 8-connected octile moves, a step
+may enter any free cell. The heuristic is octile distance to the bot's
+current cell, since the backward search needs distances to a moving start.
+
+Usage:
+    from pathfinding.incremental import IncrementalPlanner
+
+    planner = IncrementalPlanner(grid)
+    path = planner.plan(bot_id, start, goal)      # or plan(..., path=path)
+
+    # every time the grid changes
+    planner.update(new_grid, changed_cells)
+    for bot_id, path in planner.repair({bot_id: pos}).items():
+        ...  # path is None if the goal became unreachable
+"""
+
+import heapq
+
+import numpy as np
+
+from .search import SQRT2, free_mask, neighbor_offsets, pack, unpack
+
+_INF = float("inf")
+
+# Keys are sums of float move costs added in different orders; rounding
+# makes keys that tie exactly also tie in floating point, so tie-breaking
+# on g (and with it path optimality) is not decided by rounding noise
+_KEY_DIGITS = 9
+
+
+class DStarLite:
+    """
+    One D* Lite search from start to goal on a padded flat grid.
+
+    Shares the free list with its IncrementalPlanner, so cell changes are
+    applied there first and then announced with cells_changed().
+    """
+
+    def __init__(self, free, inside, width, start, goal, diag_cost=SQRT2):
+        self.free = free
+        self.inside = inside
+        self.width = width
+        self.offsets = neighbor_offsets(width, diag_cost)
+        self.diag_cost = diag_cost
+
+        n = len(free)
+        self.g = [_INF] * n
+        self.rhs = [_INF] * n
+        self._key = [None] * n   # key of the live open-list entry
+        self._heap = []
+        self.km = 0.0
+        self.start = pack(start[0], start[1], width)
+        self.goal = pack(goal[0], goal[1], width)
+        self.expanded = 0
+
+        self.rhs[self.goal] = 0.0
+        self._push(self.goal)
+
+    def _h(self, a, b):
+        wp = self.width + 2
+        dr = abs(a // wp - b // wp)
+        dc = abs(a % wp - b % wp)
+        return max(dr, dc) + (self.diag_cost - 1.0) * min(dr, dc)
+
+    def _calc_key(self, u):
+        m = min(self.g[u], self.rhs[u])
+        return (round(m + self._h(self.start, u) + self.km, _KEY_DIGITS), m)
+
+    def _push(self, u):
+        key = self._calc_key(u)
+        self._key[u] = key
+        heapq.heappush(self._heap, (key, u))
+
+    def _update_vertex(self, u):
+        if u != self.goal:
+            free, g = self.free, self.g
+            best = _INF
+            for o, cost in self.offsets:
+                v = u + o
+                if free[v]:
+                    c = cost + g[v]
+                    if c < best:
+                        best = c
+            self.rhs[u] = best
+        if self.g[u] != self.rhs[u]:
+            self._push(u)
+        else:
+            self._key[u] = None
+
+    def _update_predecessors(self, u):
+        inside = self.inside
+        for o, _cost in self.offsets:
+            p = u - o
+            if inside[p]:
+                self._update_vertex(p)
+
+    def compute(self):
+        """Expand until the start's cost-to-goal is consistent."""
+        heap, g, rhs = self._heap, self.g, self.rhs
+        s = self.start
+        while heap:
+            k_old, u = heap[0]
+            if self._key[u] != k_old:
+                heapq.heappop(heap)  # stale entry
+                continue
+            if not (k_old < self._calc_key(s) or rhs[s] != g[s]):
+                break
+            heapq.heappop(heap)
+            self.expanded += 1
+            k_new = self._calc_key(u)
+            if k_old < k_new:
+                self._key[u] = k_new
+                heapq.heappush(heap, (k_new, u))
+            elif g[u] > rhs[u]:
+                g[u] = rhs[u]
+                self._key[u] = None
+                if self.free[u]:
+                    self._update_predecessors(u)
+            else:
+                g[u] = _INF
+                self._update_vertex(u)
+                if self.free[u]:
+                    self._update_predecessors(u)
+
+    def move_start(self, start):
+        """The bot moved: shift the key modifier instead of re-keying."""
+        s = pack(start[0], start[1], self.width)
+        if s != self.start:
+            self.km += self._h(self.start, s)
+            self.start = s
+
+    def cells_changed(self, cells):
+        """Cells whose free/blocked state flipped; only edges into them change."""
+        inside = self.inside
+        for r, c in cells:
+            v = pack(r, c, self.width)
+            for o, _cost in self.offsets:
+                p = v - o
+                if inside[p]:
+                    self._update_vertex(p)
+
+    def path(self):
+        """Greedy descent from start over g; None if the goal is unreachable."""
+        self.compute()
+        u, t = self.start, self.goal
+        if self.g[u] == _INF and u != t:
+            return None
+        free, g = self.free, self.g
+        path = [unpack(u, self.width)]
+        for _ in range(len(free)):
+            if u == t:
+                return path
+            best, nxt = _INF, -1
+            for o, cost in self.offsets:
+                v = u + o
+                if free[v]:
+                    c = cost + g[v]
+                    if c < best:
+                        best, nxt = c, v
+            if nxt < 0:
+                return None
+            u = nxt
+            path.append(unpack(u, self.width))
+        return None
+
+
+class IncrementalPlanner:
+    """
+    Per-bot D* Lite searches on one shared, changing obstacle grid.
+
+    Args:
+        grid:      (H, W) numpy array — 0 = free, 1 = obstacle
+        diag_cost: cost of a diagonal move
+    """
+
+    def __init__(self, grid, diag_cost=SQRT2):
+        self.diag_cost = diag_cost
+        self.reset(grid)
+
+    def reset(self, grid):
+        """Forget every bot and start over on a new grid."""
+        self.grid = (np.asarray(grid) != 0).astype(np.uint8)
+        self.shape = self.grid.shape
+        self.width = self.shape[1]
+        self._free = free_mask(self.grid)
+        inside = np.zeros((self.shape[0] + 2, self.shape[1] + 2), dtype=bool)
+        inside[1:-1, 1:-1] = True
+        self._inside = inside.ravel().tolist()
+        self._bots = {}  # key -> {"goal", "path", "search"}
+
+    def plan(self, key, start, goal, path=None):
+        """
+        Register a bot heading from start to goal.
+
+        If path is given (planned elsewhere) it is kept as is and the D*
+        Lite search only starts once a grid change blocks it. Otherwise
+        the search runs now and its path is returned.
+        """
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        bot = {"goal": goal, "path": None, "search": None}
+        self._bots[key] = bot
+        if path is not None:
+            bot["path"] = [tuple(p) for p in path]
+            return bot["path"]
+        bot["search"] = DStarLite(self._free, self._inside, self.width,
+                                  start, goal, self.diag_cost)
+        bot["path"] = bot["search"].path()
+        return bot["path"]
+
+    def drop(self, key):
+        """Stop tracking a bot (arrived or re-tasked)."""
+        self._bots.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self._bots
+
+    def update(self, grid, cells=None):
+        """
+        Apply a new grid; cells optionally lists the (row, col) cells that
+        changed, otherwise the grid is diffed. Returns the changed cells.
+        """
+        blocked = (np.asarray(grid) != 0).astype(np.uint8)
+        if cells is None:
+            cells = [(int(r), int(c))
+                     for r, c in zip(*np.nonzero(blocked != self.grid))]
+        else:
+            cells = [(int(r), int(c)) for r, c in cells
+                     if blocked[r, c] != self.grid[r, c]]
+        if not cells:
+            return []
+
+        self.grid = blocked
+        for r, c in cells:
+            self._free[pack(r, c, self.width)] = not blocked[r, c]
+        for bot in self._bots.values():
+            if bot["search"] is not None:
+                bot["search"].cells_changed(cells)
+        return cells
+
+    def repair(self, positions, keep_valid=False):
+        """
+        Bring the paths of the given bots up to date.
+
+        Args:
+            positions:  {key: (row, col)} current cell of each moving bot
+            keep_valid: leave a bot on its current path while every cell
+                        ahead of it is still free, instead of switching to
+                        a shorter route opened up by freed cells
+
+        Returns:
+            {key: path} for bots whose remaining path changed; path is a
+            list of (row, col) tuples from the bot's cell, or None if the
+            goal can no longer be reached.
+        """
+        changed = {}
+        for key, pos in positions.items():
+            bot = self._bots.get(key)
+            if bot is None:
+                continue
+            pos = (int(pos[0]), int(pos[1]))
+            tail = self._remaining(bot["path"], pos)
+            valid = tail is not None and not any(self.grid[c] for c in tail[1:])
+
+            search = bot["search"]
+            if search is None:
+                # Borrowed path: keep it while every remaining cell is free
+                if valid:
+                    continue
+                search = DStarLite(self._free, self._inside, self.width,
+                                   pos, bot["goal"], self.diag_cost)
+                bot["search"] = search
+            elif valid and keep_valid:
+                continue
+            else:
+                search.move_start(pos)
+
+            path = search.path()
+            bot["path"] = path
+            if path != tail:
+                changed[key] = path
+        return changed
+
+    @staticmethod
+    def _remaining(path, pos):
+        """Path from pos on, or from the path cell nearest pos if off it."""
+        if not path:
+            return None
+        if pos in path:
+            return path[path.index(pos):]
+        i = min(range(len(path)),
+                key=lambda k: max(abs(path[k][0] - pos[0]),
+                                  abs(path[k][1] - pos[1])))
+        return path[i:]
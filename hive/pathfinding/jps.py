@@ -0,0 +1,274 @@
+"""
+Jump Point Search on uniform-cost 8-connected grids.
+
+Every world plans on a uniform occupancy grid, where most A* expansions
+are symmetric detours. JPS prunes them: from each node it only follows
+"natural" and "forced" directions and jumps along straight and diagonal
+runs until it hits a cell with a forced neighbour (or the goal), so only
+those jump points enter the open list. Paths are optimal and come back
+cell by cell, in the same format as the A* kernel.
+
+Move rules match pathfinding.search: a step may enter any free cell,
+diagonals included (corner cutting is allowed).
+
+JPS+ additionally precomputes, per static grid, the distance from every
+cell to the next jump point (or wall) in each of the 8 directions, so a
+jump becomes a table lookup instead of a scan.
+
+Usage:
+    from pathfinding.jps import JumpPointGraph
+
+    graph = JumpPointGraph(grid)                 # prepare once per grid
+    path = graph.jps(start, goal, h=h_map)       # plain JPS
+    path = graph.jps(start, goal, plus=True)     # JPS+ (builds tables once)
+"""
+
+import heapq
+
+from .search import SQRT2, _DIRS, add_counters, flat_heuristic, free_mask, pack, unpack
+
+_INF = float("inf")
+
+
+def _sign(x):
+    return (x > 0) - (x < 0)
+
+
+class JumpPointGraph:
+    """
+    Flat padded view of an obstacle grid for JPS / JPS+ searches.
+
+    Same node layout as pathfinding.search.GridGraph. JPS+ jump tables are
+    built on the first plus=True search and reused while the graph lives.
+    """
+
+    def __init__(self, grid, diag_cost=SQRT2):
+        self.shape = grid.shape
+        self.width = grid.shape[1]
+        self.wp = self.width + 2
+        self.free = free_mask(grid)
+        self.diag_cost = diag_cost
+        self._tables = None
+
+    # -- pruning rules -----------------------------------------------------
+
+    def _forced(self, n, dr, dc):
+        """True if n has a forced neighbour when entered moving (dr, dc)."""
+        free, wp = self.free, self.wp
+        if dr and dc:
+            return ((not free[n - dc] and free[n - dc + dr * wp])
+                    or (not free[n - dr * wp] and free[n - dr * wp + dc]))
+        if dr:
+            o = dr * wp
+            return ((not free[n + 1] and free[n + 1 + o])
+                    or (not free[n - 1] and free[n - 1 + o]))
+        return ((not free[n + wp] and free[n + wp + dc])
+                or (not free[n - wp] and free[n - wp + dc]))
+
+    def _directions(self, n, via):
+        """Natural + forced directions at n, entered moving via (or start)."""
+        if via is None:
+            return [(dr, dc) for dr, dc, _cost in _DIRS]
+        free, wp = self.free, self.wp
+        dr, dc = via
+        if dr and dc:
+            dirs = [(dr, 0), (0, dc), (dr, dc)]
+            if not free[n - dc]:
+                dirs.append((dr, -dc))
+            if not free[n - dr * wp]:
+                dirs.append((-dr, dc))
+        elif dr:
+            dirs = [(dr, 0)]
+            for s in (-1, 1):
+                if not free[n + s]:
+                    dirs.append((dr, s))
+        else:
+            dirs = [(0, dc)]
+            for s in (-1, 1):
+                if not free[n + s * wp]:
+                    dirs.append((s, dc))
+        return dirs
+
+    # -- plain JPS ---------------------------------------------------------
+
+    def _jump_straight(self, n, dr, dc, t):
+        """Scan a straight run. Returns (jump point, steps) or (-1, 0)."""
+        free = self.free
+        o = dr * self.wp + dc
+        k = 0
+        while True:
+            n += o
+            k += 1
+            if not free[n]:
+                return -1, 0
+            if n == t or self._forced(n, dr, dc):
+                return n, k
+
+    def _jump(self, n, dr, dc, t):
+        """Jump from n in direction (dr, dc). Returns (node, steps) or (-1, 0)."""
+        if not (dr and dc):
+            return self._jump_straight(n, dr, dc, t)
+        free = self.free
+        o = dr * self.wp + dc
+        k = 0
+        while True:
+            n += o
+            k += 1
+            if not free[n]:
+                return -1, 0
+            if (n == t or self._forced(n, dr, dc)
+                    or self._jump_straight(n, dr, 0, t)[0] >= 0
+                    or self._jump_straight(n, 0, dc, t)[0] >= 0):
+                return n, k
+
+    # -- JPS+ --------------------------------------------------------------
+
+    def _build_tables(self):
+        """
+        Jump distances per direction, indexed by node id.
+
+        v > 0: the next jump point is v steps away.
+        v <= 0: no jump point; -v free steps until a wall.
+        """
+        H, W = self.shape
+        wp, free = self.wp, self.free
+        nodes = [pack(r, c, W) for r in range(H) for c in range(W)]
+        tables = {}
+
+        # Straight directions first; diagonal tables read them
+        order = sorted(((dr, dc) for dr, dc, _cost in _DIRS),
+                       key=lambda d: bool(d[0] and d[1]))
+        for dr, dc in order:
+            o = dr * wp + dc
+            table = [0] * len(free)
+            diagonal = bool(dr and dc)
+            if diagonal:
+                row_tbl, col_tbl = tables[(dr, 0)], tables[(0, dc)]
+            # Visit x + o before x
+            for x in (reversed(nodes) if o > 0 else nodes):
+                n = x + o
+                if not free[n]:
+                    continue
+                if self._forced(n, dr, dc) or (
+                        diagonal and (row_tbl[n] > 0 or col_tbl[n] > 0)):
+                    table[x] = 1
+                else:
+                    v = table[n]
+                    table[x] = v + 1 if v > 0 else v - 1
+            tables[(dr, dc)] = table
+        self._tables = tables
+
+    def _jump_plus(self, n, dr, dc, t, tr, tc):
+        """Table-driven jump with goal bounding. Returns (node, steps) or (-1, 0)."""
+        v = self._tables[(dr, dc)][n]
+        reach = v if v > 0 else -v
+        nr, nc = unpack(n, self.width)
+        dist_r, dist_c = tr - nr, tc - nc
+        o = dr * self.wp + dc
+
+        if dr and dc:
+            if _sign(dist_r) == dr and _sign(dist_c) == dc:
+                m = min(abs(dist_r), abs(dist_c))
+                if m <= reach:
+                    return n + m * o, m
+        elif dr:
+            if dist_c == 0 and _sign(dist_r) == dr and abs(dist_r) <= reach:
+                return t, abs(dist_r)
+        elif dist_r == 0 and _sign(dist_c) == dc and abs(dist_c) <= reach:
+            return t, abs(dist_c)
+
+        if v > 0:
+            return n + v * o, v
+        return -1, 0
+
+    # -- search ------------------------------------------------------------
+
+    def jps(self, start, goal, h=None, plus=False, stats=None):
+        """
+        JPS (or JPS+) from start to goal.
+
+        Args:
+            start: (row, col) tuple
+            goal:  (row, col) tuple
+            h:     (H, W) heuristic array, or None for a zero heuristic
+            plus:  use precomputed JPS+ jump tables
+            stats: optional dict; expanded / pushes / reopened counts of
+                   this search are added to it (jump points, not cells)
+
+        Returns:
+            List of (row, col) tuples from start to goal, or None if no path
+            exists.
+        """
+        width = self.width
+        n_nodes = len(self.free)
+        h_flat = flat_heuristic(h) if h is not None else [0.0] * n_nodes
+        tr, tc = int(goal[0]), int(goal[1])
+        s = pack(int(start[0]), int(start[1]), width)
+        t = pack(tr, tc, width)
+
+        if plus and self._tables is None:
+            self._build_tables()
+
+        g_cost = [_INF] * n_nodes
+        parent = [-1] * n_nodes
+        via = [None] * n_nodes
+        closed = bytearray(n_nodes)
+        diag_cost = self.diag_cost
+
+        g_cost[s] = 0.0
+        heap = [(h_flat[s], 0.0, s)]
+        counters = {"expanded": 0, "pushes": 1, "reopened": 0}
+        path = None
+
+        while heap:
+            _f, g, u = heapq.heappop(heap)
+            if closed[u]:
+                continue
+            closed[u] = 1
+            counters["expanded"] += 1
+
+            if u == t:
+                path = self._unfold(parent, t)
+                break
+
+            for dr, dc in self._directions(u, via[u]):
+                if plus:
+                    j, k = self._jump_plus(u, dr, dc, t, tr, tc)
+                else:
+                    j, k = self._jump(u, dr, dc, t)
+                if j < 0:
+                    continue
+                ng = g + k * (diag_cost if dr and dc else 1.0)
+                if ng < g_cost[j]:
+                    if closed[j]:
+                        counters["reopened"] += 1
+                    g_cost[j] = ng
+                    parent[j] = u
+                    via[j] = (dr, dc)
+                    heapq.heappush(heap, (ng + h_flat[j], ng, j))
+                    counters["pushes"] += 1
+
+        if stats is not None:
+            add_counters(stats, counters)
+        return path  # None if no path
+
+    def _unfold(self, parent, t):
+        """Expand the chain of jump points into a cell-by-cell path."""
+        points = []
+        u = t
+        while u != -1:
+            points.append(unpack(u, self.width))
+            u = parent[u]
+        points.reverse()
+
+        path = [points[0]]
+        for (r0, c0), (r1, c1) in zip(points, points[1:]):
+            dr, dc = _sign(r1 - r0), _sign(c1 - c0)
+            for i in range(1, max(abs(r1 - r0), abs(c1 - c0)) + 1):
+                path.append((r0 + i * dr, c0 + i * dc))
+        return path
+
+
+def jps(grid, start, goal, h=None, plus=False, diag_cost=SQRT2):
+    """One-off JPS search; see JumpPointGraph.jps()."""
+    return JumpPointGraph(grid, diag_cost).jps(start, goal, h, plus)
@@ -0,0 +1,305 @@
+"""
+Prioritized multi-agent planning with a space-time reservation table.
+
+Planning each bot on its own and then splitting the paths into waves that
+never share a cell serializes most of a swarm: two paths that cross at
+different times still land in different waves. Here bots are planned one
+after another in priority order, each with a space-time A* over
+(cell, timestep) that avoids everything the bots before it reserved:
+
+    vertices  (cell, t)         — a bot stands on cell at step t
+    edges     (a, b, t)         — a bot moves a -> b between t and t + 1;
+                                  blocks the swap b -> a, and a diagonal
+                                  move also blocks the crossing diagonal
+    parked    cell -> t         — a bot rests on its goal from step t on
+
+A bot may wait in place, so every returned path has one cell per step
+(waits repeat the cell) and all bots start together. Bots still waiting
+for their turn are obstacles on their start cells, which keeps early
+paths clear of bots that have not moved yet. A bot only stops at its
+goal once no earlier reservation passes through it later.
+
+Moves follow pathfinding.search (8-connected, a step may enter any free
+cell), but every move — straight, diagonal or wait — takes one step.
+
+plan_waves() plans the bots that could not be fit again once the others
+have parked, so a crowded request still ends in a few rounds instead of
+dropping bots.
+
+Usage:
+    from pathfinding.reservation import plan_timed_paths, plan_waves
+
+    stats = {}
+    paths = plan_timed_paths(grid, [(start, goal), ...], stats=stats)
+    # paths[i][t] is bot i's cell at step t (None if it could not be fit);
+    # stats["makespan"] is the number of steps until the last bot arrives
+
+    for wave in plan_waves(grid, requests):   # {request index: timed path}
+        ...  # dispatch, wait for arrival, next wave
+"""
+
+import heapq
+
+import numpy as np
+
+from .fields import distance_field
+from .search import _DIRS, add_counters, free_mask, pack, unpack
+
+_INF = float("inf")
+
+
+class ReservationTable:
+    """Cells and moves claimed by already planned bots, per timestep."""
+
+    def __init__(self):
+        self.vertices = set()  # (node, t)
+        self.edges = set()     # (from node, to node, t)
+        self.parked = {}       # node -> first step of an open-ended stay
+        self.last_use = {}     # node -> last step with a vertex reservation
+
+    def park(self, node, t=0):
+        """Reserve node from step t onwards."""
+        self.parked[node] = min(t, self.parked.get(node, t))
+
+    def vertex_free(self, node, t):
+        return (node, t) not in self.vertices and self.parked.get(node, _INF) > t
+
+    def reserve(self, nodes):
+        """Claim a timed path (one node per step) and park on its last node."""
+        for t, node in enumerate(nodes):
+            self.vertices.add((node, t))
+            if t > self.last_use.get(node, -1):
+                self.last_use[node] = t
+            if t:
+                self.edges.add((nodes[t - 1], node, t - 1))
+        self.park(nodes[-1], len(nodes) - 1)
+
+
+def plan_timed_paths(grid, requests, order=None, obstacles=(), horizon=None,
+                     paths=None, max_expanded=None, reserved=(), stats=None):
+    """
+    Collision-free timed paths for many bots that start at the same time.
+
+    Args:
+        grid:      (H, W) numpy array — 0 = free, 1 = obstacle
+        requests:  list of ((row, col) start, (row, col) goal) pairs
+        order:     request indices in priority order; default plans the
+                   longest trips first
+        obstacles: (row, col) cells of bots that stay put
+        reserved:  timed paths (one (row, col) cell per step, from step 0)
+                   of bots already on the move; claimed before anyone is
+                   planned, each bot parked on its last cell
+        horizon:   last step a path may use (default 4 * (H + W))
+        max_expanded: give up on a bot after this many expansions
+                   (default 4 * H * W); a bot that cannot be fit would
+                   otherwise search every (cell, step) up to the horizon
+        paths:     optional single-bot paths per request (e.g. from the
+                   neural pathfinder); a bot whose path, walked without
+                   waiting, is clear of every reservation takes it as is
+        stats:     optional dict; expanded / pushes counts are added to it
+                   and "planned", "failed", "reused" (paths taken as is),
+                   "makespan" and "sum_of_costs" are set
+
+    Returns:
+        List in request order: each a list of (row, col) cells, one per
+        step from step 0 (the start) to arrival, or None if the bot could
+        not be fit within the horizon.
+    """
+    H, W = grid.shape
+    if horizon is None:
+        horizon = 4 * (H + W)
+    if max_expanded is None:
+        max_expanded = 4 * H * W
+    free = free_mask(grid)
+    wp = W + 2
+    # (node offset, offsets of the crossing diagonal's ends or None); the
+    # first entry is waiting in place
+    moves = [(0, None)] + [(dr * wp + dc, (dc, dr * wp) if dr and dc else None)
+                           for dr, dc, _cost in _DIRS]
+
+    nodes = [(pack(int(s[0]), int(s[1]), W), pack(int(g[0]), int(g[1]), W))
+             for s, g in requests]
+    # Unit-time cost-to-go per goal: exact and admissible, other bots aside
+    fields = {}
+    for s, g in requests:
+        g = (int(g[0]), int(g[1]))
+        if g not in fields:
+            fields[g] = np.asarray(distance_field(grid, g, diag_cost=1.0))
+    h_maps = [fields[(int(g[0]), int(g[1]))] for _s, g in requests]
+    if order is None:
+        order = sorted(range(len(requests)),
+                       key=lambda i: -h_maps[i][tuple(requests[i][0])])
+
+    table = ReservationTable()
+    for r, c in obstacles:
+        table.park(pack(int(r), int(c), W))
+    for timed in reserved:
+        table.reserve([pack(int(r), int(c), W) for r, c in timed])
+    waiting = {}  # start node -> bots there that are not planned yet
+    for s, _g in nodes:
+        waiting[s] = waiting.get(s, 0) + 1
+
+    given = paths
+    paths = [None] * len(requests)
+    counters = {"expanded": 0, "pushes": 0}
+    reused = 0
+    for i in order:
+        s, g = nodes[i]
+        waiting[s] -= 1
+        timed = None
+        if given is not None and given[i]:
+            timed = [pack(int(r), int(c), W) for r, c in given[i]]
+            if timed[0] == s and timed[-1] == g and _clear(table, waiting, timed, wp):
+                reused += 1
+            else:
+                timed = None
+        if timed is None:
+            timed = _space_time_astar(free, wp, moves, table, waiting, s, g,
+                                      h_maps[i], horizon, max_expanded, counters)
+        if timed is None:
+            table.park(s)  # stays where it is for everyone after it
+            continue
+        table.reserve(timed)
+        paths[i] = [unpack(node, W) for node in timed]
+
+    if stats is not None:
+        add_counters(stats, counters)
+        done = [p for p in paths if p is not None]
+        stats["planned"] = len(done)
+        stats["failed"] = len(paths) - len(done)
+        stats["reused"] = reused
+        stats["makespan"] = max((len(p) - 1 for p in done), default=0)
+        stats["sum_of_costs"] = sum(len(p) - 1 for p in done)
+    return paths
+
+
+def _clear(table, waiting, nodes, wp):
+    """True if a timed path conflicts with nothing in table."""
+    vertices, edges, parked = table.vertices, table.edges, table.parked
+    for t in range(1, len(nodes)):
+        u, v = nodes[t - 1], nodes[t]
+        if waiting.get(v) or (v, t) in vertices or parked.get(v, _INF) <= t:
+            return False
+        if u != v and (v, u, t - 1) in edges:
+            return False
+        dr, dc = divmod(v - u + wp + 1, wp)
+        if dr != 1 and dc != 1:
+            a, b = u + dc - 1, u + (dr - 1) * wp
+            if (a, b, t - 1) in edges or (b, a, t - 1) in edges:
+                return False
+    return table.last_use.get(nodes[-1], -1) <= len(nodes) - 1
+
+
+def _space_time_astar(free, wp, moves, table, waiting, s, g, h_map, horizon,
+                      max_expanded, counters):
+    """
+    Earliest-arrival timed path from s to g through table, or None.
+
+    Every step costs one, so a (node, t) state is only ever reached at
+    cost t and the first push of a state is final; ties go to the later
+    step, which follows the exact heuristic straight down.
+    """
+    h_flat = np.full((h_map.shape[0] + 2, wp), np.inf)
+    h_flat[1:-1, 1:-1] = h_map
+    h_flat = h_flat.ravel().tolist()
+    if h_flat[s] == _INF or not table.vertex_free(s, 0):
+        return None
+
+    vertices, edges, parked = table.vertices, table.edges, table.parked
+    goal_free_from = table.last_use.get(g, -1)
+    parent = {(s, 0): None}
+    heap = [(h_flat[s], 0, s)]  # (f, -t, node)
+    heappush, heappop = heapq.heappush, heapq.heappop
+    expanded = 0
+    pushes = 1
+    result = None
+
+    while heap:
+        _f, t, u = heappop(heap)
+        t = -t
+        expanded += 1
+        if expanded > max_expanded:
+            break
+        if u == g and t >= goal_free_from:
+            result = []
+            key = (u, t)
+            while key is not None:
+                result.append(key[0])
+                key = parent[key]
+            result.reverse()
+            break
+        nt = t + 1
+        if nt > horizon:
+            continue
+        for off, cross in moves:
+            v = u + off
+            if (v, nt) in parent or not free[v] or waiting.get(v):
+                continue
+            if (v, nt) in vertices or parked.get(v, _INF) <= nt:
+                continue
+            if off and (v, u, t) in edges:
+                continue  # swap
+            if cross is not None:
+                a, b = u + cross[0], u + cross[1]
+                if (a, b, t) in edges or (b, a, t) in edges:
+                    continue
+            parent[(v, nt)] = (u, t)
+            heappush(heap, (nt + h_flat[v], -nt, v))
+            pushes += 1
+
+    counters["expanded"] += expanded
+    counters["pushes"] += pushes
+    return result
+
+
+def plan_waves(grid, requests, obstacles=(), paths=None, max_expanded=None,
+               reserved=(), stats=None):
+    """
+    plan_timed_paths() in rounds until every bot is placed or stuck.
+
+    Bots left over from a round are planned again from their starts with
+    every bot of the earlier rounds parked on its goal; each round is
+    meant to start once the previous one has arrived. Reserved paths are
+    claimed in the first round, then parked on their last cells.
+
+    Args:
+        grid, requests, obstacles, paths, max_expanded, reserved: as for
+               plan_timed_paths()
+        stats: optional dict; expanded / pushes are summed over rounds and
+               "planned", "failed", "waves", "makespan" (summed over the
+               rounds) and "sum_of_costs" are set
+
+    Returns:
+        List of waves, each a dict of request index -> timed path.
+    """
+    obstacles = [tuple(c) for c in obstacles]
+    pending = list(range(len(requests)))
+    waves = []
+    totals = {"expanded": 0, "pushes": 0, "makespan": 0, "sum_of_costs": 0}
+    while pending:
+        round_stats = {}
+        # Bots waiting for a later round stay on their starts
+        timed = plan_timed_paths(
+            grid, [requests[i] for i in pending], obstacles=obstacles,
+            paths=None if paths is None else [paths[i] for i in pending],
+            max_expanded=max_expanded, reserved=reserved, stats=round_stats,
+        )
+        wave = {i: p for i, p in zip(pending, timed) if p is not None}
+        if not wave:
+            break
+        waves.append(wave)
+        for key in totals:
+            totals[key] += round_stats[key]
+        obstacles += [tuple(p[-1]) for p in wave.values()]
+        obstacles += [tuple(p[-1]) for p in reserved]
+        reserved = ()
+        pending = [i for i in pending if i not in wave]
+
+    if stats is not None:
+        add_counters(stats, {"expanded": totals.pop("expanded"),
+                             "pushes": totals.pop("pushes")})
+        stats.update(totals)
+        stats["planned"] = len(requests) - len(pending)
+        stats["failed"] = len(pending)
+        stats["waves"] = len(waves)
+    return waves
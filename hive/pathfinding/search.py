@@ -0,0 +1,191 @@
+"""
+Shared grid search kernel.
+
+All worlds plan on 8-connected occupancy grids (0 = free, 1 = obstacle)
+with octile move costs. The kernel works on a flat, one-cell padded copy
+of the grid so the inner loop needs no bounds checks:
+
+    node id = (r + 1) * (W + 2) + (c + 1)
+
+g-costs, parents and the closed set live in preallocated flat buffers
+indexed by node id, the open list holds (f, g, node) entries with packed
+integer nodes, and heuristic lookups read a flat float buffer directly.
+Because node ids preserve (row, col) order, heap tie-breaking — and so
+every returned path — matches the old tuple-keyed implementation.
+
+Usage:
+    from pathfinding.search import astar
+
+    path = astar(grid, start=(10, 5), goal=(50, 60), h=h_map)
+    # path is a list of (row, col) tuples, or None if no path exists
+
+    # Several searches on one grid: prepare the flat buffers once
+    graph = GridGraph(grid)
+    paths = [graph.astar(s, g, h) for s, g, h in jobs]
+"""
+
+import hashlib
+import heapq
+import math
+
+import numpy as np
+
+SQRT2 = math.sqrt(2)
+
+_DIRS = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+         (-1, -1, SQRT2), (-1, 1, SQRT2),
+         (1, -1, SQRT2), (1, 1, SQRT2)]
+
+_INF = float("inf")
+
+
+def grid_digest(grid):
+    """Fast content hash of an obstacle grid (shape + bit-packed cells)."""
+    cells = np.packbits(np.asarray(grid) != 0)
+    return (grid.shape, hashlib.blake2b(cells.tobytes(), digest_size=16).digest())
+
+
+def pack(r, c, width):
+    """(row, col) -> node id in a padded grid of the given (unpadded) width."""
+    return (r + 1) * (width + 2) + (c + 1)
+
+
+def unpack(node, width):
+    """Node id in a padded grid -> (row, col)."""
+    r, c = divmod(node, width + 2)
+    return (r - 1, c - 1)
+
+
+def _padded(a, dtype):
+    H, W = a.shape
+    out = np.zeros((H + 2, W + 2), dtype=dtype)
+    out[1:-1, 1:-1] = a
+    return out
+
+
+def free_mask(grid):
+    """Flat list of booleans for the padded grid; the border is blocked."""
+    return _padded(np.asarray(grid) == 0, bool).ravel().tolist()
+
+
+def flat_heuristic(h):
+    """Flat list of floats for a padded (H, W) heuristic array."""
+    return _padded(np.asarray(h), np.float64).ravel().tolist()
+
+
+def neighbor_offsets(width, diag_cost=SQRT2):
+    """(node offset, move cost) pairs in _DIRS order for a padded grid."""
+    wp = width + 2
+    return [(dr * wp + dc, diag_cost if dr and dc else cost)
+            for dr, dc, cost in _DIRS]
+
+
+class GridGraph:
+    """
+    Flat padded view of an obstacle grid, prepared once and searched many
+    times. Use it when planning several paths on the same grid.
+
+    expanded holds the number of nodes the last search expanded; pass a
+    stats dict to astar() to also collect heap pushes and reopenings.
+    """
+
+    def __init__(self, grid, diag_cost=SQRT2):
+        self.shape = grid.shape
+        self.width = grid.shape[1]
+        self.free = free_mask(grid)
+        self.offsets = neighbor_offsets(self.width, diag_cost)
+        self.expanded = 0
+
+    def astar(self, start, goal, h=None, stats=None):
+        """
+        A* from start to goal; h is an (H, W) heuristic array or None.
+        If stats is a dict, the search's counters are added to it.
+        """
+        h_flat = flat_heuristic(h) if h is not None else [0.0] * len(self.free)
+        path, counters = _search(self.free, h_flat, self.width, start,
+                                 goal, self.offsets)
+        self.expanded = counters["expanded"]
+        if stats is not None:
+            add_counters(stats, counters)
+        return path
+
+
+def astar(grid, start, goal, h=None, diag_cost=SQRT2):
+    """
+    A* search on an 8-connected grid.
+
+    Args:
+        grid:      (H, W) numpy array — 0 = free, 1 = obstacle
+        start:     (row, col) tuple
+        goal:      (row, col) tuple
+        h:         (H, W) heuristic array (cost-to-go estimate per cell),
+                   or None for a zero heuristic (plain Dijkstra)
+        diag_cost: cost of a diagonal move
+
+    Returns:
+        List of (row, col) tuples from start to goal, or None if no path
+        exists.
+    """
+    return GridGraph(grid, diag_cost).astar(start, goal, h)
+
+
+def add_counters(stats, counters):
+    """Add search counters into a stats dict."""
+    for key, value in counters.items():
+        stats[key] = stats.get(key, 0) + value
+
+
+def _search(free, h_flat, width, start, goal, offsets):
+    """
+    Kernel on prepared flat buffers. Returns (path or None, counters):
+    nodes expanded, heap pushes, and reopened — closed nodes reached again
+    at a lower cost, which only an inconsistent heuristic (e.g. the CNN's)
+    causes. Their parent is updated but they are not expanded again.
+    """
+    n = len(free)
+    s = pack(int(start[0]), int(start[1]), width)
+    t = pack(int(goal[0]), int(goal[1]), width)
+
+    g_cost = [_INF] * n
+    parent = [-1] * n
+    closed = bytearray(n)
+
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    g_cost[s] = 0.0
+    heap = [(h_flat[s], 0.0, s)]
+    expanded = 0
+    pushes = 1
+    reopened = 0
+
+    while heap:
+        _f, g, u = heappop(heap)
+        if closed[u]:
+            continue
+        closed[u] = 1
+        expanded += 1
+
+        if u == t:
+            path = []
+            while u != -1:
+                path.append(unpack(u, width))
+                u = parent[u]
+            path.reverse()
+            break
+
+        for off, move_cost in offsets:
+            v = u + off
+            if free[v]:
+                ng = g + move_cost
+                if ng < g_cost[v]:
+                    if closed[v]:
+                        reopened += 1
+                    g_cost[v] = ng
+                    parent[v] = u
+                    heappush(heap, (ng + h_flat[v], ng, v))
+                    pushes += 1
+    else:
+        path = None  # no path
+
+    return path, {"expanded": expanded, "pushes": pushes, "reopened": reopened}
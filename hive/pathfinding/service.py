@@ -0,0 +1,280 @@
+"""
+Local pathfinding service: one warm pathfinder shared by every world.
+
+Each simulation and robot_world otherwise loads its own copy of the
+model, and mimic_world's fallback when Modal is unreachable is a plain
+Manhattan A*. serve() puts one pathfinder (anything with NeuralPathfinder's
+find_paths_batch / stats_info) behind a Unix socket; PathfindClient is a
+drop-in for it in another process.
+
+The server loads the model once, then forks its workers, so the weights
+are shared copy-on-write. Every worker accepts on the same listening
+socket; a call is one connection, one request and one reply, so a slow
+call never holds up another client. Heuristic-map caches are per worker
+and keyed by grid contents, so they never serve stale maps.
+
+Wire format: a 4-byte little-endian length, a JSON header, then the raw
+bytes of the arrays the header lists. Grids and start/goal pairs travel
+as int16 arrays, paths as one (M, 2) int16 array of cells plus int32
+per-path lengths (-1 for no path) — no nested JSON lists.
+
+Start the server with move_world/pathfind_server.py, then:
+
+    from pathfinding.service import connect
+
+    pf = connect()   # PathfindClient, or None if no server is running
+    paths = pf.find_paths_batch(grid, [((10, 5), (50, 60))], mode="jps+")
+    path, stats = pf.find_path(grid, (10, 5), (50, 60), return_stats=True)
+"""
+
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from .fields import ExactHeuristic
+from .heuristics import LandmarkHeuristic, OctileHeuristic
+
+SOCKET_PATH = Path(__file__).parent.parent / "files" / "pathfind.sock"
+
+# Seconds a client waits for a reply (planning a full batch included)
+TIMEOUT_S = 30.0
+
+_LEN = struct.Struct("<I")
+
+
+def _send(sock, header, arrays=()):
+    """Write one frame: header dict plus arrays described in it."""
+    arrays = [np.ascontiguousarray(a) for a in arrays]
+    header = dict(header, arrays=[[a.dtype.str, list(a.shape)] for a in arrays])
+    data = json.dumps(header).encode()
+    sock.sendall(b"".join([_LEN.pack(len(data)), data] + [a.tobytes() for a in arrays]))
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:], n - got)
+        if not k:
+            raise ConnectionError("pathfinding service closed the connection")
+        got += k
+    return buf
+
+
+def _recv(sock):
+    """Read one frame; returns (header, list of arrays)."""
+    (size,) = _LEN.unpack(_recv_exact(sock, _LEN.size))
+    header = json.loads(_recv_exact(sock, size))
+    arrays = []
+    for dtype, shape in header.pop("arrays"):
+        dtype = np.dtype(dtype)
+        nbytes = dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        arrays.append(np.frombuffer(_recv_exact(sock, nbytes), dtype).reshape(shape))
+    return header, arrays
+
+
+def encode_paths(paths):
+    """(lengths int32, cells int16 (M, 2)) for a list of paths or None."""
+    lengths = np.array([-1 if p is None else len(p) for p in paths], dtype=np.int32)
+    cells = [p for p in paths if p]
+    cells = (np.concatenate([np.asarray(p, dtype=np.int16).reshape(-1, 2) for p in cells])
+             if cells else np.zeros((0, 2), dtype=np.int16))
+    return lengths, cells
+
+
+def decode_paths(lengths, cells):
+    """Inverse of encode_paths(): lists of (row, col) tuples, or None."""
+    paths = []
+    offset = 0
+    for n in lengths.tolist():
+        if n < 0:
+            paths.append(None)
+            continue
+        paths.append([(r, c) for r, c in cells[offset:offset + n].tolist()])
+        offset += n
+    return paths
+
+
+class PathfindClient:
+    """
+    NeuralPathfinder's planning calls, answered by a serve() process.
+
+    Heuristic providers are sent by name ("octile", "alt", "exact");
+    return_stats gives the call's PlanStats as a dict.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH, timeout=TIMEOUT_S):
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+
+    def _call(self, header, arrays=()):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            _send(sock, header, arrays)
+            reply, out = _recv(sock)
+        if "error" in reply:
+            exc = ValueError if reply.get("type") == "ValueError" else RuntimeError
+            raise exc(reply["error"])
+        return reply, out
+
+    def ping(self):
+        """Server process id of the worker that answered."""
+        return self._call({"op": "ping"})[0]["pid"]
+
+    def find_path(self, grid, start, goal, heuristic=None, mode="astar",
+                  deadline_ms=None, return_stats=False):
+        """Same contract as NeuralPathfinder.find_path()."""
+        paths, stats = self.find_paths_batch(grid, [(start, goal)], heuristic, mode,
+                                             deadline_ms=deadline_ms, return_stats=True)
+        return (paths[0], stats) if return_stats else paths[0]
+
+    def find_paths_batch(self, grid, requests, heuristic=None, mode="astar",
+                         shared_flow=False, deadline_ms=None, return_stats=False):
+        """Same contract as NeuralPathfinder.find_paths_batch()."""
+        pairs = np.array([[s[0], s[1], g[0], g[1]] for s, g in requests],
+                         dtype=np.int16).reshape(-1, 4)
+        header = {
+            "op": "plan",
+            "heuristic": None if heuristic is None else heuristic.name,
+            "mode": mode,
+            "shared_flow": shared_flow,
+            "deadline_ms": deadline_ms,
+        }
+        reply, (lengths, cells) = self._call(header, [np.asarray(grid, dtype=np.int16), pairs])
+        paths = decode_paths(lengths, cells)
+        return (paths, reply["stats"]) if return_stats else paths
+
+    def stats_info(self):
+        """PlanStats totals of the worker that answered, with its "pid"."""
+        return self._call({"op": "stats"})[0]
+
+    def invalidate_cache(self, grid=None):
+        """
+        No-op: worker caches are keyed by grid contents and bounded, so a
+        changed grid never reads another grid's maps.
+        """
+
+
+def connect(socket_path=SOCKET_PATH, timeout=TIMEOUT_S):
+    """A PathfindClient if a server answers on socket_path, else None."""
+    if not os.path.exists(socket_path):
+        return None
+    client = PathfindClient(socket_path, timeout)
+    try:
+        client.ping()
+    except OSError:
+        return None
+    return client
+
+
+_PROVIDERS = {
+    "octile": OctileHeuristic,
+    "alt": lambda: LandmarkHeuristic(num_landmarks=8),
+    "exact": ExactHeuristic,
+}
+
+
+def _handle(pathfinder, providers, header, arrays):
+    op = header.get("op")
+    if op == "ping":
+        return {"pid": os.getpid()}, []
+    if op == "stats":
+        return dict(pathfinder.stats_info(), pid=os.getpid()), []
+    if op != "plan":
+        raise ValueError(f"Unknown op {op!r}")
+
+    grid, pairs = arrays
+    name = header.get("heuristic")
+    heuristic = None
+    if name is not None:
+        if name not in _PROVIDERS:
+            raise ValueError(f"Unknown heuristic {name!r}; choose from {sorted(_PROVIDERS)}")
+        if name not in providers:
+            providers[name] = _PROVIDERS[name]()
+        heuristic = providers[name]
+    requests = [((s_r, s_c), (g_r, g_c)) for s_r, s_c, g_r, g_c in pairs.tolist()]
+    paths, stats = pathfinder.find_paths_batch(
+        grid, requests, heuristic, header.get("mode", "astar"),
+        shared_flow=header.get("shared_flow", False),
+        deadline_ms=header.get("deadline_ms"), return_stats=True,
+    )
+    return {"stats": stats.as_dict()}, list(encode_paths(paths))
+
+
+def _worker(listener, pathfinder, worker_init):
+    if worker_init is not None:
+        worker_init()
+    providers = {}
+    try:
+        _accept_loop(listener, pathfinder, providers)
+    except KeyboardInterrupt:
+        pass  # Ctrl-C reaches every worker; the parent cleans up
+
+
+def _accept_loop(listener, pathfinder, providers):
+    while True:
+        conn, _addr = listener.accept()
+        with conn:
+            try:
+                header, arrays = _recv(conn)
+                try:
+                    reply, out = _handle(pathfinder, providers, header, arrays)
+                except Exception as e:
+                    reply, out = {"error": str(e), "type": type(e).__name__}, []
+                _send(conn, reply, out)
+            except OSError as e:
+                print(f"[pathfind] Client dropped ({e})")
+
+
+def serve(pathfinder, socket_path=SOCKET_PATH, workers=2, worker_init=None):
+    """
+    Answer PathfindClient calls with pathfinder until interrupted.
+
+    Args:
+        pathfinder:  a loaded NeuralPathfinder (or anything with its
+                     find_paths_batch / stats_info)
+        socket_path: Unix socket to listen on; a stale file is replaced
+        workers:     processes forked after loading; 1 serves in-process
+        worker_init: optional callable run in each worker after the fork
+                     (e.g. to set torch's thread count)
+    """
+    import multiprocessing
+
+    socket_path = str(socket_path)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(64)
+    print(f"[pathfind] Serving on {socket_path} with {workers} worker(s)")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    procs = []
+    try:
+        if workers <= 1:
+            _worker(listener, pathfinder, worker_init)
+            return
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=_worker, args=(listener, pathfinder, worker_init),
+                             daemon=True) for _ in range(workers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            p.terminate()
+        listener.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("[pathfind] Service stopped")
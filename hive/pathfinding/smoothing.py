@@ -0,0 +1,188 @@
+"""
+Path post-processing: fewer, straighter waypoints.
+
+Grid searches return one cell per step, so a 60-cell path becomes 60
+waypoints and every staircase step is a turn. smooth_path() reduces a
+path to the cells where it has to turn:
+
+    1. merge collinear runs into their end cells
+    2. string pulling: from each kept cell, skip ahead to the farthest
+       later waypoint still in line of sight on the obstacle grid
+    3. optional spacing: drop waypoints closer than min_spacing to the
+       previous one (when the shortcut is still clear) and split
+       segments longer than max_spacing
+
+Line of sight walks every cell the segment between two cell centres
+touches; crossing a cell corner exactly counts as a diagonal step, the
+same corner rule as the search kernels. Waypoints are always path or
+line cells, so the result stays on free cells.
+
+rasterize() turns waypoints back into an 8-connected cell path along the
+straight segments, for consumers that move one cell per step.
+
+Usage:
+    from pathfinding.smoothing import smooth_path, rasterize
+
+    waypoints = smooth_path(grid, path, max_spacing=12)
+    steps = rasterize(waypoints)
+"""
+
+import math
+
+import numpy as np
+
+
+def merge_collinear(path):
+    """Drop cells in the middle of straight runs; keeps start and end."""
+    path = [tuple(p) for p in path]
+    if len(path) < 3:
+        return path
+    out = [path[0]]
+    for prev, cur, nxt in zip(path, path[1:], path[2:]):
+        d1 = (cur[0] - prev[0], cur[1] - prev[1])
+        d2 = (nxt[0] - cur[0], nxt[1] - cur[1])
+        if d1[0] * d2[1] != d1[1] * d2[0] or d1[0] * d2[0] + d1[1] * d2[1] < 0:
+            out.append(cur)
+    out.append(path[-1])
+    return out
+
+
+def segment_cells(a, b):
+    """Every cell the segment between the centres of a and b passes through."""
+    r, c = int(a[0]), int(a[1])
+    dr, dc = int(b[0]) - r, int(b[1]) - c
+    nr, nc = abs(dr), abs(dc)
+    sr = 1 if dr > 0 else -1
+    sc = 1 if dc > 0 else -1
+    cells = [(r, c)]
+    ir = ic = 0
+    while ir < nr or ic < nc:
+        # Compare the next row-boundary and column-boundary crossings
+        d = (1 + 2 * ir) * nc - (1 + 2 * ic) * nr
+        if d == 0:
+            r, c, ir, ic = r + sr, c + sc, ir + 1, ic + 1
+        elif d < 0:
+            r, ir = r + sr, ir + 1
+        else:
+            c, ic = c + sc, ic + 1
+        cells.append((r, c))
+    return cells
+
+
+def line_of_sight(grid, a, b):
+    """
+    True if a straight move from a to b crosses only free cells.
+
+    The end cells themselves are not checked (a bot's own cell may be
+    marked blocked).
+    """
+    grid = np.asarray(grid)
+    return all(grid[cell] == 0 for cell in segment_cells(a, b)[1:-1])
+
+
+def _dist(a, b):
+    return math.hypot(b[0] - a[0], b[1] - a[1])
+
+
+def smooth_path(grid, path, min_spacing=0.0, max_spacing=None):
+    """
+    Compress a cell path into line-of-sight waypoints.
+
+    Args:
+        grid:        (H, W) numpy array — 0 = free, 1 = obstacle
+        path:        list of (row, col) cells from a grid search
+        min_spacing: drop intermediate waypoints closer than this many
+                     cells to the previous one, if the resulting shortcut
+                     is still in line of sight
+        max_spacing: split segments longer than this many cells with
+                     waypoints along them (None = no limit; at least 1.5
+                     so a diagonal step fits)
+
+    Returns:
+        list of (row, col) waypoints, starting and ending with the path's
+        start and goal cells.
+    """
+    if max_spacing is not None and max_spacing < 1.5:
+        raise ValueError(f"max_spacing must be at least 1.5 cells, got {max_spacing}")
+    grid = np.asarray(grid)
+    pts = merge_collinear(path)
+    if len(pts) < 3:
+        out = pts
+    else:
+        # Greedy string pulling over the turning points
+        out = [pts[0]]
+        i = 0
+        while i < len(pts) - 1:
+            j = i + 1
+            while j + 1 < len(pts) and line_of_sight(grid, pts[i], pts[j + 1]):
+                j += 1
+            out.append(pts[j])
+            i = j
+
+    if min_spacing > 0 and len(out) > 2:
+        kept = [out[0]]
+        for k in range(1, len(out) - 1):
+            if (_dist(kept[-1], out[k]) < min_spacing
+                    and line_of_sight(grid, kept[-1], out[k + 1])):
+                continue
+            kept.append(out[k])
+        kept.append(out[-1])
+        out = kept
+
+    if max_spacing is not None:
+        split = [out[0]]
+        for a, b in zip(out, out[1:]):
+            split.extend(_split_segment(grid, a, b, max_spacing))
+            split.append(b)
+        out = split
+    return out
+
+
+def _split_segment(grid, a, b, max_spacing):
+    """
+    Intermediate waypoints on the segment a-b, about evenly spaced and at
+    most max_spacing apart, each in line of sight of the one before.
+    """
+    n = math.ceil(_dist(a, b) / max_spacing)
+    if n <= 1:
+        return []
+    reach = min(_dist(a, b) / n + 0.5, max_spacing)
+    cells = segment_cells(a, b)
+    points = []
+    anchor, i = a, 0
+    while _dist(anchor, b) > max_spacing or not line_of_sight(grid, anchor, b):
+        # Farthest cell along the segment within reach and in sight;
+        # the next cell always qualifies
+        j = i + 1
+        for k in range(i + 2, len(cells) - 1):
+            if _dist(anchor, cells[k]) > reach:
+                break
+            if line_of_sight(grid, anchor, cells[k]):
+                j = k
+        if j >= len(cells) - 1:
+            break
+        anchor, i = cells[j], j
+        points.append(anchor)
+    return points
+
+
+def rasterize(waypoints):
+    """
+    8-connected cell path through waypoints along straight segments.
+
+    Uses the cells line_of_sight() checks, cutting the corner cell where
+    the walk goes sideways then on, so the result stays on free cells
+    whenever the waypoints see each other.
+    """
+    waypoints = [tuple(p) for p in waypoints]
+    if len(waypoints) < 2:
+        return waypoints
+    path = [waypoints[0]]
+    for a, b in zip(waypoints, waypoints[1:]):
+        for cell in segment_cells(a, b)[1:]:
+            if (len(path) >= 2 and abs(cell[0] - path[-2][0]) <= 1
+                    and abs(cell[1] - path[-2][1]) <= 1):
+                path[-1] = cell  # corner: step diagonally instead
+            else:
+                path.append(cell)
+    return path
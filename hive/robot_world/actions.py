@@ -22,25 +22,87 @@ MOVE_WORLD_DIR = HIVE_DIR / "move_world"
 sys.path.insert(0, str(MOVE_WORLD_DIR))
 
 from utils import PathFollower, RobotClient
-from pathfinder import NeuralPathfinder
+from pathfinding.heuristics import LandmarkHeuristic
+from pathfinding.hierarchy import HierarchicalGraph
+from pathfinding.incremental import IncrementalPlanner
+from pathfinding.search import astar
+from pathfinding.service import connect
+from pathfinding.smoothing import smooth_path
 
 # Lazy-loaded neural pathfinder (singleton)
 _neural_pf = None
 _neural_pf_lock = threading.Lock()
 _CHECKPOINT = MOVE_WORLD_DIR / "checkpoints" / "best_model.pt"
 
+# CPU fallback when torch or the checkpoint is unavailable; landmark
+# tables are rebuilt only when the detected grid changes
+_landmark_heuristic = LandmarkHeuristic(num_landmarks=8)
+_landmark_lock = threading.Lock()
+
+# Fallback for grids above 64x64: tile graph, updated as the grid changes
+_tile_graph = None
+
+# Moving bots' grid paths, repaired (D* Lite per bot) as obstacles change
+_replanner = None
+_replan_lock = threading.Lock()
+_replan_targets = {}  # marker_id -> target pixel [x, y]
+_replan_smooth = {}   # marker_id -> waypoints are line-of-sight compressed
+_repair_thread = None
+
 
 def _get_neural_pathfinder():
-    """Get or create the NeuralPathfinder (loaded once, reused)."""
+    """
+    Get or create the neural pathfinder (loaded once, reused): the shared
+    pathfinding service if it is running, otherwise a NeuralPathfinder.
+    """
     global _neural_pf
     if _neural_pf is None:
         with _neural_pf_lock:
             if _neural_pf is None:
+                _neural_pf = connect()
+                if _neural_pf is not None:
+                    print("[pathfind] Using the shared pathfinding service")
+            if _neural_pf is None:
+                from pathfinder import NeuralPathfinder
                 _neural_pf = NeuralPathfinder(str(_CHECKPOINT))
                 print(f"[pathfind] Neural heuristic loaded on {_neural_pf.device}")
     return _neural_pf
 
+
+def _find_grid_path(grid, start, goal):
+    """
+    A* on a binary obstacle grid: neural heuristic if the model loads,
+    otherwise the landmark (ALT) heuristic. Grids larger than 64x64 are
+    planned hierarchically in 64x64 tiles. Returns (path, label).
+    """
+    try:
+        pf = _get_neural_pathfinder()
+    except Exception as e:
+        print(f"[pathfind] Neural pathfinder unavailable ({e}) — using landmark A*")
+    else:
+        path, stats = pf.find_path(grid, start=start, goal=goal, return_stats=True)
+        print(f"[pathfind] {stats}")
+        return path, "Neural A*"
+
+    global _tile_graph
+    with _landmark_lock:
+        if grid.shape[0] > 64 or grid.shape[1] > 64:
+            if _tile_graph is None or _tile_graph.shape != grid.shape:
+                _tile_graph = HierarchicalGraph(grid, tile=64)
+            else:
+                _tile_graph.update(grid)
+            return _tile_graph.find_path(start, goal), "Hierarchical A*"
+        h_map = _landmark_heuristic.heuristic_map(grid, goal)
+    return astar(grid, start, goal, h_map), "Landmark A*"
+
 BOT_CLEAR_RADIUS = 4  # cells around each bot kept obstacle-free
+REPAIR_INTERVAL_S = 1.0  # how often moving bots' paths are re-checked
+
+# Line-of-sight waypoint compression (pathfinding.smoothing): one waypoint
+# per turn instead of one per cell. Spacing is in FULL_GRID cells.
+SMOOTH_WAYPOINTS = False
+WAYPOINT_MIN_SPACING = 2
+WAYPOINT_MAX_SPACING = 12
 
 # Shared IPC files (overlay.py writes markers.json, we read it)
 PATH_JSON = ROBOT_SRC / "path.json"
@@ -49,7 +111,8 @@ ACTIVE_BOTS_JSON = ROBOT_SRC / "active_bots.json"
 SCREENSHOT_PATH = ROBOT_SRC / "screenshot.png"
 
 GRID_SIZE = 32         # Vision grid (32x32 cells on the camera image)
-FULL_GRID = 64         # Scaled grid (64x64 to match move_world)
+FULL_GRID = 64         # Scaled grid (64x64 to match move_world; larger
+                       # multiples of GRID_SIZE are planned in 64x64 tiles)
 CELL_FREE = 0
 CELL_BOT = 1
 CELL_OBSTACLE = 2
@@ -190,6 +253,36 @@ def _grid_to_pixel(row, col, frame_w, frame_h):
     return (px, py)
 
 
+def _pixel_to_full_grid(px, py, frame_w, frame_h):
+    """Convert pixel coordinates to (row, col) in the FULL_GRID planning grid."""
+    col = int(px / frame_w * FULL_GRID)
+    row = int(py / frame_h * FULL_GRID)
+    return (
+        max(0, min(row, FULL_GRID - 1)),
+        max(0, min(col, FULL_GRID - 1)),
+    )
+
+
+def _grid_path_to_waypoints(grid_path, target, frame_w, frame_h, grid=None):
+    """
+    Convert a FULL_GRID (row, col) path to pixel waypoints, skipping start.
+    If the binary grid is given, the path is first compressed to
+    line-of-sight waypoints.
+    """
+    if grid is not None:
+        grid_path = smooth_path(grid, grid_path, WAYPOINT_MIN_SPACING,
+                                WAYPOINT_MAX_SPACING)
+    cell_w = frame_w / FULL_GRID
+    cell_h = frame_h / FULL_GRID
+    waypoints = []
+    for r, c in grid_path[1:]:
+        px = c * cell_w + cell_w / 2
+        py = r * cell_h + cell_h / 2
+        waypoints.append([px, py])
+    waypoints[-1] = [float(target[0]), float(target[1])]
+    return waypoints
+
+
 def _get_frame_size():
     """Get frame dimensions from the screenshot."""
     if not SCREENSHOT_PATH.exists():
@@ -290,18 +383,23 @@ def _detect_world_state():
     }
 
 
-def _generate_waypoints(start, target, step_size=40):
+def _generate_waypoints(start, target, step_size=40, track=None, smooth=None):
     """
     Generate waypoints from start to target using neural heuristic A*
-    on the color-detected obstacle grid. Falls back to straight-line
-    if no grid or no path found.
+    (landmark A* if the model is unavailable) on the color-detected
+    obstacle grid. Falls back to straight-line if no grid or no path found.
 
     start/target: [x, y] pixel coordinates.
+    track: marker_id whose grid path should be repaired as obstacles change.
+    smooth: compress the grid path to line-of-sight waypoints
+            (default SMOOTH_WAYPOINTS).
     Returns: list of [x, y] pixel waypoints.
     """
     frame_w, frame_h = _get_frame_size()
+    if smooth is None:
+        smooth = SMOOTH_WAYPOINTS
 
-    # Try neural A* on the obstacle grid
+    # Try A* on the obstacle grid
     try:
         world = _detect_world_state()
         grid = np.array(world["matrix"], dtype=np.int32)
@@ -311,43 +409,30 @@ def _generate_waypoints(start, target, step_size=40):
         binary_grid = (grid == CELL_OBSTACLE).astype(np.int32)
 
         # Clear start and goal cells
-        s_col = int(start[0] / frame_w * FULL_GRID)
-        s_row = int(start[1] / frame_h * FULL_GRID)
-        t_col = int(target[0] / frame_w * FULL_GRID)
-        t_row = int(target[1] / frame_h * FULL_GRID)
-        s_row = max(0, min(s_row, FULL_GRID - 1))
-        s_col = max(0, min(s_col, FULL_GRID - 1))
-        t_row = max(0, min(t_row, FULL_GRID - 1))
-        t_col = max(0, min(t_col, FULL_GRID - 1))
+        s_row, s_col = _pixel_to_full_grid(start[0], start[1], frame_w, frame_h)
+        t_row, t_col = _pixel_to_full_grid(target[0], target[1], frame_w, frame_h)
         binary_grid[s_row, s_col] = 0
         binary_grid[t_row, t_col] = 0
 
-        pf = _get_neural_pathfinder()
-        cell_w = frame_w / FULL_GRID
-        cell_h = frame_h / FULL_GRID
-
-        # Use find_path directly with grid coords (not find_path_pixel)
-        # since cell_w != cell_h and find_path_pixel assumes square cells
-        grid_path = pf.find_path(
-            binary_grid,
-            start=(s_row, s_col),
-            goal=(t_row, t_col),
+        # Use grid coords directly (not find_path_pixel) since
+        # cell_w != cell_h and find_path_pixel assumes square cells
+        grid_path, planner = _find_grid_path(
+            binary_grid, (s_row, s_col), (t_row, t_col)
         )
 
         if grid_path:
-            # Convert grid (row,col) back to pixel (x,y), skip start
-            waypoints = []
-            for r, c in grid_path[1:]:
-                px = c * cell_w + cell_w / 2
-                py = r * cell_h + cell_h / 2
-                waypoints.append([px, py])
-            waypoints[-1] = [float(target[0]), float(target[1])]
-            print(f"[pathfind] Neural A* path: {len(waypoints)} waypoints")
+            waypoints = _grid_path_to_waypoints(
+                grid_path, target, frame_w, frame_h,
+                grid=binary_grid if smooth else None,
+            )
+            print(f"[pathfind] {planner} path: {len(waypoints)} waypoints")
+            if track is not None:
+                _track_path(track, binary_grid, grid_path, target, smooth)
             return waypoints
 
-        print("[pathfind] Neural A* found no path — falling back to straight line")
+        print(f"[pathfind] {planner} found no path — falling back to straight line")
     except Exception as e:
-        print(f"[pathfind] Neural pathfinder unavailable ({e}) — using straight line")
+        print(f"[pathfind] Grid pathfinding unavailable ({e}) — using straight line")
 
     # Fallback: straight-line waypoints
     sx, sy = start
@@ -434,6 +519,7 @@ async def _bot_control_async(marker_id, device_id, path, stop_event, waypoint_id
 
                 if path_follower.finished:
                     print(f"[bot {marker_id}] reached target")
+                    _untrack_path(marker_id)
                     break
 
             await asyncio.sleep(0.05)
@@ -446,36 +532,100 @@ async def _bot_control_async(marker_id, device_id, path, stop_event, waypoint_id
         _write_active_bots()
 
 
-# ---------------------------------------------------------------------------
-# Public actions (exposed to main.py / LLM)
-# ---------------------------------------------------------------------------
-
-def move_to(target, bot_id=0):
+def _track_path(marker_id, binary_grid, grid_path, target, smooth=False):
+    """Register a bot's grid path for repair as obstacles change."""
+    global _replanner, _repair_thread
+    with _replan_lock:
+        if _replanner is None or _replanner.shape != binary_grid.shape:
+            _replanner = IncrementalPlanner(binary_grid)
+        else:
+            _replanner.update(binary_grid)
+        _replanner.plan(marker_id, grid_path[0], grid_path[-1], path=grid_path)
+        _replan_targets[marker_id] = [float(target[0]), float(target[1])]
+        _replan_smooth[marker_id] = smooth
+        if _repair_thread is None:
+            _repair_thread = threading.Thread(target=_repair_loop, daemon=True)
+            _repair_thread.start()
+
+
+def _untrack_path(marker_id):
+    """Stop repairing a bot's path (arrived, stopped or re-tasked)."""
+    with _replan_lock:
+        _replan_targets.pop(marker_id, None)
+        _replan_smooth.pop(marker_id, None)
+        if _replanner is not None:
+            _replanner.drop(marker_id)
+
+
+def _repair_paths():
     """
-    Move a bot to the target position. Pathfinding (straight-line waypoints)
-    is handled automatically.
-
-    Args:
-        target: [x, y] target pixel position in the camera frame
-        bot_id: which robot to move (0, 1, or 2)
+    Re-detect obstacles and repair the path of every tracked bot.
 
-    Returns:
-        str — confirmation that the command was sent
+    Only bots whose remaining path became blocked are re-routed; the rest
+    keep following their current waypoints.
     """
-    marker_id, device_id = _resolve_bot(bot_id)
-    target = [float(target[0]), float(target[1])]
-
-    # Get current position to generate waypoints
+    world = _detect_world_state()
+    grid = np.array(world["matrix"], dtype=np.int32)
+    binary_grid = (grid == CELL_OBSTACLE).astype(np.int32)
+    frame_w, frame_h = _get_frame_size()
     markers = _read_markers()
-    info = markers.get(marker_id)
-    if info:
-        start = info["center"]
-    else:
-        # No camera data yet — use target as single waypoint
-        start = target
-
-    path = _generate_waypoints(start, target)
 
+    reroutes = []
+    with _replan_lock:
+        if _replanner is None or _replanner.shape != binary_grid.shape:
+            return
+        positions = {}
+        for marker_id, target in _replan_targets.items():
+            info = markers.get(marker_id)
+            if info:
+                positions[marker_id] = _pixel_to_full_grid(
+                    info["center"][0], info["center"][1], frame_w, frame_h
+                )
+            # Targets stay reachable even if detection flickers on them
+            binary_grid[_pixel_to_full_grid(target[0], target[1], frame_w, frame_h)] = 0
+        for pos in positions.values():
+            binary_grid[pos] = 0
+
+        _replanner.update(binary_grid)
+        for marker_id, grid_path in _replanner.repair(positions, keep_valid=True).items():
+            if grid_path is None or len(grid_path) < 2:
+                print(f"[pathfind] Bot {marker_id}: path blocked and no detour found")
+                _replan_targets.pop(marker_id)
+                _replan_smooth.pop(marker_id, None)
+                _replanner.drop(marker_id)
+                continue
+            target = _replan_targets[marker_id]
+            smooth_grid = binary_grid if _replan_smooth.get(marker_id) else None
+            reroutes.append(
+                (marker_id, _grid_path_to_waypoints(grid_path, target, frame_w, frame_h,
+                                                    grid=smooth_grid))
+            )
+
+    for marker_id, path in reroutes:
+        with _bots_lock:
+            entry = _active_bots.get(marker_id)
+        if entry is None:
+            continue
+        print(f"[pathfind] Bot {marker_id}: path repaired ({len(path)} waypoints)")
+        _launch_bot(marker_id, entry["device_id"], path)
+
+
+def _repair_loop():
+    """Background loop: repair tracked paths every REPAIR_INTERVAL_S."""
+    while True:
+        time.sleep(REPAIR_INTERVAL_S)
+        with _replan_lock:
+            idle = not _replan_targets
+        if idle:
+            continue
+        try:
+            _repair_paths()
+        except Exception as e:
+            print(f"[pathfind] Path repair skipped ({e})")
+
+
+def _launch_bot(marker_id, device_id, path):
+    """Publish a bot's path and (re)start its control thread."""
     # --- update path.json (atomic read-modify-write) ---
     with _path_json_lock:
         data = _load_path_json()
@@ -512,6 +662,39 @@ def move_to(target, bot_id=0):
         }
 
     _write_active_bots()
+
+
+# ---------------------------------------------------------------------------
+# Public actions (exposed to main.py / LLM)
+# ---------------------------------------------------------------------------
+
+def move_to(target, bot_id=0):
+    """
+    Move a bot to the target position. Pathfinding (straight-line waypoints)
+    is handled automatically.
+
+    Args:
+        target: [x, y] target pixel position in the camera frame
+        bot_id: which robot to move (0, 1, or 2)
+
+    Returns:
+        str — confirmation that the command was sent
+    """
+    marker_id, device_id = _resolve_bot(bot_id)
+    target = [float(target[0]), float(target[1])]
+
+    # Get current position to generate waypoints
+    markers = _read_markers()
+    info = markers.get(marker_id)
+    if info:
+        start = info["center"]
+    else:
+        # No camera data yet — use target as single waypoint
+        start = target
+
+    _untrack_path(marker_id)
+    path = _generate_waypoints(start, target, track=marker_id)
+    _launch_bot(marker_id, device_id, path)
     return f"Sent move_to command: bot={marker_id}, target={target}"
 
 
@@ -526,6 +709,7 @@ def stop(bot_id=0):
         str — confirmation message
     """
     marker_id, _ = _resolve_bot(bot_id)
+    _untrack_path(marker_id)
     with _bots_lock:
         entry = _active_bots.pop(marker_id, None)
     if entry:
@@ -653,42 +837,8 @@ def push_and_exit(bot_id=0):
     path = path_to_obstacle + [[align_x, align_y]] + march_path
     print(f"[push] Full path: {len(path)} waypoints (navigate + align + march)")
 
-    # Update path.json
-    with _path_json_lock:
-        data = _load_path_json()
-        data["robots"][str(marker_id)] = {
-            "device_id": device_id,
-            "path": path,
-        }
-        _save_path_json(data)
-
-    # Stop any existing movement
-    with _bots_lock:
-        old = _active_bots.pop(marker_id, None)
-    if old:
-        old["stop"].set()
-        old["thread"].join(timeout=3)
-
-    # Launch control thread
-    stop_evt = threading.Event()
-    waypoint_idx = [0]
-    t = threading.Thread(
-        target=_bot_control_loop,
-        args=(marker_id, device_id, path, stop_evt, waypoint_idx),
-        daemon=True,
-    )
-    t.start()
-
-    with _bots_lock:
-        _active_bots[marker_id] = {
-            "thread": t,
-            "stop": stop_evt,
-            "device_id": device_id,
-            "path": path,
-            "waypoint_idx": waypoint_idx,
-        }
-
-    _write_active_bots()
+    _untrack_path(marker_id)
+    _launch_bot(marker_id, device_id, path)
     return f"Bot {bot_id} pushing toward boundary at {target}"
 
 
@@ -0,0 +1,520 @@
+"""
+Shared-memory world state published by the simulations.
+
+The simulations used to rewrite a JSON state file on every frame that
+changed anything, and every reader (each actions module, main.py's poll
+loop, every bot thread) re-read and re-parsed it. A StatePlane is one
+shared-memory segment per world with a fixed numpy layout instead:
+
+    pos          (max_bots, 2) int16    bot cells
+    orientation  (max_bots,)   float32  bot headings
+    active       (max_bots,)   uint8    1 while a bot is following a path
+    grid         (H, W)        uint8    obstacle grid
+    <layer>      (H, W)        any      world layers (cluster labels, coins, ...)
+    scalars      (k,)          float64  named numbers (score, stats)
+    <text>       (64,)         uint8    short named strings
+    versions     (arrays,)     uint64   seq at which each array last changed
+    log_*        (L,)                   ring of per-bot changes
+
+A 4 KB header holds the magic number, a seqlock counter, the writer's
+pid, the bot count and the layout (JSON, parsed once on attach). The
+writer makes the counter odd, updates the arrays, and makes it even
+again; a reader copies what it needs and retries if the counter was odd
+or moved meanwhile, so snapshots are consistent without locks or
+parsing. Readers re-attach when the writer closes the segment or dies.
+
+State is versioned by that counter. publish() only rewrites an array
+whose contents changed and stamps it with the new seq, so static layers
+such as the grid keep their version until the world is regenerated; and
+each bot that moved is appended to the change log. changes(since) then
+returns just what changed after seq since: the moved bots and the
+arrays with newer versions (or a full snapshot if since is older than
+the log), and StateReader.changes() tracks since for its caller. A
+full snapshot of a 64x64 world is a few KB, so the actions still take
+snapshots; changes() is for consumers that follow what moved.
+
+Each world still exports its state as JSON (rate-limited) for debugging
+and for readers that cannot attach.
+
+Usage (simulation):
+    plane = StatePlane.create("openhive_mimic", grid.shape, NUM_BOTS,
+                              texts=("target_shape",))
+    plane.publish(bots, grid=grid, texts={"target_shape": "star"})
+    plane.close()   # on exit: marks the segment closed and unlinks it
+
+Usage (reader):
+    reader = StateReader("openhive_mimic")
+    snap = reader.snapshot()   # dict of numpy copies, or None
+    snap["pos"], snap["grid"], snap["target_shape"], snap["seq"]
+
+    delta = reader.changes()   # only what changed since the last call
+    delta["bots"]["index"], delta["bots"]["pos"], delta.get("grid")
+"""
+
+import json
+import os
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x314554415453484F  # b"OHSTATE1"
+HEADER_BYTES = 4096
+TEXT_BYTES = 64
+
+# Header words
+(_MAGIC, _SEQ, _CLOSED, _PID, _N_BOTS, _LAYOUT_BYTES,
+ _BOTS_VERSION, _LOG_HEAD, _LOG_FLOOR) = range(9)
+_HEADER_WORDS = 16
+_LAYOUT_OFFSET = _HEADER_WORDS * 8
+
+# Seconds between checks that the writer process is still alive
+_LIVENESS_S = 1.0
+
+# Bot arrays (sliced to the bot count) and the change log
+_BOT_ARRAYS = ("pos", "orientation", "active")
+_LOG_ARRAYS = ("log_seq", "log_bot", "log_pos", "log_orientation", "log_active")
+
+_created = set()  # segments created by this process
+
+
+def _layout(grid_shape, max_bots, layers, scalars, texts, log_size):
+    H, W = (int(d) for d in grid_shape)
+    versioned = [
+        ("grid", "|u1", [H, W]),
+    ]
+    versioned += [(name, np.dtype(dtype).str, [H, W]) for name, dtype in layers.items()]
+    versioned.append(("scalars", "<f8", [max(1, len(scalars))]))
+    versioned += [(name, "|u1", [TEXT_BYTES]) for name in texts]
+    arrays = [
+        ("pos", "<i2", [max_bots, 2]),
+        ("orientation", "<f4", [max_bots]),
+        ("active", "|u1", [max_bots]),
+        *versioned,
+        ("versions", "<u8", [len(versioned)]),
+        ("log_seq", "<u8", [log_size]),
+        ("log_bot", "<i2", [log_size]),
+        ("log_pos", "<i2", [log_size, 2]),
+        ("log_orientation", "<f4", [log_size]),
+        ("log_active", "|u1", [log_size]),
+    ]
+
+    names = [a[0] for a in arrays] + list(scalars) + ["seq", "full", "bots"]
+    if len(set(names)) != len(names):
+        raise ValueError(f"State names must be unique and not reserved, got {names}")
+
+    entries = []
+    offset = HEADER_BYTES
+    for name, dtype, shape in arrays:
+        entries.append([name, dtype, shape, offset])
+        nbytes = np.dtype(dtype).itemsize * int(np.prod(shape))
+        offset += -(-nbytes // 64) * 64  # keep every array cache-line aligned
+    return {"arrays": entries, "versioned": [a[0] for a in versioned],
+            "scalars": list(scalars), "texts": list(texts), "size": offset}
+
+
+def _open(name):
+    """Attach to an existing segment without handing it to our resource tracker."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Before Python 3.13 every attach registers the segment, and the
+        # tracker would unlink it when this reader exits
+        shm = shared_memory.SharedMemory(name)
+        if name not in _created:  # the writer's own registration must stay
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class StatePlane:
+    """One world's state segment; create() for the writer, attach() for readers."""
+
+    def __init__(self, shm, layout, owner):
+        self.name = shm.name
+        self.layout = layout
+        self.owner = owner
+        self.max_bots = layout["arrays"][0][2][0]
+        self._shm = shm
+        self._header = np.ndarray((_HEADER_WORDS,), np.uint64, shm.buf, 0)
+        self._arrays = {name: np.ndarray(shape, np.dtype(dtype), shm.buf, offset)
+                        for name, dtype, shape, offset in layout["arrays"]}
+        self._scalar_index = {name: i for i, name in enumerate(layout["scalars"])}
+        self._version_index = {name: i for i, name in enumerate(layout["versioned"])}
+        self._log_size = len(self._arrays["log_seq"])
+
+    @classmethod
+    def create(cls, name, grid_shape, max_bots, layers=None, scalars=(), texts=(),
+               log_size=None):
+        """
+        Create (or replace) the segment name.
+
+        Args:
+            name:       shared-memory name, one per world
+            grid_shape: (H, W) of the obstacle grid and every layer
+            max_bots:   capacity of the bot arrays
+            layers:     {name: dtype} of extra (H, W) arrays
+            scalars:    names of float values
+            texts:      names of short strings (up to 64 UTF-8 bytes)
+            log_size:   bot changes kept for changes() (default 64 per bot)
+        """
+        max_bots = int(max_bots)
+        log_size = max(1024, 64 * max_bots) if log_size is None else int(log_size)
+        if log_size < max_bots:
+            raise ValueError(f"log_size must hold one change per bot, got {log_size} < {max_bots}")
+        layout = _layout(grid_shape, max_bots, layers or {}, scalars, texts, log_size)
+        data = json.dumps(layout).encode()
+        if len(data) > HEADER_BYTES - _LAYOUT_OFFSET:
+            raise ValueError(f"State layout too large ({len(data)} bytes)")
+        try:
+            stale = _open(name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        shm = shared_memory.SharedMemory(name, create=True, size=layout["size"])
+        _created.add(name)
+        shm.buf[_LAYOUT_OFFSET:_LAYOUT_OFFSET + len(data)] = data
+        header = np.ndarray((_HEADER_WORDS,), np.uint64, shm.buf, 0)
+        header[_PID] = os.getpid()
+        header[_LAYOUT_BYTES] = len(data)
+        header[_MAGIC] = MAGIC  # last: readers ignore the segment until now
+        del header
+        return cls(shm, layout, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """The segment name if a writer has published it, else None."""
+        try:
+            shm = _open(name)
+        except FileNotFoundError:
+            return None
+        header = np.ndarray((_HEADER_WORDS,), np.uint64, shm.buf, 0)
+        ready = int(header[_MAGIC]) == MAGIC and not header[_CLOSED]
+        size = int(header[_LAYOUT_BYTES])
+        del header
+        if not ready:
+            shm.close()
+            return None
+        layout = json.loads(bytes(shm.buf[_LAYOUT_OFFSET:_LAYOUT_OFFSET + size]))
+        return cls(shm, layout, owner=False)
+
+    @property
+    def seq(self):
+        return int(self._header[_SEQ])
+
+    @property
+    def closed(self):
+        return bool(self._header[_CLOSED])
+
+    @property
+    def writer_pid(self):
+        return int(self._header[_PID])
+
+    def version(self, name):
+        """seq at which array name ("grid", a layer, "scalars" or a text) last changed."""
+        return int(self._arrays["versions"][self._version_index[name]])
+
+    def _stamp(self, name, value, seq):
+        """Write value into array name if it differs; stamp its version with seq."""
+        view = self._arrays[name]
+        if np.array_equal(view, value):
+            return
+        view[...] = value
+        self._arrays["versions"][self._version_index[name]] = seq
+
+    def publish(self, bots, grid=None, layers=None, scalars=None, texts=None):
+        """
+        Write a new state (writer only).
+
+        Arrays are only rewritten (and their versions bumped) when their
+        contents changed, and every bot whose position, orientation or
+        active flag changed goes to the change log.
+
+        Args:
+            bots:    simulation bot dicts (pos, orientation, path, path_idx)
+            grid:    obstacle grid, when it may have changed
+            layers:  {name: (H, W) array} for layers that may have changed
+            scalars: {name: number}
+            texts:   {name: str or None}
+        """
+        n = len(bots)
+        if n > self.max_bots:
+            raise ValueError(f"{n} bots exceed the plane's capacity of {self.max_bots}")
+        pos = np.array([b["pos"] for b in bots], dtype=np.int16).reshape(n, 2)
+        orientation = np.array([b["orientation"] for b in bots], dtype=np.float32)
+        active = np.array([bool(b["path"]) and b["path_idx"] < len(b["path"]) for b in bots],
+                          dtype=np.uint8)
+
+        a = self._arrays
+        header = self._header
+        seq = int(header[_SEQ]) + 2  # the seq this publish ends on
+        header[_SEQ] += 1  # odd: write in progress
+        try:
+            if n != int(header[_N_BOTS]) or not int(header[_BOTS_VERSION]):
+                # Bots replaced: readers start over from a full snapshot
+                header[_BOTS_VERSION] = seq
+                header[_N_BOTS] = n
+                changed = np.empty(0, dtype=np.intp)
+            else:
+                changed = np.flatnonzero((a["pos"][:n] != pos).any(axis=1)
+                                         | (a["orientation"][:n] != orientation)
+                                         | (a["active"][:n] != active))
+            a["pos"][:n] = pos
+            a["orientation"][:n] = orientation
+            a["active"][:n] = active
+            self._log(changed, pos, orientation, active, seq)
+
+            if grid is not None:
+                self._stamp("grid", np.asarray(grid) != 0, seq)
+            for name, layer in (layers or {}).items():
+                self._stamp(name, layer, seq)
+            if scalars:
+                values = a["scalars"].copy()
+                for name, value in scalars.items():
+                    values[self._scalar_index[name]] = value
+                self._stamp("scalars", values, seq)
+            for name, text in (texts or {}).items():
+                data = np.zeros(TEXT_BYTES, dtype=np.uint8)
+                raw = (text or "").encode()[:TEXT_BYTES]
+                data[:len(raw)] = np.frombuffer(raw, np.uint8)
+                self._stamp(name, data, seq)
+        finally:
+            header[_SEQ] += 1
+
+    def _log(self, changed, pos, orientation, active, seq):
+        """Append the changed bots to the ring log, stamped with seq."""
+        size = self._log_size
+        if not changed.size:
+            return
+        a = self._arrays
+        head = int(self._header[_LOG_HEAD])
+        slots = np.arange(head, head + len(changed)) % size
+        if head + len(changed) > size:
+            # Oldest seq about to be overwritten: readers behind it need a full read
+            evicted = np.arange(head - size, head + len(changed) - size)
+            evicted = evicted[evicted >= 0] % size
+            if evicted.size:
+                self._header[_LOG_FLOOR] = max(int(self._header[_LOG_FLOOR]),
+                                               int(a["log_seq"][evicted].max()))
+        a["log_seq"][slots] = seq
+        a["log_bot"][slots] = changed
+        a["log_pos"][slots] = pos[changed]
+        a["log_orientation"][slots] = orientation[changed]
+        a["log_active"][slots] = active[changed]
+        self._header[_LOG_HEAD] = head + len(changed)
+
+    def _log_start(self, since, head):
+        """First log position (not slot) with a seq after since; binary search over the ring."""
+        log_seq = self._arrays["log_seq"]
+        size = self._log_size
+        lo, hi = max(0, head - size), head
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if int(log_seq[mid % size]) <= since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _log_copy(self, name, start, stop):
+        """Copy of log array name between ring positions start and stop."""
+        view = self._arrays[name]
+        size = self._log_size
+        a, b = start % size, stop % size
+        if stop - start == 0:
+            return view[:0].copy()
+        if a < b:
+            return view[a:b].copy()
+        return np.concatenate([view[a:], view[:b]])  # wraps around the ring
+
+    def _read(self, n):
+        """Full copy of every array but the log (inside a seqlock read)."""
+        snap = {}
+        for name, view in self._arrays.items():
+            if name in _BOT_ARRAYS:
+                snap[name] = view[:n].copy()
+            elif name not in _LOG_ARRAYS and name != "versions":
+                snap[name] = view.copy()
+        return snap
+
+    def _finish(self, snap):
+        """Turn raw copies into the snapshot format (scalars and texts by name)."""
+        scalars = snap.pop("scalars", None)
+        if scalars is not None:
+            for name, i in self._scalar_index.items():
+                snap[name] = float(scalars[i])
+        for name in self.layout["texts"]:
+            if name in snap:
+                snap[name] = bytes(snap[name]).rstrip(b"\0").decode() or None
+        if "active" in snap:
+            snap["active"] = snap["active"].astype(bool)
+        return snap
+
+    def snapshot(self, retries=100):
+        """
+        Consistent copy of the state, or None if the writer kept it busy.
+
+        Returns:
+            dict with "seq", "pos", "orientation", "active" (first n_bots
+            rows), "grid", every layer, scalar and text by name
+        """
+        header = self._header
+        for _ in range(retries):
+            seq = int(header[_SEQ])
+            if seq & 1:
+                time.sleep(0)
+                continue
+            snap = self._read(int(header[_N_BOTS]))
+            if int(header[_SEQ]) == seq:
+                snap["seq"] = seq
+                return self._finish(snap)
+        return None
+
+    def changes(self, since, retries=100):
+        """
+        What changed after seq since (from an earlier snapshot or changes()).
+
+        Returns:
+            None if the writer kept the segment busy, else a dict with
+            "seq" and "full". If full (since is None, older than the change
+            log, or the bots were replaced) it is a complete snapshot.
+            Otherwise it has "bots" — {"index", "pos", "orientation",
+            "active"} arrays of the bots that changed, oldest change first
+            — plus every grid, layer, scalar or text updated after since.
+        """
+        header = self._header
+        a = self._arrays
+        for _ in range(retries):
+            seq = int(header[_SEQ])
+            if seq & 1:
+                time.sleep(0)
+                continue
+            n = int(header[_N_BOTS])
+            head = int(header[_LOG_HEAD])
+            full = (since is None or since < int(header[_LOG_FLOOR])
+                    or since < int(header[_BOTS_VERSION]))
+            if not full:
+                start = self._log_start(since, head)
+                full = head - start > n  # more changes than bots: a full copy is cheaper
+            if full:
+                delta = self._read(n)
+            else:
+                delta = {}
+                versions = a["versions"].copy()
+                for name, i in self._version_index.items():
+                    if versions[i] > since:
+                        delta[name] = a[name].copy()
+                bots = {"index": self._log_copy("log_bot", start, head).astype(np.intp),
+                        "pos": self._log_copy("log_pos", start, head),
+                        "orientation": self._log_copy("log_orientation", start, head),
+                        "active": self._log_copy("log_active", start, head).astype(bool)}
+            if int(header[_SEQ]) == seq:
+                delta = self._finish(delta)
+                delta["seq"] = seq
+                delta["full"] = full
+                if not full:
+                    delta["bots"] = bots
+                return delta
+        return None
+
+    def close(self):
+        """Detach; the writer also marks the segment closed and unlinks it."""
+        if self._shm is None:
+            return
+        if self.owner:
+            self._header[_CLOSED] = 1
+        self._header = None
+        self._arrays = {}
+        self._shm.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._shm = None
+
+
+class StateReader:
+    """
+    Reader side of a world's plane: attaches on first use, and again after
+    the simulation restarts (closed segment or dead writer).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._plane = None
+        self._since = None  # seq of the last changes() result
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _writer_alive(self, plane):
+        try:
+            os.kill(plane.writer_pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def plane(self):
+        """The attached StatePlane, or None if no simulation publishes one."""
+        with self._lock:
+            plane = self._plane
+            now = time.time()
+            if plane is not None and (plane.closed or (
+                    now - self._checked >= _LIVENESS_S and not self._writer_alive(plane))):
+                plane.close()
+                plane = self._plane = None
+                self._since = None
+            if plane is None:
+                plane = self._plane = StatePlane.attach(self.name)
+            if now - self._checked >= _LIVENESS_S:
+                self._checked = now
+            return plane
+
+    def snapshot(self):
+        """StatePlane.snapshot() of the current segment, or None."""
+        plane = self.plane()
+        return plane.snapshot() if plane is not None else None
+
+    def changes(self):
+        """
+        StatePlane.changes() since this reader's previous changes() call
+        (a full snapshot the first time and after the simulation restarts),
+        or None.
+        """
+        plane = self.plane()
+        if plane is None:
+            return None
+        with self._lock:
+            delta = plane.changes(self._since)
+            if delta is not None:
+                self._since = delta["seq"]
+            return delta
+
+
+def bot_list(snap):
+    """Bots in the JSON state format: [{"pos": [r, c], "orientation": o}, ...]."""
+    return [{"pos": pos, "orientation": round(o, 4)}
+            for pos, o in zip(snap["pos"].tolist(), snap["orientation"].tolist())]
+
+
+def cells(mask):
+    """[[r, c], ...] of the nonzero cells of a layer."""
+    return np.argwhere(mask).tolist()
+
+
+def clusters(labels):
+    """Cells grouped by label (1, 2, ...) of a label layer, in label order."""
+    flat = labels.ravel()
+    order = np.flatnonzero(flat)
+    order = order[np.argsort(flat[order], kind="stable")]
+    if not order.size:
+        return []
+    rows, cols = np.divmod(order, labels.shape[1])
+    cells_rc = np.stack([rows, cols], axis=1).tolist()
+    splits = np.flatnonzero(np.diff(flat[order])) + 1
+    bounds = [0] + splits.tolist() + [len(order)]
+    return [cells_rc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,32 @@
+"""
+Seeded random grids and path checks shared by the pathfinding tests.
+"""
+
+import math
+
+import numpy as np
+
+
+def random_grid(seed, shape=(24, 24), density=0.25):
+    """Obstacle grid (0 = free, 1 = obstacle) with a fixed seed."""
+    rng = np.random.default_rng(seed)
+    return (rng.random(shape) < density).astype(np.uint8)
+
+
+def free_cells(grid, count, seed):
+    """count distinct free (row, col) cells of grid, picked with a seed."""
+    rng = np.random.default_rng(seed)
+    free = np.argwhere(grid == 0)
+    picks = rng.choice(len(free), size=count, replace=False)
+    return [(int(free[i][0]), int(free[i][1])) for i in picks]
+
+
+def path_cost(grid, path):
+    """Octile cost of a path; asserts every step is one move into a free cell."""
+    cost = 0.0
+    for (r0, c0), (r1, c1) in zip(path, path[1:]):
+        dr, dc = abs(r1 - r0), abs(c1 - c0)
+        assert max(dr, dc) == 1, f"{(r0, c0)} -> {(r1, c1)} is not one move"
+        assert grid[r1, c1] == 0, f"{(r1, c1)} is blocked"
+        cost += math.sqrt(2) if dr and dc else 1.0
+    return cost
@@ -0,0 +1,65 @@
+"""
+ARA* paths against the suboptimality bound they report.
+
+    python -m pytest tests/test_anytime.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, path_cost, random_grid
+from pathfinding.anytime import ara_star
+from pathfinding.fields import distance_field
+
+
+def _requests(seed, count=5):
+    grid = random_grid(seed, shape=(32, 32), density=0.3)
+    cells = free_cells(grid, 2 * count, seed)
+    return grid, list(zip(cells[::2], cells[1::2]))
+
+
+@pytest.mark.parametrize("deadline_ms", [0.0, 1000.0])
+@pytest.mark.parametrize("seed", range(5))
+def test_cost_within_bound(seed, deadline_ms):
+    grid, requests = _requests(seed)
+    for start, goal in requests:
+        optimal = distance_field(grid, goal)[start]
+        path, bound = ara_star(grid, start, goal, deadline_ms=deadline_ms)
+        if not np.isfinite(optimal):
+            assert path is None and bound is None
+            continue
+        assert path[0] == start and path[-1] == goal
+        assert bound >= 1.0
+        assert path_cost(grid, path) <= bound * optimal + 1e-9
+        if deadline_ms:
+            assert bound == pytest.approx(1.0)
+            assert path_cost(grid, path) == pytest.approx(optimal)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bound_holds_for_an_inadmissible_heuristic(seed):
+    rng = np.random.default_rng(seed)
+    grid, requests = _requests(seed)
+    for start, goal in requests:
+        dist = distance_field(grid, goal)
+        if not np.isfinite(dist[start]):
+            continue
+        # Up to twice the true cost-to-go, like an overconfident CNN
+        h = np.where(np.isfinite(dist), dist, 0.0) * rng.uniform(0.5, 2.0, grid.shape)
+        stats = {}
+        path, bound = ara_star(grid, start, goal, h=h, deadline_ms=0.0, stats=stats)
+        assert stats["iterations"] >= 1
+        assert path_cost(grid, path) <= bound * dist[start] + 1e-9
+
+
+def test_eps_bounds_an_admissible_heuristic():
+    grid = np.zeros((16, 16), dtype=np.uint8)
+    grid[2:14, 8] = 1
+    stats = {}
+    path, bound = ara_star(grid, (8, 0), (8, 15), deadline_ms=0.0, eps0=2.0, stats=stats)
+    assert bound <= stats["eps"]
+    assert path_cost(grid, path) <= bound * distance_field(grid, (8, 15))[8, 0] + 1e-9
@@ -0,0 +1,76 @@
+"""
+Bot-to-target assignment against a full solve on exact distances.
+
+    python -m pytest tests/test_assignment.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+from scipy.optimize import linear_sum_assignment
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, random_grid
+from pathfinding.assignment import TargetAssigner
+from pathfinding.fields import distance_field, distance_fields
+
+
+def _costs(grid, bots, targets):
+    cost = np.array([[distance_field(grid, t)[b] for t in targets] for b in bots])
+    cost[~np.isfinite(cost)] = 2.0 * grid.size
+    return cost
+
+
+def _optimum(cost):
+    r, c = linear_sum_assignment(cost)
+    return cost[r, c].sum()
+
+
+def _check(pairs, cost):
+    bots, targets = zip(*pairs)
+    assert len(pairs) == min(cost.shape)
+    assert len(set(bots)) == len(bots) and len(set(targets)) == len(targets)
+    assert sum(cost[i, j] for i, j in pairs) == pytest.approx(_optimum(cost))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_batched_fields_match(seed):
+    grid = random_grid(seed)
+    goals = free_cells(grid, 5, seed) + [tuple(np.argwhere(grid == 1)[0])]
+    for goal, field in zip(goals, distance_fields(grid, goals)):
+        np.testing.assert_allclose(field, distance_field(grid, goal))
+
+
+@pytest.mark.parametrize("shape", [(8, 8), (8, 5), (5, 8)], ids=["square", "bots", "targets"])
+@pytest.mark.parametrize("seed", range(4))
+def test_assignment_is_optimal(seed, shape):
+    grid = random_grid(seed, density=0.3)
+    cells = free_cells(grid, sum(shape), seed)
+    bots, targets = cells[:shape[0]], cells[shape[0]:]
+    pairs = TargetAssigner().assign(grid, bots, targets)
+    _check(pairs, _costs(grid, bots, targets))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_warm_start_stays_optimal(seed):
+    grid = random_grid(seed, density=0.3)
+    cells = free_cells(grid, 14, seed)
+    bots, targets = cells[:7], cells[7:]
+    assigner = TargetAssigner()
+    first = assigner.assign(grid, bots, targets)
+
+    # Three bots reach their targets, one target moves
+    for i, j in first[:3]:
+        bots[i] = targets[j]
+    fresh = next((int(r), int(c)) for r, c in np.argwhere(grid == 0) if (r, c) not in cells)
+    targets[first[-1][1]] = fresh
+    stats = {}
+    pairs = assigner.assign(grid, bots, targets, stats)
+    assert stats["kept"] >= 3 and stats["solved"] == len(bots) - stats["kept"]
+    assert stats["fields"] <= 1
+    _check(pairs, _costs(grid, bots, targets))
+    assert set(first[:3]) <= set(pairs)
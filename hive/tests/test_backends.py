@@ -0,0 +1,78 @@
+"""
+Parity of the converted inference backends with the eager model.
+
+Each backend is built from a randomly initialised checkpoint in a temp
+directory and compared against the eager forward on random grids, within
+the tolerance load_backend() enforces after converting.
+
+    python -m pytest tests/test_backends.py
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "move_world"))
+from backends import PARITY_TOL, REQUIRES, check_parity, load_backend
+from model import HeuristicNet, HeuristicNetV2
+
+GRID = 64
+
+
+def _model(version):
+    torch.manual_seed(0)
+    model = HeuristicNetV2(num_iterations=2) if version == "v2" else HeuristicNet()
+    return model.eval()
+
+
+@pytest.fixture(params=["v1", "v2"])
+def checkpoint(request, tmp_path):
+    model = _model(request.param)
+    path = tmp_path / f"{request.param}.pt"
+    torch.save({"model_state_dict": model.state_dict(), "max_cost": 100.0}, path)
+    return model, path
+
+
+@pytest.mark.parametrize("backend", ["script", "int8", "compile"])
+@pytest.mark.parametrize("channels_last", [False, True])
+def test_backend_matches_eager(checkpoint, backend, channels_last):
+    model, path = checkpoint
+    runner = load_backend(model, path, backend, threads=1,
+                          channels_last=channels_last, grid_size=GRID)
+    try:
+        err = check_parity(runner, model, GRID)
+    except Exception as e:  # torch.compile needs a working C++ toolchain
+        if backend == "compile":
+            pytest.skip(f"torch.compile unavailable here: {e}")
+        raise
+    assert err <= PARITY_TOL[backend]
+
+
+def test_converted_file_is_reused(checkpoint):
+    model, path = checkpoint
+    load_backend(model, path, "script", threads=1, grid_size=GRID)
+    artifact = path.with_name(path.stem + ".script.pt")
+    mtime = artifact.stat().st_mtime_ns
+    load_backend(model, path, "script", threads=1, grid_size=GRID)
+    assert artifact.stat().st_mtime_ns == mtime
+
+
+def test_onnx_needs_onnxruntime(checkpoint):
+    model, path = checkpoint
+    if all(importlib.util.find_spec(m) for m in REQUIRES["onnx"]):
+        runner = load_backend(model, path, "onnx", threads=1, grid_size=GRID)
+        assert check_parity(runner, model, GRID) <= PARITY_TOL["onnx"]
+    else:
+        with pytest.raises(ImportError, match="onnx"):
+            load_backend(model, path, "onnx", threads=1, grid_size=GRID)
+        assert not path.with_suffix(".onnx").exists()
+
+
+def test_unknown_backend(checkpoint):
+    model, path = checkpoint
+    with pytest.raises(ValueError):
+        load_backend(model, path, "tensorrt")
@@ -0,0 +1,65 @@
+"""
+Doorbells: rings wake waits, quiet waits time out.
+
+    python -m pytest tests/test_doorbell.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import doorbell
+from doorbell import Doorbell, ring
+
+pytestmark = pytest.mark.skipif(not doorbell._HAS_UNIX, reason="needs AF_UNIX sockets")
+
+
+def test_ring_wakes_only_its_file(tmp_path):
+    tasks, events = tmp_path / "tasks.json", tmp_path / "events.jsonl"
+    with Doorbell(tasks) as bell, Doorbell(events) as other:
+        assert not bell.rung()
+        ring(tasks)
+        ring(tasks)  # rings pending together are read as one
+        assert bell.wait(timeout=1.0)
+        assert not bell.rung()
+        assert not other.wait(timeout=0.01)
+
+
+def test_wait_sleeps_until_rung(tmp_path):
+    path = tmp_path / "tasks.json"
+    with Doorbell(path) as bell:
+        t0 = time.monotonic()
+        assert not bell.wait(timeout=0.05)
+        assert time.monotonic() - t0 >= 0.04
+
+        timer = threading.Timer(0.05, ring, args=(path,))
+        timer.start()
+        t0 = time.monotonic()
+        assert bell.wait(timeout=5.0)
+        assert time.monotonic() - t0 < 2.0
+        timer.join()
+
+
+def test_adaptive_timeout(tmp_path):
+    path = tmp_path / "tasks.json"
+    with Doorbell(path, min_timeout=0.01, max_timeout=0.04) as bell:
+        for expected in (0.02, 0.04, 0.04):
+            assert not bell.wait()
+            assert bell._timeout == expected
+        assert not bell.wait(limit=0.0)
+        ring(path)
+        assert bell.wait()
+        assert bell._timeout == 0.01
+
+
+def test_dead_consumers_are_cleaned_up(tmp_path):
+    path = tmp_path / "tasks.json"
+    bell = Doorbell(path)
+    bell._sock.close()  # died without close(): its socket file stays
+    assert os.path.exists(bell.address)
+    ring(path)
+    assert not os.path.exists(bell.address)
@@ -0,0 +1,112 @@
+"""
+Movement events between a simulation and its dispatchers.
+
+    python -m pytest tests/test_events.py
+"""
+
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from events import DONE, EventReader, EventWriter
+
+
+def _bot(path):
+    return {"pos": path[0], "path": path, "path_idx": 1, "path_id": 4, "cmd": "a1-0"}
+
+
+def test_rejected_command_reports_its_own_id(tmp_path):
+    events_path = tmp_path / "events.jsonl"
+    writer = EventWriter(events_path)
+    reader = EventReader(events_path)
+    bot = _bot([(0, 0), (0, 1), (0, 2)])
+
+    writer.bot_event(3, bot, "failed", "a1-1")
+    writer.bot_event(3, bot, "progress")
+    writer.flush()
+
+    failed, progress = reader.poll()
+    assert failed["event"] in DONE and failed["cmd"] == "a1-1"
+    assert failed["path"] == 4 and failed["len"] == 3
+    assert progress["cmd"] == "a1-0"
+
+
+def test_wait_returns_matching_event(tmp_path):
+    events_path = tmp_path / "events.jsonl"
+    writer = EventWriter(events_path)
+    reader = EventReader(events_path)
+    bot = _bot([(0, 0), (0, 1)])
+    writer.bot_event(1, bot, "start")
+    writer.bot_event(2, bot, "arrived")
+    writer.flush()
+
+    event = reader.wait(lambda e: e["event"] == "arrived", timeout=1)
+    assert event["bot"] == 2
+    assert reader.wait(lambda e: True, timeout=0.05) is None
+
+
+def test_events_after_a_match_are_kept(tmp_path):
+    events_path = tmp_path / "events.jsonl"
+    writer = EventWriter(events_path)
+    reader = EventReader(events_path)
+    bot = _bot([(0, 0)])
+    # A one-cell path starts and arrives in the same flush
+    writer.bot_event(5, bot, "start")
+    writer.bot_event(5, bot, "arrived")
+    writer.flush()
+
+    assert reader.wait(lambda e: e["event"] == "start", timeout=1)["bot"] == 5
+    assert reader.wait(lambda e: e["event"] in DONE, timeout=1)["event"] == "arrived"
+    assert reader.poll() == []
+
+
+def _mimic_simulation():
+    pytest.importorskip("pygame")
+    path = os.path.join(os.path.dirname(__file__), "..", "mimic_world", "simulation.py")
+    spec = importlib.util.spec_from_file_location("mimic_simulation", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_mimic_rejected_target_keeps_the_path(tmp_path):
+    sim = _mimic_simulation()
+    events_path = tmp_path / "events.jsonl"
+    writer = EventWriter(events_path)
+    reader = EventReader(events_path)
+    grid = np.zeros((sim.GRID_SIZE, sim.GRID_SIZE), dtype=np.int32)
+    grid[5, 5] = 1
+    bot = _bot([(0, 0), (0, 1), (0, 2)])
+
+    for target in ([5, 5], [-1, 3], [sim.GRID_SIZE, 0]):
+        sim.move_to(writer, grid, 3, bot, {"id": "a2-3", "target": target,
+                                          "path": [[0, 0], target]})
+    writer.flush()
+
+    assert bot["path"] == [(0, 0), (0, 1), (0, 2)] and bot["path_idx"] == 1
+    assert bot["path_id"] == 4 and bot["cmd"] == "a1-0"
+    events = reader.poll()
+    assert [e["event"] for e in events] == ["failed"] * 3
+    assert all(e["cmd"] == "a2-3" and e["path"] == 4 for e in events)
+
+
+def test_mimic_accepted_target_starts_a_path(tmp_path):
+    sim = _mimic_simulation()
+    events_path = tmp_path / "events.jsonl"
+    writer = EventWriter(events_path)
+    reader = EventReader(events_path)
+    grid = np.zeros((sim.GRID_SIZE, sim.GRID_SIZE), dtype=np.int32)
+    bot = _bot([(0, 0), (0, 1), (0, 2)])
+
+    sim.move_to(writer, grid, 3, bot, {"id": "a2-3", "target": [1, 1],
+                                      "path": [[0, 0], [1, 1]]})
+    writer.flush()
+
+    assert bot["path"] == [(0, 0), (1, 1)] and bot["target"] == (1, 1)
+    assert bot["path_id"] == 5 and bot["cmd"] == "a2-3"
+    (event,) = reader.poll()
+    assert event["event"] == "start" and event["cmd"] == "a2-3"
@@ -0,0 +1,44 @@
+"""
+Exact distance fields and flow fields against Dijkstra.
+
+    python -m pytest tests/test_fields.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, path_cost, random_grid
+from pathfinding.fields import FlowField, distance_field
+from pathfinding.search import GridGraph
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_field_matches_dijkstra(seed):
+    grid = random_grid(seed, shape=(16, 16))
+    graph = GridGraph(grid)
+    (goal,) = free_cells(grid, 1, seed)
+    dist = distance_field(grid, goal)
+    for r, c in zip(*np.nonzero(grid == 0)):
+        path = graph.astar((r, c), goal)
+        if path is None:
+            assert dist[r, c] == np.inf
+        else:
+            assert dist[r, c] == pytest.approx(path_cost(grid, path))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_flow_field_paths_are_optimal(seed):
+    grid = random_grid(seed)
+    goal, *starts = free_cells(grid, 10, seed)
+    flow = FlowField(grid, goal)
+    for start in starts:
+        path = flow.path(start)
+        if not np.isfinite(flow.dist[start]):
+            assert path is None
+            continue
+        assert path[0] == start and path[-1] == goal
+        assert path_cost(grid, path) == pytest.approx(flow.dist[start])
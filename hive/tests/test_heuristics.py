@@ -0,0 +1,59 @@
+"""
+Classical heuristic providers: admissibility and optimal A* paths.
+
+    python -m pytest tests/test_heuristics.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, path_cost, random_grid
+from pathfinding.fields import distance_field
+from pathfinding.heuristics import LandmarkHeuristic, OctileHeuristic
+from pathfinding.search import GridGraph
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("provider", [OctileHeuristic(), LandmarkHeuristic(num_landmarks=4)],
+                         ids=["octile", "alt"])
+def test_maps_never_overestimate(provider, seed):
+    grid = random_grid(seed, density=0.3)
+    free = grid == 0
+    for goal in free_cells(grid, 4, seed):
+        dist = distance_field(grid, goal)
+        h = provider.heuristic_map(grid, goal)
+        reachable = free & np.isfinite(dist)
+        # Octile sums and path sums of the same moves differ by rounding
+        assert np.all(h[reachable] <= dist[reachable] + 1e-9)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_alt_paths_are_optimal(seed):
+    grid = random_grid(seed, density=0.3)
+    graph = GridGraph(grid)
+    alt = LandmarkHeuristic(num_landmarks=4)
+    cells = free_cells(grid, 10, seed)
+    for start, goal in zip(cells[::2], cells[1::2]):
+        dist = distance_field(grid, goal)
+        path = graph.astar(start, goal, alt.heuristic_map(grid, goal))
+        if not np.isfinite(dist[start]):
+            assert path is None
+        else:
+            assert path_cost(grid, path) == pytest.approx(dist[start])
+
+
+def test_landmarks_cover_every_region():
+    # Two regions split by a wall: each gets a landmark
+    grid = np.zeros((8, 8), dtype=np.uint8)
+    grid[:, 4] = 1
+    alt = LandmarkHeuristic(num_landmarks=2)
+    alt.prepare(grid)
+    assert sorted(c < 4 for _r, c in alt.landmarks) == [False, True]
+    # Tables are kept until the grid changes
+    tables = alt.tables
+    alt.prepare(grid.copy())
+    assert alt.tables is tables
@@ -0,0 +1,66 @@
+"""
+Hierarchical (HPA*) planning: completeness and incremental updates.
+
+    python -m pytest tests/test_hierarchy.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, path_cost, random_grid
+from pathfinding.hierarchy import HierarchicalGraph
+from pathfinding.search import GridGraph
+
+# Small tiles keep the grids small while every path still crosses borders
+TILE = 8
+
+
+def _check_against_astar(graph, grid, cells):
+    astar = GridGraph(grid)
+    requests = list(zip(cells[::2], cells[1::2]))
+    for (start, goal), path in zip(requests, graph.find_paths(requests)):
+        expected = astar.astar(start, goal)
+        if expected is None:
+            assert path is None
+            continue
+        assert path is not None, f"{start} -> {goal} exists but was not found"
+        assert path[0] == start and path[-1] == goal
+        assert path_cost(grid, path) >= path_cost(grid, expected) - 1e-9
+
+
+@pytest.mark.parametrize("density", [0.2, 0.35])
+@pytest.mark.parametrize("seed", range(4))
+def test_paths_found_whenever_astar_finds_one(seed, density):
+    grid = random_grid(seed, shape=(36, 44), density=density)
+    graph = HierarchicalGraph(grid, tile=TILE)
+    _check_against_astar(graph, grid, free_cells(grid, 24, seed))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_update_matches_a_fresh_grid(seed):
+    grid = random_grid(seed, shape=(36, 44))
+    graph = HierarchicalGraph(grid, tile=TILE)
+    cells = free_cells(grid, 24, seed)
+    graph.find_paths(list(zip(cells[::2], cells[1::2])))  # fill the field cache
+
+    changed = grid.copy()
+    changed[10:26, 20] = 1   # a wall across several tiles
+    changed[30, :] = 0       # and a row opened up
+    for cell in cells:
+        changed[cell] = 0
+    rebuilt = graph.update(changed)
+    assert rebuilt and len(rebuilt) < graph.tile_rows * graph.tile_cols
+    _check_against_astar(graph, changed, cells)
+
+
+def test_disconnected_regions():
+    grid = np.zeros((16, 16), dtype=np.uint8)
+    grid[:, 9] = 1
+    graph = HierarchicalGraph(grid, tile=TILE)
+    assert graph.find_path((0, 0), (15, 15)) is None
+    assert graph.find_path((0, 0), (15, 8))[-1] == (15, 8)
+    assert graph.find_path((3, 3), (3, 3)) == [(3, 3)]
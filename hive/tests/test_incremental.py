@@ -0,0 +1,77 @@
+"""
+D* Lite repairs against fresh A* searches after grid changes.
+
+    python -m pytest tests/test_incremental.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, path_cost, random_grid
+from pathfinding.incremental import IncrementalPlanner
+from pathfinding.search import GridGraph
+
+
+def _assert_optimal(grid, path, start, goal):
+    expected = GridGraph(grid).astar(start, goal)
+    if expected is None:
+        assert path is None
+        return
+    assert path[0] == start and path[-1] == goal
+    assert path_cost(grid, path) == pytest.approx(path_cost(grid, expected))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_repaired_paths_stay_optimal(seed):
+    rng = np.random.default_rng(seed)
+    grid = random_grid(seed, shape=(24, 24), density=0.2)
+    cells = free_cells(grid, 8, seed)
+    bots = dict(enumerate(zip(cells[::2], cells[1::2])))
+    planner = IncrementalPlanner(grid)
+    paths = {k: planner.plan(k, start, goal) for k, (start, goal) in bots.items()}
+    for k, (start, goal) in bots.items():
+        _assert_optimal(grid, paths[k], start, goal)
+
+    for _round in range(4):
+        # Every bot moves a couple of steps, then some cells flip
+        positions = {k: path[min(2, len(path) - 1)] for k, path in paths.items() if path}
+        flips = rng.integers(0, 24, size=(20, 2))
+        for r, c in flips:
+            if (r, c) not in positions.values() and all((r, c) != g for _s, g in bots.values()):
+                grid[r, c] ^= 1
+        planner.update(grid)
+        changed = planner.repair(positions)
+        for k, pos in positions.items():
+            path = changed[k] if k in changed else paths[k][paths[k].index(pos):]
+            _assert_optimal(grid, path, pos, bots[k][1])
+            paths[k] = path
+        paths = {k: p for k, p in paths.items() if k in positions}
+
+
+def test_borrowed_path_kept_until_blocked():
+    grid = np.zeros((6, 6), dtype=np.uint8)
+    planner = IncrementalPlanner(grid)
+    # Not the shortest path, but every cell is free
+    detour = [(0, 0), (1, 0), (2, 0), (3, 1), (3, 2), (3, 3)]
+    planner.plan("a", (0, 0), (3, 3), path=detour)
+    assert planner.repair({"a": (1, 0)}) == {}
+
+    grid[3, 2] = 1
+    assert planner.update(grid) == [(3, 2)]
+    path = planner.repair({"a": (1, 0)})["a"]
+    assert path[0] == (1, 0) and path[-1] == (3, 3) and (3, 2) not in path
+    _assert_optimal(grid, path, (1, 0), (3, 3))
+
+
+def test_goal_walled_off():
+    grid = np.zeros((6, 6), dtype=np.uint8)
+    planner = IncrementalPlanner(grid)
+    planner.plan(0, (0, 0), (5, 5))
+    grid[4, 4:] = 1
+    grid[5, 4] = 1
+    planner.update(grid)
+    assert planner.repair({0: (0, 0)}) == {0: None}
@@ -0,0 +1,75 @@
+"""
+Decoder passes reported per planning call in PlanStats.iterations.
+
+    python -m pytest tests/test_iterations.py
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "move_world"))
+from model import HeuristicNet, HeuristicNetV2
+from pathfinder import NeuralPathfinder
+
+GRID = np.zeros((64, 64), dtype=np.uint8)
+
+
+def _checkpoint(tmp_path, version, num_iterations=3):
+    torch.manual_seed(0)
+    if version == "v2":
+        model = HeuristicNetV2(num_iterations=num_iterations)
+    else:
+        model = HeuristicNet()
+    path = tmp_path / f"{version}.pt"
+    torch.save({"model_state_dict": model.state_dict(), "max_cost": 100.0,
+                "model_version": version, "num_iterations": num_iterations}, path)
+    return path
+
+
+def test_v2_reports_passes(tmp_path):
+    pf = NeuralPathfinder(_checkpoint(tmp_path, "v2"), device=torch.device("cpu"))
+    _path, stats = pf.find_path(GRID, (1, 1), (60, 60), return_stats=True)
+    assert stats.iterations == 3
+    # Served from the cache: no forward ran
+    _path, stats = pf.find_path(GRID, (2, 2), (60, 60), return_stats=True)
+    assert stats.iterations is None
+
+
+def test_budget_stops_after_first_pass(tmp_path):
+    pf = NeuralPathfinder(_checkpoint(tmp_path, "v2"), device=torch.device("cpu"),
+                          budget_ms=0)
+    _path, stats = pf.find_path(GRID, (1, 1), (60, 60), return_stats=True)
+    assert stats.iterations == 1
+
+
+def test_no_passes_without_eager_v2(tmp_path):
+    pf = NeuralPathfinder(_checkpoint(tmp_path, "v1"), device=torch.device("cpu"))
+    _path, stats = pf.find_path(GRID, (1, 1), (60, 60), return_stats=True)
+    assert stats.iterations is None
+    pf = NeuralPathfinder(_checkpoint(tmp_path, "v2"), backend="script", threads=1)
+    _path, stats = pf.find_path(GRID, (1, 1), (60, 60), return_stats=True)
+    assert stats.iterations is None
+
+
+def test_concurrent_calls_keep_their_own_count(tmp_path):
+    ckpt = _checkpoint(tmp_path, "v2")
+    full = NeuralPathfinder(ckpt, device=torch.device("cpu"), cache_entries=0)
+    early = NeuralPathfinder(ckpt, device=torch.device("cpu"), cache_entries=0,
+                             budget_ms=0)
+    early._infer = full._infer  # one module shared by both threads
+
+    def plan(pf, goal):
+        return pf.find_path(GRID, (1, 1), goal, return_stats=True)[1].iterations
+
+    with ThreadPoolExecutor(2) as pool:
+        runs = [(pool.submit(plan, full, (60, 60 - k % 4)),
+                 pool.submit(plan, early, (60 - k % 4, 60))) for k in range(8)]
+        for f_full, f_early in runs:
+            assert f_full.result() == 3
+            assert f_early.result() == 1
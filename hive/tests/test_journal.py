@@ -0,0 +1,82 @@
+"""
+Command journal: write, torn-write and read round trips.
+
+    python -m pytest tests/test_journal.py
+"""
+
+import json
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from journal import CommandJournal, JournalReader
+
+
+def _record(commands):
+    payload = json.dumps(commands).encode()
+    return struct.pack("<I", len(payload)) + payload
+
+
+def test_batches_read_in_order(tmp_path):
+    path = tmp_path / "commands.journal"
+    journal = CommandJournal(path)
+    journal.append([{"bot": 0, "target": [1, 2]}, {"bot": 1, "target": [3, 4]}])
+    journal.append([])  # nothing written
+    reader = JournalReader(path)
+    late = JournalReader(path, from_start=False)
+    journal.append([{"bot": 2, "target": [5, 6]}])
+
+    assert [c["bot"] for c in reader.read()] == [0, 1, 2]
+    assert reader.read() == []
+    assert late.read() == [{"bot": 2, "target": [5, 6]}]
+
+
+def test_torn_record_waits_for_the_rest(tmp_path):
+    path = tmp_path / "commands.journal"
+    journal = CommandJournal(path)
+    reader = JournalReader(path)
+    journal.append([{"bot": 0}])
+    record = _record([{"bot": 1}])
+
+    # A writer is halfway through its record: only the complete one is read
+    with open(path, "ab") as f:
+        f.write(record[:2])
+    assert reader.read() == [{"bot": 0}]
+    with open(path, "ab") as f:
+        f.write(record[2:7])
+    assert reader.read() == []
+    with open(path, "ab") as f:
+        f.write(record[7:])
+    assert reader.read() == [{"bot": 1}]
+
+
+def test_corrupt_record_is_skipped(tmp_path):
+    path = tmp_path / "commands.journal"
+    journal = CommandJournal(path)
+    journal.reset()
+    with open(path, "ab") as f:
+        f.write(struct.pack("<I", 5) + b"{oops")
+    journal.append([{"bot": 3}])
+    assert JournalReader(path).read() == [{"bot": 3}]
+
+
+def test_compaction_restarts_other_readers(tmp_path):
+    path = tmp_path / "commands.journal"
+    journal = CommandJournal(path)
+    simulation = JournalReader(path, compact_bytes=1)
+    observer = JournalReader(path)
+    journal.append([{"bot": 0}])
+    assert observer.read() == [{"bot": 0}]
+
+    assert simulation.read() == [{"bot": 0}]
+    assert path.stat().st_size == simulation.offset  # just the header
+    # Compacted and grown back to the observer's offset: it still starts over
+    journal.append([{"bot": 1}])
+    assert path.stat().st_size == observer.offset
+    assert observer.read() == [{"bot": 1}]
+    assert simulation.read() == [{"bot": 1}]
+
+    journal.append([{"bot": 2}])
+    journal.reset()
+    assert simulation.read() == [] and observer.read() == []
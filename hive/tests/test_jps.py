@@ -0,0 +1,53 @@
+"""
+Jump Point Search and JPS+ against A*.
+
+    python -m pytest tests/test_jps.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, path_cost, random_grid
+from pathfinding.heuristics import octile_map
+from pathfinding.jps import JumpPointGraph, jps
+from pathfinding.search import GridGraph
+
+
+@pytest.mark.parametrize("density", [0.1, 0.3])
+@pytest.mark.parametrize("seed", range(5))
+def test_paths_match_astar_cost(seed, density):
+    grid = random_grid(seed, shape=(32, 32), density=density)
+    graph = GridGraph(grid)
+    jump_graph = JumpPointGraph(grid)
+    cells = free_cells(grid, 16, seed)
+    for start, goal in zip(cells[::2], cells[1::2]):
+        expected = graph.astar(start, goal)
+        h = octile_map(grid.shape, goal)
+        for plus in (False, True):
+            path = jump_graph.jps(start, goal, h, plus=plus)
+            if expected is None:
+                assert path is None
+                continue
+            assert path[0] == start and path[-1] == goal
+            assert path_cost(grid, path) == pytest.approx(path_cost(grid, expected))
+
+
+def test_open_grid_expands_few_nodes():
+    grid = np.zeros((32, 32), dtype=np.uint8)
+    stats = {}
+    path = JumpPointGraph(grid).jps((0, 0), (31, 20), octile_map(grid.shape, (31, 20)),
+                                    stats=stats)
+    assert len(path) == 32
+    graph = GridGraph(grid)
+    graph.astar((0, 0), (31, 20), octile_map(grid.shape, (31, 20)))
+    assert stats["expanded"] < graph.expanded
+
+
+def test_start_is_goal():
+    grid = np.zeros((4, 4), dtype=np.uint8)
+    assert jps(grid, (2, 2), (2, 2)) == [(2, 2)]
+    assert jps(grid, (2, 2), (2, 2), plus=True) == [(2, 2)]
@@ -0,0 +1,56 @@
+"""
+Late-fusion checkpoints in NeuralPathfinder.
+
+    python -m pytest tests/test_late_fusion.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "move_world"))
+from model import HeuristicNetLate, HeuristicNetV2
+from pathfinder import NeuralPathfinder
+
+GRID = np.zeros((64, 64), dtype=np.uint8)
+
+
+def _late_checkpoint(tmp_path, train_steps):
+    torch.manual_seed(0)
+    late = HeuristicNetLate.from_v2(HeuristicNetV2(num_iterations=2))
+    path = tmp_path / "late.pt"
+    ckpt = {"model_state_dict": late.state_dict(), "model_version": "late",
+            "num_iterations": 2, "max_cost": 100.0}
+    if train_steps is not None:
+        ckpt["train_steps"] = train_steps
+    torch.save(ckpt, path)
+    return path
+
+
+@pytest.mark.parametrize("train_steps", [None, 0])
+def test_untrained_conversion_is_refused(tmp_path, train_steps):
+    with pytest.raises(ValueError, match="untrained"):
+        NeuralPathfinder(_late_checkpoint(tmp_path, train_steps),
+                         device=torch.device("cpu"))
+
+
+def test_trained_checkpoint_plans(tmp_path):
+    pf = NeuralPathfinder(_late_checkpoint(tmp_path, 100), device=torch.device("cpu"))
+    path, stats = pf.find_path(GRID, (1, 1), (60, 60), return_stats=True)
+    assert path[0] == (1, 1) and path[-1] == (60, 60)
+    assert stats.iterations == 2
+
+
+def test_from_v2_matches_v2_encoder():
+    torch.manual_seed(0)
+    v2 = HeuristicNetV2(num_iterations=2).eval()
+    late = HeuristicNetLate.from_v2(v2).eval()
+    x = torch.zeros(1, 1, 64, 64)
+    with torch.inference_mode():
+        # An all-free grid with no goal: V2's e1 sees [obstacles, 0]
+        expected = v2.e1(torch.cat([x, torch.zeros_like(x)], dim=1))
+        assert torch.allclose(late.e1(x), expected, atol=1e-5)
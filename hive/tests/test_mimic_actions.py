@@ -0,0 +1,152 @@
+"""
+Mimic world dispatch helpers (need the hand-tracking dependencies).
+
+    python -m pytest tests/test_mimic_actions.py
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mimic_world"))
+import actions
+
+
+class ScriptedReader:
+    """EventReader stand-in that replays a fixed list of events."""
+
+    def __init__(self, events):
+        self.events = list(events)
+
+    def wait(self, predicate, timeout):
+        while self.events:
+            event = self.events.pop(0)
+            if predicate(event):
+                return event
+        return None
+
+
+def _result(bot, path, dispatch=1):
+    return {"bot_id": bot, "id": f"{dispatch}-{bot}", "path": path, "length": len(path)}
+
+
+def _event(result, event, idx=0):
+    return {"bot": result["bot_id"], "cmd": result["id"], "event": event, "idx": idx}
+
+
+def test_next_wave_waits_for_every_earlier_wave(monkeypatch):
+    monkeypatch.setattr(actions, "WAVE_STEP_TIMEOUT_S", 0.01)
+    slow = _result(0, [[0, 0], [0, 1], [0, 2], [0, 3]])   # wave 1
+    fast = _result(1, [[5, 0], [5, 1]])                    # wave 2
+    late = _result(2, [[1, 2], [0, 2], [0, 5]])            # wave 3 crosses slow's path
+    progress = {}
+
+    # Wave 2 shares no cells with wave 1
+    assert actions._wait_for_wave(ScriptedReader([]), [[slow]], [fast], progress)
+    # Wave 3 must wait for wave 1's bot, although only wave 2 just went out
+    reader = ScriptedReader([_event(fast, "arrived"), _event(slow, "progress", 2)])
+    assert not actions._wait_for_wave(reader, [[slow], [fast]], [late], progress)
+    reader = ScriptedReader([_event(slow, "progress", 3)])
+    assert actions._wait_for_wave(reader, [[slow], [fast]], [late], progress)
+
+
+def test_progress_carries_over_between_waits():
+    a = _result(0, [[0, 0], [0, 1], [0, 2]])
+    b = _result(1, [[3, 3], [3, 4]])
+    c = _result(2, [[1, 1], [0, 1], [0, 0]])
+    progress = {}
+    # Bot 0 finished while the dispatcher waited on another wave
+    reader = ScriptedReader([_event(a, "arrived"), _event(b, "progress", 2)])
+    assert actions._wait_for_wave(reader, [[a, b]], [_result(3, [[3, 5], [3, 4]])], progress)
+    assert actions._wait_for_wave(ScriptedReader([]), [[a, b]], [c], progress)
+
+
+class NoPlane:
+    """StateReader stand-in for a simulation without the state plane."""
+
+    def snapshot(self):
+        return None
+
+
+def test_state_falls_back_to_json(monkeypatch, tmp_path):
+    state_path, grid_path = tmp_path / "mimic_state.json", tmp_path / "mimic_grid.json"
+    monkeypatch.setattr(actions, "STATE_PATH", state_path)
+    monkeypatch.setattr(actions, "GRID_PATH", grid_path)
+    monkeypatch.setattr(actions, "_state_reader", NoPlane())
+    monkeypatch.setattr(actions, "_json_grid", {"version": None, "grid": None})
+    assert actions._read_state() == {}
+
+    grid = np.zeros((4, 4), dtype=np.int32)
+    grid[1, 2] = 1
+    bots = [{"pos": [0, 0], "orientation": 0.0}]
+    grid_path.write_text(json.dumps({"version": 1, "grid": grid.tolist()}))
+    state_path.write_text(json.dumps({"bots": bots, "num_bots": 1, "grid_version": 1}))
+    state = actions._read_state()
+    assert state["bots"] == bots and "grid_version" not in state
+    np.testing.assert_array_equal(state["grid"], grid)
+
+    # Same version: the cached grid is used, the grid file is not read again
+    grid_path.unlink()
+    np.testing.assert_array_equal(actions._read_state()["grid"], grid)
+    assert actions._get_state()["grid"] == grid.tolist()
+
+    # A new version is loaded
+    grid[3, 3] = 1
+    grid_path.write_text(json.dumps({"version": 2, "grid": grid.tolist()}))
+    state_path.write_text(json.dumps({"bots": bots, "num_bots": 1, "grid_version": 2}))
+    np.testing.assert_array_equal(actions._read_state()["grid"], grid)
+
+
+class Poller:
+    """EventReader stand-in whose poll() returns what was queued since."""
+
+    def __init__(self, events=()):
+        self.queued = list(events)
+
+    def poll(self):
+        events, self.queued = self.queued, []
+        return events
+
+
+def test_kept_bot_reservation_follows_its_steps(monkeypatch):
+    grid = np.zeros((actions.GRID_SIZE, actions.GRID_SIZE), dtype=np.int32)
+    # Bot 0 is kept: on its way to (10, 10), partway through a wait at (10, 1)
+    kept_path = [[10, 0], [10, 1], [10, 1], [10, 1]] + [[10, c] for c in range(2, 11)]
+    hand = Poller([{"bot": 0, "cmd": "7-0", "event": "progress", "idx": 2}])
+    bots = [{"pos": [10, 1], "orientation": 0.0}, {"pos": [30, 30], "orientation": 0.0}]
+    monkeypatch.setattr(actions, "_read_state", lambda: {"bots": bots, "grid": grid})
+    monkeypatch.setattr(actions, "_find_paths_modal", actions._find_paths_local)
+    monkeypatch.setattr(actions, "_send_wave", lambda wave, dispatch_id: [
+        r.update(id=f"{dispatch_id}-{r['bot_id']}") for r in wave])
+    monkeypatch.setattr(actions, "_wait_for_wave", lambda *args: True)
+    monkeypatch.setattr(actions, "EventReader", lambda path: None)
+    monkeypatch.setattr(actions, "_hand_targets", {0: (10, 10)})
+    monkeypatch.setattr(actions, "_hand_grid", actions.grid_digest(grid))
+    monkeypatch.setattr(actions, "_hand_paths", {0: ("7-0", kept_path)})
+    monkeypatch.setattr(actions, "_hand_steps", {})
+    monkeypatch.setattr(actions, "_hand_reader", hand)
+
+    planned = []
+    plan = actions._plan_timed_waves
+
+    def plan_while_moving(grid, results, bots, parked=None, reserved=()):
+        planned.append([list(map(list, p)) for p in reserved])
+        if len(planned) == 1:
+            # The kept bot finishes its wait while the first plan runs
+            hand.queued.append({"bot": 0, "cmd": "7-0", "event": "progress", "idx": 4})
+        return plan(grid, results, bots, parked, reserved)
+
+    monkeypatch.setattr(actions, "_plan_timed_waves", plan_while_moving)
+    actions._dispatch_to_targets([(10, 10), (20, 20)])
+
+    # Reserved from the step reached (not the first (10, 1)), then replanned
+    assert planned == [[kept_path[2:]], [kept_path[4:]]]
+    assert actions._hand_paths[0] == ("7-0", kept_path)
+    assert actions._hand_paths[1][1][-1] == [20, 20]
+    assert actions._hand_steps == {"7-0": 4}
@@ -0,0 +1,61 @@
+"""
+Timed planning around bots that are already moving.
+
+    python -m pytest tests/test_reservation.py
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from pathfinding.reservation import plan_timed_paths, plan_waves
+
+# A one-cell corridor (column 2) with a pocket at (2, 3); a bot already
+# on its way comes up the corridor and turns into the pocket
+CORRIDOR = np.ones((7, 5), dtype=np.uint8)
+CORRIDOR[:, 2] = 0
+CORRIDOR[2, 3] = 0
+ONCOMING = [(5, 2), (5, 2), (4, 2), (3, 2), (2, 3)]
+
+# An open grid with a bot crossing its middle row
+GRID = np.zeros((5, 5), dtype=np.uint8)
+CROSSING = [(2, 0), (2, 1), (2, 2), (2, 3), (2, 4)]
+
+
+def _cell_at(path, t):
+    return tuple(path[min(t, len(path) - 1)])
+
+
+def _collides(a, b):
+    for t in range(max(len(a), len(b))):
+        if _cell_at(a, t) == _cell_at(b, t):
+            return True
+        if t and _cell_at(a, t) == _cell_at(b, t - 1) and _cell_at(a, t - 1) == _cell_at(b, t):
+            return True
+    return False
+
+
+def test_unreserved_path_meets_the_oncoming_bot():
+    (path,) = plan_timed_paths(CORRIDOR, [((0, 2), (6, 2))])
+    assert _collides(path, ONCOMING)
+
+
+def test_reserved_path_is_avoided():
+    (path,) = plan_timed_paths(CORRIDOR, [((0, 2), (6, 2))], reserved=[ONCOMING])
+    assert tuple(path[0]) == (0, 2) and tuple(path[-1]) == (6, 2)
+    assert not _collides(path, ONCOMING)
+
+
+def test_reserved_goal_stays_taken():
+    (path,) = plan_timed_paths(GRID, [((0, 4), (2, 4))], reserved=[CROSSING])
+    assert path is None
+
+
+def test_later_waves_park_reserved_bots():
+    requests = [((0, 0), (4, 4)), ((4, 0), (2, 4))]
+    waves = plan_waves(GRID, requests, reserved=[CROSSING])
+    planned = {i: p for wave in waves for i, p in wave.items()}
+    assert 1 not in planned  # its goal is where the crossing bot stops
+    assert not _collides(planned[0], CROSSING)
@@ -0,0 +1,47 @@
+"""
+Shared A* kernel against exact distance fields.
+
+    python -m pytest tests/test_search.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, path_cost, random_grid
+from pathfinding.fields import distance_field
+from pathfinding.heuristics import octile_map
+from pathfinding.search import GridGraph, astar, pack, unpack
+
+# Two free halves split by a wall
+WALLED = np.zeros((6, 6), dtype=np.uint8)
+WALLED[:, 3] = 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_paths_are_optimal(seed):
+    grid = random_grid(seed)
+    graph = GridGraph(grid)
+    cells = free_cells(grid, 12, seed)
+    for start, goal in zip(cells[::2], cells[1::2]):
+        dist = distance_field(grid, goal)
+        for h in (None, octile_map(grid.shape, goal)):
+            path = graph.astar(start, goal, h)
+            if not np.isfinite(dist[start]):
+                assert path is None
+                continue
+            assert path[0] == start and path[-1] == goal
+            assert path_cost(grid, path) == pytest.approx(dist[start])
+
+
+def test_unreachable_goal():
+    assert astar(WALLED, (0, 0), (5, 5)) is None
+    assert astar(WALLED, (0, 0), (5, 2)) is not None
+
+
+def test_node_ids_round_trip():
+    for r, c in [(0, 0), (3, 7), (9, 0)]:
+        assert unpack(pack(r, c, 8), 8) == (r, c)
@@ -0,0 +1,99 @@
+"""
+Pathfinding service round trips over a Unix socket.
+
+    python -m pytest tests/test_service.py
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, random_grid
+from pathfinding.search import GridGraph
+from pathfinding.service import connect, decode_paths, encode_paths, serve
+
+
+class PlanStats:
+    def __init__(self, **counts):
+        self.counts = counts
+
+    def as_dict(self):
+        return dict(self.counts)
+
+
+class AStarPathfinder:
+    """find_paths_batch / stats_info over the A* kernel; needs no model."""
+
+    def find_paths_batch(self, grid, requests, heuristic=None, mode="astar",
+                         shared_flow=False, deadline_ms=None, return_stats=False):
+        if mode != "astar":
+            raise ValueError(f"Unknown mode {mode!r}")
+        graph = GridGraph(grid)
+        paths = [graph.astar(s, g, None if heuristic is None else heuristic.heuristic_map(grid, g))
+                 for s, g in requests]
+        stats = PlanStats(paths=len(paths), heuristic=getattr(heuristic, "name", None))
+        return (paths, stats) if return_stats else paths
+
+    def stats_info(self):
+        return {"calls": 0}
+
+
+@pytest.fixture
+def client(tmp_path):
+    socket_path = tmp_path / "pathfind.sock"
+    server = multiprocessing.get_context("fork").Process(
+        target=serve, args=(AStarPathfinder(), socket_path, 1))
+    server.start()
+    try:
+        for _ in range(200):
+            pf = connect(socket_path)
+            if pf is not None:
+                break
+            time.sleep(0.01)
+        assert pf is not None, "server did not come up"
+        yield pf
+    finally:
+        server.terminate()
+        server.join(5)
+
+
+def test_paths_round_trip():
+    paths = [[(0, 0), (1, 1)], None, [(5, 3)], []]
+    assert decode_paths(*encode_paths(paths)) == [[(0, 0), (1, 1)], None, [(5, 3)], []]
+
+
+def test_connect_without_server(tmp_path):
+    assert connect(tmp_path / "missing.sock") is None
+
+
+def test_served_paths_match_local_search(client):
+    grid = random_grid(0)
+    cells = free_cells(grid, 12, 0)
+    requests = list(zip(cells[::2], cells[1::2]))
+    expected = AStarPathfinder().find_paths_batch(grid, requests)
+    assert client.find_paths_batch(grid, requests) == expected
+
+    path, stats = client.find_path(grid, *requests[0], return_stats=True)
+    assert path == expected[0] and stats == {"paths": 1, "heuristic": None}
+    assert client.stats_info()["calls"] == 0
+
+
+def test_heuristics_are_sent_by_name(client):
+    class Named:
+        name = "alt"
+
+    grid = np.zeros((8, 8), dtype=np.uint8)
+    _paths, stats = client.find_paths_batch(grid, [((0, 0), (7, 7))], heuristic=Named(),
+                                            return_stats=True)
+    assert stats["heuristic"] == "alt"
+    Named.name = "cnn"
+    with pytest.raises(ValueError, match="Unknown heuristic"):
+        client.find_paths_batch(grid, [((0, 0), (7, 7))], heuristic=Named())
+    with pytest.raises(ValueError, match="Unknown mode"):
+        client.find_paths_batch(grid, [((0, 0), (7, 7))], mode="warp")
+    assert client.ping() == client.ping()  # one worker answers every call
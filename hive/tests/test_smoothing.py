@@ -0,0 +1,58 @@
+"""
+Line-of-sight waypoint compression of grid paths.
+
+    python -m pytest tests/test_smoothing.py
+"""
+
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from grids import free_cells, path_cost, random_grid
+from pathfinding.search import GridGraph
+from pathfinding.smoothing import line_of_sight, rasterize, smooth_path
+
+
+def _paths(seed, count=6):
+    grid = random_grid(seed, shape=(32, 32), density=0.2)
+    graph = GridGraph(grid)
+    cells = free_cells(grid, 2 * count, seed)
+    paths = [graph.astar(s, g) for s, g in zip(cells[::2], cells[1::2])]
+    return grid, [p for p in paths if p is not None]
+
+
+@pytest.mark.parametrize("max_spacing", [None, 4])
+@pytest.mark.parametrize("seed", range(5))
+def test_waypoints_see_each_other(seed, max_spacing):
+    grid, paths = _paths(seed)
+    for path in paths:
+        waypoints = smooth_path(grid, path, max_spacing=max_spacing)
+        assert waypoints[0] == path[0] and waypoints[-1] == path[-1]
+        assert len(waypoints) <= len(path)
+        for a, b in zip(waypoints, waypoints[1:]):
+            assert grid[b] == 0
+            assert line_of_sight(grid, a, b), f"{a} -> {b} crosses an obstacle"
+            if max_spacing is not None:
+                assert math.dist(a, b) <= max_spacing
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rasterized_waypoints_stay_free(seed):
+    grid, paths = _paths(seed)
+    for path in paths:
+        steps = rasterize(smooth_path(grid, path, min_spacing=3))
+        assert steps[0] == path[0] and steps[-1] == path[-1]
+        # Straightening never makes the walk longer than the grid path
+        assert path_cost(grid, steps) <= path_cost(grid, path) + 1e-9
+
+
+def test_blocked_corner_keeps_the_turn():
+    grid = np.zeros((5, 5), dtype=np.uint8)
+    grid[1:4, 1:4] = 1
+    path = [(0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 4), (2, 4), (3, 4), (4, 4)]
+    assert smooth_path(grid, path) == [(0, 0), (0, 4), (4, 4)]
+    assert not line_of_sight(grid, (0, 0), (4, 4))
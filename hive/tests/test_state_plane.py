@@ -0,0 +1,174 @@
+"""
+Shared-memory state plane: round trips, the seqlock and changes(since).
+
+    python -m pytest tests/test_state_plane.py
+"""
+
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import state_plane
+from state_plane import StatePlane, StateReader, bot_list
+
+GRID = np.zeros((8, 8), dtype=np.uint8)
+GRID[2, 3] = 1
+
+_PLANES = itertools.count()
+
+
+def _bots(cells, orientation=0.0):
+    return [{"pos": list(c), "orientation": orientation, "path": [c], "path_idx": 1}
+            for c in cells]
+
+
+@pytest.fixture
+def plane():
+    # Short names: macOS caps shared-memory names at 31 characters
+    plane = StatePlane.create(f"openhive_test_{os.getpid()}_{next(_PLANES)}",
+                              GRID.shape, 4, layers={"coins": np.uint8},
+                              scalars=("score",), texts=("shape",))
+    yield plane
+    plane.close()
+
+
+def test_snapshot_round_trip(plane):
+    coins = np.zeros_like(GRID)
+    coins[5, 5] = 1
+    bots = _bots([(0, 0), (1, 2), (7, 7)], orientation=1.5)
+    plane.publish(bots, grid=GRID, layers={"coins": coins}, scalars={"score": 3},
+                  texts={"shape": "star"})
+
+    snap = StateReader(plane.name).snapshot()
+    assert snap["seq"] == plane.seq and snap["seq"] % 2 == 0
+    assert snap["pos"].tolist() == [[0, 0], [1, 2], [7, 7]]
+    assert not snap["active"].any()
+    np.testing.assert_array_equal(snap["grid"], GRID)
+    np.testing.assert_array_equal(snap["coins"], coins)
+    assert snap["score"] == 3.0 and snap["shape"] == "star"
+    assert bot_list(snap)[1] == {"pos": [1, 2], "orientation": 1.5}
+
+
+def test_torn_write_is_never_read(plane):
+    plane.publish(_bots([(0, 0)]), grid=GRID)
+    reader = StatePlane.attach(plane.name)
+    # A writer stopped halfway through publish(): the counter stays odd
+    plane._header[state_plane._SEQ] += 1
+    plane._arrays["pos"][0] = (4, 4)
+    assert reader.snapshot(retries=3) is None
+    assert reader.changes(0, retries=3) is None
+    plane._header[state_plane._SEQ] += 1
+    assert reader.snapshot()["pos"].tolist() == [[4, 4]]
+    reader.close()
+
+
+def _publish_forever(plane):
+    # Every publish moves all bots to the same cell: a torn read would mix them
+    k = 0
+    while True:
+        plane.publish(_bots([(k % 8, k % 8)] * 4, orientation=float(k)))
+        k += 1
+
+
+def test_concurrent_snapshots_are_consistent(plane):
+    # A writer process, like a simulation; threads would mostly take turns
+    writer = multiprocessing.get_context("fork").Process(target=_publish_forever,
+                                                         args=(plane,))
+    writer.start()
+    reader = StatePlane.attach(plane.name)
+    seqs = set()
+    deadline = time.monotonic() + 5
+    try:
+        while len(seqs) < 100 and time.monotonic() < deadline:
+            snap = reader.snapshot(retries=10_000)
+            if snap is None or not len(snap["pos"]):
+                continue
+            seqs.add(snap["seq"])
+            assert (snap["pos"] == snap["pos"][0]).all()
+            assert snap["pos"][0, 0] == snap["orientation"][0] % 8
+    finally:
+        writer.terminate()
+        writer.join()
+        reader.close()
+    assert len(seqs) > 1
+
+
+def test_reader_follows_a_restarted_writer(plane):
+    plane.publish(_bots([(0, 0)]), grid=GRID)
+    reader = StateReader(plane.name)
+    assert reader.snapshot()["pos"].tolist() == [[0, 0]]
+
+    plane.close()
+    assert reader.snapshot() is None
+    restarted = StatePlane.create(plane.name, GRID.shape, 4)
+    try:
+        restarted.publish(_bots([(3, 3)]), grid=GRID)
+        assert reader.snapshot()["pos"].tolist() == [[3, 3]]
+    finally:
+        restarted.close()
+
+
+def test_versions_move_only_with_changes(plane):
+    plane.publish(_bots([(0, 0), (1, 1)]), grid=GRID, scalars={"score": 1})
+    first = plane.seq
+    assert plane.version("grid") == first and plane.version("scalars") == first
+
+    plane.publish(_bots([(0, 1), (1, 1)]), grid=GRID, scalars={"score": 1})
+    assert plane.version("grid") == first and plane.version("scalars") == first
+    changed = GRID.copy()
+    changed[6, 6] = 1
+    plane.publish(_bots([(0, 1), (1, 1)]), grid=changed, scalars={"score": 2})
+    assert plane.version("grid") == plane.seq == plane.version("scalars")
+
+
+def test_changes_since_return_only_what_moved(plane):
+    plane.publish(_bots([(0, 0), (1, 1), (2, 2)]), grid=GRID)
+    since = plane.seq
+    plane.publish(_bots([(0, 0), (1, 2), (2, 2)]), grid=GRID)
+    plane.publish(_bots([(0, 0), (1, 3), (3, 3)]), grid=GRID, texts={"shape": "ring"})
+
+    delta = plane.changes(since)
+    assert not delta["full"] and delta["seq"] == plane.seq
+    # Oldest change first: bot 1 twice, then bot 2
+    assert delta["bots"]["index"].tolist() == [1, 1, 2]
+    assert delta["bots"]["pos"].tolist() == [[1, 2], [1, 3], [3, 3]]
+    assert "grid" not in delta and delta["shape"] == "ring"
+
+    assert plane.changes(plane.seq)["bots"]["index"].tolist() == []
+    assert plane.changes(None)["full"]
+
+
+def test_stale_readers_get_a_full_snapshot():
+    plane = StatePlane.create(f"openhive_test_{os.getpid()}_{next(_PLANES)}", GRID.shape, 2,
+                              log_size=4)
+    try:
+        plane.publish(_bots([(0, 0), (0, 1)]), grid=GRID)
+        since = plane.seq
+        for k in range(1, 4):  # six changes overrun the four-entry log
+            plane.publish(_bots([(k, 0), (k, 1)]))
+        delta = plane.changes(since)
+        assert delta["full"] and delta["pos"].tolist() == [[3, 0], [3, 1]]
+        np.testing.assert_array_equal(delta["grid"], GRID)
+
+        # Bots replaced: a full snapshot too
+        since = plane.seq
+        plane.publish(_bots([(5, 5)]))
+        assert plane.changes(since)["full"]
+    finally:
+        plane.close()
+
+
+def test_reader_tracks_its_own_since(plane):
+    plane.publish(_bots([(0, 0), (1, 1)]), grid=GRID)
+    reader = StateReader(plane.name)
+    assert reader.changes()["full"]
+    assert reader.changes()["bots"]["index"].tolist() == []
+    plane.publish(_bots([(0, 0), (2, 2)]), grid=GRID)
+    delta = reader.changes()
+    assert not delta["full"] and delta["bots"]["index"].tolist() == [1]